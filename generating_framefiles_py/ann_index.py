@@ -0,0 +1,133 @@
+from typing import Optional
+
+import numpy as np
+
+# Iterações do k-means esférico que escolhe os centroides das listas
+KMEANS_ITERATIONS = 10
+
+# Vetores por lista usados para treinar o k-means (o restante só é atribuído ao centroide mais próximo no final)
+TRAINING_PER_LIST = 64
+
+# Listas consultadas por busca, por padrão: mais listas acham mais vizinhos e custam mais comparações
+DEFAULT_PROBES = 8
+
+# Quantidade máxima de similaridades calculadas de uma vez na atribuição das sentenças aos centroides
+BLOCK_ELEMENTS = 1 << 22
+
+class IVFIndex:
+    """
+    Índice aproximado de vizinhos mais próximos por similaridade do cosseno (IVF, arquivo invertido), só com NumPy.
+    Os vetores normalizados são divididos em listas pelo centroide mais próximo (k-means esférico); uma busca
+    compara a sentença só com as sentenças das n_probe listas de centroides mais próximos dela, em vez de com
+    todas. Vizinhos em listas não consultadas são perdidos: a busca nunca inventa vizinhos, só pode deixar de achar.
+    """
+
+    def __init__(self, centroids: np.ndarray, assignments: np.ndarray, probes: np.ndarray):
+        self.centroids = centroids
+        self.assignments = assignments
+        self.probes = probes  # listas consultadas por cada sentença do índice
+        self.order = np.argsort(assignments, kind="stable")  # sentenças agrupadas por lista, em ordem crescente
+        self.starts = np.concatenate(([0], np.cumsum(np.bincount(assignments, minlength=len(centroids)))))
+
+    @classmethod
+    def build(cls, normalized: np.ndarray, n_lists: Optional[int] = None, n_probe: int = DEFAULT_PROBES, seed: int = 0) -> "IVFIndex":
+        """
+        Monta o índice sobre vetores já normalizados (norma L2 = 1).
+
+        Args:
+            normalized (np.ndarray): um vetor normalizado por sentença.
+            n_lists (int): quantidade de listas; raiz quadrada da quantidade de sentenças, se None.
+            n_probe (int): quantidade de listas consultadas por busca.
+            seed (int): semente da escolha dos centroides iniciais.
+        Returns:
+            IVFIndex: o índice.
+        """
+        n = len(normalized)
+        n_lists = max(1, min(n, n_lists or int(np.sqrt(n))))
+        generator = np.random.default_rng(seed)
+        training = normalized[generator.choice(n, min(n, TRAINING_PER_LIST * n_lists), replace=False)]
+        centroids = training[generator.choice(len(training), n_lists, replace=False)].copy()
+
+        for _ in range(KMEANS_ITERATIONS):
+            assignments = nearest_centroids(training, centroids, 1)[:, 0]
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, training)
+            norms = np.linalg.norm(sums, axis=1)
+            empty = norms == 0
+            if empty.any():  # lista vazia: recomeça num vetor qualquer
+                sums[empty] = training[generator.choice(len(training), int(empty.sum()))]
+                norms[empty] = np.linalg.norm(sums[empty], axis=1)
+            centroids = (sums / norms[:, None]).astype(normalized.dtype)
+
+        probes = nearest_centroids(normalized, centroids, min(n_probe, n_lists))
+        return cls(centroids, probes[:, 0], probes)
+
+    def members(self, list_id: int) -> np.ndarray:
+        """
+        Retorna as sentenças de uma lista, em ordem crescente.
+        """
+        return self.order[self.starts[list_id]:self.starts[list_id + 1]]
+
+    def candidates(self, position: int) -> np.ndarray:
+        """
+        Retorna as sentenças das listas consultadas por uma sentença do índice, em ordem crescente.
+
+        Args:
+            position (int): posição da sentença.
+        Returns:
+            np.ndarray: posições das candidatas a vizinhas (incluindo a própria sentença).
+        """
+        return np.sort(np.concatenate([self.members(list_id) for list_id in self.probes[position].tolist()]))
+
+    def range_search(self, normalized: np.ndarray, similarity_threshold: float) -> tuple:
+        """
+        Busca, para todas as sentenças do índice, as vizinhas com similaridade >= limiar entre as candidatas. As
+        consultas são feitas por lista: todas as sentenças que consultam uma lista são comparadas com ela numa só
+        multiplicação de matrizes. Um par é encontrado se qualquer uma das duas sentenças alcança a outra.
+
+        Args:
+            normalized (np.ndarray): os vetores normalizados com que o índice foi montado.
+            similarity_threshold (float): valor mínimo para similaridade de cossenos, que vai de -1 a 1.
+        Returns:
+            tuple: (origens, destinos) dos pares encontrados, com origem < destino, sem repetição.
+        """
+        sources, targets = [], []
+        querying = np.argsort(self.probes, axis=None, kind="stable")  # (sentença, lista) ordenados pela lista
+        probe_lists = self.probes.ravel()[querying]
+        query_positions = querying // self.probes.shape[1]
+        bounds = np.searchsorted(probe_lists, np.arange(len(self.centroids) + 1))
+        for list_id in range(len(self.centroids)):
+            queries = query_positions[bounds[list_id]:bounds[list_id + 1]]
+            members = self.members(list_id)
+            if not len(queries) or not len(members):
+                continue
+            rows, columns = np.nonzero(normalized[queries] @ normalized[members].T >= similarity_threshold)
+            rows, columns = queries[rows], members[columns]
+            # Um par vale se qualquer uma das duas sentenças consultou a lista da outra: guarda como (menor, maior)
+            keep = rows != columns
+            sources.append(np.minimum(rows[keep], columns[keep]))
+            targets.append(np.maximum(rows[keep], columns[keep]))
+        if not sources:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+        pairs = np.unique(np.concatenate(sources) * len(normalized) + np.concatenate(targets))
+        return pairs // len(normalized), pairs % len(normalized)
+
+def nearest_centroids(normalized: np.ndarray, centroids: np.ndarray, count: int) -> np.ndarray:
+    """
+    Retorna, para cada vetor, os 'count' centroides de maior similaridade, do mais para o menos similar.
+
+    Args:
+        normalized (np.ndarray): vetores normalizados.
+        centroids (np.ndarray): centroides normalizados.
+        count (int): quantidade de centroides por vetor.
+    Returns:
+        np.ndarray: matriz (vetores x count) com as posições dos centroides.
+    """
+    block_rows = max(1, BLOCK_ELEMENTS // len(centroids))
+    nearest = np.empty((len(normalized), count), dtype=np.int64)
+    for start in range(0, len(normalized), block_rows):
+        similarities = normalized[start:start + block_rows] @ centroids.T
+        top = np.argpartition(-similarities, count - 1, axis=1)[:, :count]
+        top_similarities = np.take_along_axis(similarities, top, axis=1)
+        nearest[start:start + block_rows] = np.take_along_axis(top, np.argsort(-top_similarities, axis=1, kind="stable"), axis=1)
+    return nearest
@@ -1,56 +1,101 @@
 import streamlit as st
-import io
+from xml.etree.ElementTree import ParseError
 
+from conllu_store import load_conllu
+from corpus_cache import content_hash
 from cria_framefiles import (
-    parse_conllu,
+    ANN_SUGGESTED_SIZE,
     group_by_args,
     group_using_bert,
     group_using_bert_by_verb,
 )
-
-# Função para gerar o conteúdo do framefile ignorando rolesets removidos
-def framefile_text(rolesets, chosen_verb, descriptions):
-    output = io.StringIO()
-    output.write(f"Verbo analisado: {chosen_verb}\n\n")
-
-    for args_tuple, data in rolesets.items():
-        removido_key = f"removido_{data['roleset_id']}"
-        if st.session_state.get(removido_key, False):
-            continue  # Ignora roleset removido
-        papel_key = f"roles_{data['roleset_id']}"
-        # Usa os valores dos inputs, não a lista montada
-        edited_roles = []
-        for i in range(len(st.session_state.get(papel_key, []))):
-            papel_input_key = f"{papel_key}_{i}"
-            papel_editado = st.session_state.get(papel_input_key, "")
-            if papel_editado.strip():
-                edited_roles.append(papel_editado.strip())
-
-        output.write(f"Roleset ID: {data['roleset_id']}\n")
-        output.write("Roles:\n")
-        if not edited_roles:
-            output.write("\t\t-\n")
-        for arg in edited_roles:
-            output.write(f"\t\t{arg}\n")
-        desc = st.session_state.get(f"desc_{data['roleset_id']}", "")
-        output.write(f"\nDescrição: {desc}\n")
-        output.write("\n---Exemplos de sentenças--- \n\n")
-        exemplos_removidos_key = f"ex_rem_{data['roleset_id']}"
-        exemplos_removidos = st.session_state.get(exemplos_removidos_key, set())
-        
-        for example_idx, example in enumerate(data['examples']):
-            if example_idx in exemplos_removidos:
-                continue  # Ignora exemplo removido
-            
-            output.write(f"\t{example['sentence']}\n\n")
-            argumentos_editados = st.session_state.get(f"args_{data['roleset_id']}_{example_idx}", [])
-            for nome_arg, valor_arg in argumentos_editados:
-                output.write(f"\t\t{nome_arg}: {valor_arg}\n")
-            output.write('*' * 10)
-            output.write('\n')
-        output.write("-" * 50)
-        output.write('\n')
-    return output.getvalue()
+from framefile_document import FramefileDocument
+from grouping_jobs import CANCELLED, FAILED, start_job
+
+# Corpora lidos mantidos em memória, compartilhados entre as sessões (identificados pelo hash do conteúdo)
+CACHED_CORPORA = 2
+
+# Verbos com as sentenças filtradas mantidas em memória
+CACHED_VERBS = 64
+
+# Resultados do agrupamento por argumentos guardados, por (corpus, verbo, parâmetros)
+CACHED_GROUPINGS = 128
+
+# Intervalo, em segundos, entre as atualizações do progresso de um agrupamento com BERT em andamento
+JOB_POLL_SECONDS = 1
+
+# Exemplos exibidos por página em cada roleset: só os exemplos da página atual criam widgets
+EXAMPLES_PER_PAGE = 10
+
+def upload_digest(uploaded_file):
+    # Hash do conteúdo calculado uma vez por arquivo enviado, e não a cada interação com a página
+    digests = st.session_state.setdefault("upload_digests", {})
+    if uploaded_file.file_id not in digests:
+        digests[uploaded_file.file_id] = content_hash(uploaded_file)
+    return digests[uploaded_file.file_id]
+
+# Corpus lido (com o índice de lemas e a tabela de argumentos), um por conteúdo, compartilhado entre as sessões
+@st.cache_resource(max_entries=CACHED_CORPORA, show_spinner="Lendo o corpus...")
+def cached_corpus(digest, _uploaded_file):
+    return load_conllu(_uploaded_file)
+
+# Sentenças de um verbo (só leitura: o mesmo DataFrame é usado por todas as sessões)
+@st.cache_resource(max_entries=CACHED_VERBS, show_spinner=False)
+def cached_sentences(digest, chosen_verb, _corpus):
+    return _corpus.filter_by_verb(chosen_verb)
+
+# Rolesets do agrupamento por argumentos; cada chamada devolve uma cópia, que a sessão pode editar à vontade
+@st.cache_data(max_entries=CACHED_GROUPINGS, show_spinner="Agrupando as sentenças...")
+def cached_rolesets(digest, chosen_verb, max_sentences, take_argm, _corpus):
+    filtered_sentences = cached_sentences(digest, chosen_verb, _corpus)
+    return group_by_args(filtered_sentences, chosen_verb, max_sentences, take_argm, _corpus)
+
+# Cancela o agrupamento com BERT em andamento na sessão, se houver (por exemplo, ao pedir outro agrupamento)
+def cancel_grouping():
+    job = st.session_state.pop("grouping_job", None)
+    if job is not None:
+        job.cancel()
+
+# Agrupamentos com BERT rodam em segundo plano (grouping_jobs), para a página continuar respondendo e o
+# agrupamento de uma sessão não bloquear as outras. O modelo é carregado uma vez por processo (get_engine) e
+# compartilhado entre as sessões; um agrupamento já feito, por qualquer sessão, é devolvido na hora.
+def start_grouping(chosen_verb, key, function, *arguments):
+    cancel_grouping()
+    st.session_state['grouping_job'] = start_job(key, function, *arguments)
+    st.session_state['grouping_received'] = 0
+    st.session_state['documento'] = FramefileDocument(chosen_verb)
+
+# Acrescenta ao documento da sessão os rolesets que o agrupamento publicou desde a última leitura. Os que já estão
+# no documento não são substituídos, então as edições feitas enquanto o agrupamento continua são mantidas.
+def receive_rolesets(job):
+    new_rolesets = job.rolesets(st.session_state['grouping_received'])
+    st.session_state['grouping_received'] += len(new_rolesets)
+    st.session_state['documento'].add_rolesets(new_rolesets)
+
+# Progresso do agrupamento em andamento, atualizado sozinho a cada JOB_POLL_SECONDS (só este trecho é executado de
+# novo). A página inteira só é executada de novo quando chegam rolesets novos ou o agrupamento termina.
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def grouping_progress(job):
+    if job.finished or job.published > st.session_state.get('grouping_received', 0):
+        st.rerun(scope="app")
+    st.progress(job.fraction, text=f"{job.stage}: {job.done}/{job.total}" if job.total else job.stage)
+    if st.button("Cancelar agrupamento"):
+        job.cancel()
+
+# Chave de widget do editor. Inclui o documento, para que os widgets de um agrupamento anterior não passem o valor
+# digitado para os rolesets de mesmo id do novo agrupamento.
+def editor_key(document, *parts):
+    return "_".join(str(part) for part in (*parts, document.document_id))
+
+# Callbacks dos campos do editor: levam o valor digitado para o documento, que registra a alteração
+def edit_role(document, roleset_id, position, widget_key):
+    document.set_role(roleset_id, position, st.session_state[widget_key].strip())
+
+def edit_argument(document, roleset_id, example_idx, arg_idx, name_key, value_key):
+    document.set_argument(roleset_id, example_idx, arg_idx, st.session_state[name_key], st.session_state[value_key])
+
+def edit_description(document, roleset_id, widget_key):
+    document.set_description(roleset_id, st.session_state[widget_key])
 
 
 st.set_page_config(page_title="Framefile Generator", layout="wide")
@@ -58,8 +103,10 @@ st.title("Gerador de Framefiles para Verbos")
 
 uploaded_file = st.file_uploader("Selecione o arquivo CONLL-U", type=["conllu"])
 if uploaded_file:
-    # Lê o arquivo usando sua função
-    df = parse_conllu(uploaded_file)
+    # Lê o arquivo em colunas só na primeira vez (o DataFrame é montado só para as sentenças filtradas); as demais
+    # interações, como editar um papel, reaproveitam o corpus, as sentenças filtradas e os agrupamentos em cache
+    digest = upload_digest(uploaded_file)
+    corpus = cached_corpus(digest, uploaded_file)
 
     chosen_verb = st.text_input(
         "Digite o verbo que deseja buscar:",
@@ -67,12 +114,7 @@ if uploaded_file:
 
     if chosen_verb:
         # Filtra as sentenças que contêm o verbo
-        filtered_sentences = df[df["tokens"].apply(
-            lambda tokens: any(
-                token["upos"] == "VERB" and token["lemma"].lower() == chosen_verb
-                for token in tokens
-            )
-        )]
+        filtered_sentences = cached_sentences(digest, chosen_verb, corpus)
 
         if filtered_sentences.empty:
             st.warning(f"Nenhuma sentença encontrada com o verbo '{chosen_verb}'")
@@ -94,260 +136,255 @@ if uploaded_file:
                 min_value=0, value=0
             )
 
-            rolesets = None
-
             if method == "Agrupar por papéis/args":
                 take_argm = st.checkbox("Considerar ArgMs para diferenciar rolesets")
                 if st.button("Executar agrupamento"):
-                    rolesets = group_by_args(
-                        filtered_sentences,
-                        chosen_verb,
-                        max_sentences or None,
-                        take_argm
-                    )
-                    st.session_state['rolesets'] = rolesets
+                    cancel_grouping()
+                    rolesets = cached_rolesets(digest, chosen_verb, max_sentences or None, take_argm, corpus)
+                    st.session_state['documento'] = FramefileDocument.from_rolesets(chosen_verb, rolesets)
             elif method == "Agrupar com BERT (CLS)":
                 similarity_threshold = st.slider(
                     "Valor de similaridade do cosseno", min_value=-1.0, max_value=1.0, value=0.7, step=0.01
                 )
+                use_ann = st.checkbox(
+                    "Usar índice aproximado (mais rápido, pode separar alguns grupos)",
+                    value=len(filtered_sentences) >= ANN_SUGGESTED_SIZE
+                )
                 if st.button("Executar agrupamento"):
-                    rolesets = group_using_bert(
-                        filtered_sentences,
-                        max_sentences or None,
-                        similarity_threshold
+                    start_grouping(
+                        chosen_verb, (digest, chosen_verb, method, max_sentences or None, similarity_threshold, use_ann),
+                        group_using_bert, filtered_sentences, max_sentences or None, similarity_threshold, use_ann
                     )
-                    st.session_state['rolesets'] = rolesets
             elif method == "Agrupar com LLM (prompt)":
                 st.info("Funcionalidade LLM via prompt ainda não está implementada.")
-                rolesets = {}
-                st.session_state['rolesets'] = rolesets
+                cancel_grouping()
+                st.session_state['documento'] = None
             elif method == "Agrupar com BERT (vetor de verbo)":
                 similarity_threshold = st.slider(
                     "Valor de similaridade do cosseno", min_value=-1.0, max_value=1.0, value=0.7, step=0.01
                 )
+                use_ann = st.checkbox(
+                    "Usar índice aproximado (mais rápido, pode separar alguns grupos)",
+                    value=len(filtered_sentences) >= ANN_SUGGESTED_SIZE
+                )
                 if st.button("Executar agrupamento"):
-                    rolesets = group_using_bert_by_verb(
-                        filtered_sentences,
-                        chosen_verb,
-                        max_sentences or None,
-                        similarity_threshold
+                    start_grouping(
+                        chosen_verb, (digest, chosen_verb, method, max_sentences or None, similarity_threshold, use_ann),
+                        group_using_bert_by_verb, filtered_sentences, chosen_verb, max_sentences or None,
+                        similarity_threshold, use_ann
                     )
-                    st.session_state['rolesets'] = rolesets
             else:
-                rolesets = {}
-                st.session_state['rolesets'] = rolesets
+                cancel_grouping()
+                st.session_state['documento'] = None
+
+            # Agrupamento com BERT em andamento: os rolesets já formados aparecem nas abas enquanto ele continua
+            grouping_job = st.session_state.get('grouping_job')
+            if grouping_job is not None:
+                receive_rolesets(grouping_job)
+                if not grouping_job.finished:
+                    grouping_progress(grouping_job)
+                else:
+                    del st.session_state['grouping_job']
+                    if grouping_job.status == CANCELLED:
+                        st.info("Agrupamento cancelado. Os rolesets já formados continuam disponíveis.")
+                    elif grouping_job.status == FAILED:
+                        st.error(f"Erro no agrupamento: {grouping_job.error}")
 
             # Exibição dos rolesets em abas tipo Cornerstone
-            rolesets = st.session_state.get('rolesets', None)
-            if rolesets:
+            document = st.session_state.get('documento')
+            if document:
                 st.subheader("Rolesets detectados")
-        
-                # Inicializa lista de rolesets ativos na sessão (ANTES de qualquer uso!)
-                if 'rolesets_ativos' not in st.session_state:
-                    st.session_state['rolesets_ativos'] = [data['roleset_id'] for _, data in rolesets.items()]                
-                
-                # Botão para baixar o framefile com edições (apenas rolesets não removidos)
-                roleset_descriptions = {}
-                framefile_content = framefile_text(rolesets, chosen_verb, roleset_descriptions)
+
+                # Botão para baixar o framefile com edições (apenas rolesets não removidos). O texto só é gerado de
+                # novo quando o documento muda; nas demais execuções, document.text devolve o já gerado
                 st.download_button(
                     label="Baixar Framefile customizado",
-                    data=framefile_content,
-                    file_name=f"Framefile-{chosen_verb}-v.txt", 
+                    data=document.text(),
+                    file_name=f"Framefile-{document.verb}-v.txt", 
                     mime="text/plain"
                 )
 
+                # Framefile no formato do Cornerstone (frameset.dtd). Com o frameset existente do verbo, os dois são
+                # mesclados: os rolesets do frameset ficam como estão e os do documento vêm depois, com os ids seguintes
+                existing_frameset = st.file_uploader(
+                    f"Frameset do Cornerstone para mesclar (opcional, {document.verb}-v.xml)", type=["xml"],
+                    key="frameset_existente"
+                )
+                try:
+                    frameset_xml = document.xml(existing_frameset.getvalue() if existing_frameset else None)
+                except ParseError as error:
+                    st.error(f"O frameset enviado não é um XML válido: {error}")
+                else:
+                    st.download_button(
+                        label="Baixar Framefile do Cornerstone (XML)",
+                        data=frameset_xml,
+                        file_name=f"{document.verb}-v.xml",
+                        mime="application/xml"
+                    )
+
                 # Botão para remover o roleset (marcar como removido)
-                rolesets_ativos_ids = [data['roleset_id'] for _, data in rolesets.items() if data['roleset_id'] in st.session_state['rolesets_ativos']]
-                if len(rolesets_ativos_ids) > 1:
-                    roleset_remover = st.selectbox("Selecione o Roleset para remover", rolesets_ativos_ids, key="select_roleset_remover")
+                rolesets_ativos = document.active_rolesets()
+                if len(rolesets_ativos) > 1:
+                    roleset_remover = st.selectbox(
+                        "Selecione o Roleset para remover", [roleset.roleset_id for roleset in rolesets_ativos],
+                        key="select_roleset_remover"
+                    )
                     if st.button("Remover Roleset Selecionado"):
-                        removido_key = f"removido_{roleset_remover}"
-                        st.session_state[removido_key] = True
+                        document.set_roleset_removed(roleset_remover, True)
                         st.rerun()
                 else:
                     st.info("Não é possível remover o último roleset. Adicione outro para poder remover este.")
 
                 
-                if st.button("Criar novo Roleset"):
-                    # Gera novo id único (maior id + 1)
-                    if rolesets:
-                        novo_id = max([data['roleset_id'] for _, data in rolesets.items()]) + 1
-                    else:
-                        novo_id = 1
-                    # Adiciona novo roleset vazio
-                    rolesets[(tuple(), novo_id)] = {
-                        'roleset_id': novo_id,
-                        'examples': [],
-                    }
-                    st.session_state['rolesets_ativos'].append(novo_id)
-                    st.session_state['rolesets'] = rolesets
+                # Enquanto o agrupamento continua, o novo id poderia coincidir com o de um roleset que ainda vai chegar
+                if st.button("Criar novo Roleset", disabled='grouping_job' in st.session_state):
+                    # Adiciona novo roleset vazio, com id único (maior id + 1)
+                    document.add_roleset()
                     st.rerun()
 
-                # Atualiza rolesets_ativos, removendo/restaurando conforme session_state[removido_key]
-                for args_tuple, data in rolesets.items():
-                    removido_key = f"removido_{data['roleset_id']}"
-                    if st.session_state.get(removido_key, False):
-                        if data['roleset_id'] in st.session_state['rolesets_ativos']:
-                            st.session_state['rolesets_ativos'].remove(data['roleset_id'])
-                    else:
-                        if data['roleset_id'] not in st.session_state['rolesets_ativos']:
-                            st.session_state['rolesets_ativos'].append(data['roleset_id'])
-
-                # Filtra apenas rolesets ativos e únicos
-                abas_validas = [
-                    (args_tuple, data)
-                    for args_tuple, data in rolesets.items()
-                    if data['roleset_id'] in st.session_state['rolesets_ativos']
-                ]
-                
                 # Cria uma aba para cada roleset ativo
-                tabs = st.tabs([f"Roleset {data['roleset_id']}" for _, data in abas_validas])
-                roleset_descriptions = {}
-
-                for idx, (args_tuple, data) in enumerate(abas_validas):
-                    with tabs[idx]:
-                        papel_key = f"roles_{data['roleset_id']}"
-                        removido_key = f"removido_{data['roleset_id']}"
-
-                        # Inicializa papéis e estado de removido
-                        if papel_key not in st.session_state:
-                            st.session_state[papel_key] = list(args_tuple)
-                        if removido_key not in st.session_state:
-                            st.session_state[removido_key] = False
-
-                        # Se removido, mostra aviso e botão para restaurar
-                        if st.session_state[removido_key]:
-                            st.warning("Este roleset foi removido e não será exportado.")
-                            if st.button("Restaurar Roleset", key=f"restaurar_{data['roleset_id']}"):
-                                st.session_state[removido_key] = False
-                                st.rerun()  # Força rerun para atualizar interface
-                        else:
-                            st.markdown(f"### Roleset {data['roleset_id']}")
-                            # Edição dos papéis semânticos...
-                            st.markdown("**Papéis semânticos (edite ou remova):**")
-                            papel_novo = []
-                            for i, papel in enumerate(st.session_state[papel_key]):
-                                col1, col2 = st.columns([4,1])
-                                with col1:
-                                    papel_editado = st.text_input(f"Papel {i+1}", value=papel, key=f"{papel_key}_{i}")
-                                with col2:
-                                    if st.button("Remover", key=f"remove_{papel_key}_{i}"):
-                                        del st.session_state[papel_key][i]
-                                        st.rerun()  # Atualiza imediatamente a interface
-                                        continue
-                                if papel_editado.strip():     
-                                    papel_novo.append(papel_editado.strip())
-                            st.session_state[papel_key] = papel_novo
-
-                            novo_papel = st.text_input("Adicionar novo papel", key=f"add_{papel_key}")
-                            if st.button("Adicionar papel", key=f"btn_add_{papel_key}"):
-                                if novo_papel.strip():
-                                    st.session_state[papel_key].append(novo_papel.strip())
-                                    st.rerun()  # Atualiza interface imediatamente
-                            # --- FIM DA EDIÇÃO DE PAPÉIS SEMÂNTICOS ---
-
-                            st.markdown("**Exemplos de uso:**")
-                            # Inicializa lista de exemplos removidos por roleset
-                            exemplos_removidos_key = f"ex_rem_{data['roleset_id']}"
-                            if exemplos_removidos_key not in st.session_state:
-                                st.session_state[exemplos_removidos_key] = set()
-                            
-                            for example_idx, example in enumerate(data['examples']):
-                                removido = example_idx in st.session_state[exemplos_removidos_key]
-                                
-                                st.markdown(f"> {example['sentence']}")
-                                if example['arguments']:
-                                    st.markdown("**Argumentos:**")
-                                    argumentos_editados = []
-                                    argumentos_lista = list(example['arguments'].items())
-                                    for arg_idx, (arg, form) in enumerate(argumentos_lista):
-                                        nome_key = f"nomearg_{data['roleset_id']}_{example_idx}_{arg_idx}"
-                                        valor_key = f"valorarg_{data['roleset_id']}_{example_idx}_{arg_idx}"
-                                        cols = st.columns([1,2])
-                                        with cols[0]:
-                                            nome_arg = st.text_input("Nome do argumento", value=arg, key=nome_key)
-                                        with cols[1]:
-                                            valor_arg = st.text_input("Valor do argumento", value=form, key=valor_key)
-                                        argumentos_editados.append((nome_arg, valor_arg))
-                                    # Salva os argumentos editados no session_state para exportação
-                                    st.session_state[f"args_{data['roleset_id']}_{example_idx}"] = argumentos_editados
-                                
-                                if removido:
-                                    st.warning("Este exemplo está marcado como removido e não será exportado.")
-                                    if st.button("Restaurar exemplo", key=f"restaurar_ex_{data['roleset_id']}_{example_idx}"):
-                                        st.session_state[exemplos_removidos_key].remove(example_idx)
-                                        st.rerun()
-
-                                else:
-                                    if st.button("Remover exemplo", key=f"rem_ex_{data['roleset_id']}_{example_idx}"):
-                                        st.session_state[exemplos_removidos_key].add(example_idx)
-                                        st.rerun()  # Atualiza a interface imediatamente
-
-                            # --- ADIÇÃO DE NOVO EXEMPLO ---
-                            st.markdown("**Adicionar novo exemplo:**")
-
-                            # Inicializa o campo da sentença, se ainda não existe
-                            nova_sentenca_key = f"nova_sent_{data['roleset_id']}"
-                            novo_args_key = f"novo_args_{data['roleset_id']}"
-
-                            # Inicializa se não existir
-                            if nova_sentenca_key not in st.session_state:
-                                st.session_state[nova_sentenca_key] = ""
-                            if novo_args_key not in st.session_state:
-                                st.session_state[novo_args_key] = []
-
-                            # Limpa se a flag estiver ativa
-                            if st.session_state.get(f"limpar_{nova_sentenca_key}", False):
-                                st.session_state[nova_sentenca_key] = ""
-                                st.session_state[f"limpar_{nova_sentenca_key}"] = False
-
-                            if st.session_state.get(f"limpar_{novo_args_key}", False):
-                                st.session_state[novo_args_key] = []
-                                st.session_state[f"limpar_{novo_args_key}"] = False
-
-                            # Campo para sentença
-                            nova_sentenca = st.text_input("Sentença do exemplo", key=nova_sentenca_key, value="")
-
-                            # Campos para argumentos do novo exemplo
-                            if novo_args_key not in st.session_state:
-                                st.session_state[novo_args_key] = []
-
-                            st.markdown("Adicione argumentos (nome e valor):")
-                            col_arg_nome, col_arg_valor = st.columns(2)
-                            novo_nome_arg = col_arg_nome.text_input("Nome do argumento", key=f"novo_nome_arg_{data['roleset_id']}")
-                            novo_valor_arg = col_arg_valor.text_input("Valor do argumento", key=f"novo_valor_arg_{data['roleset_id']}")
-
-                            if st.button("Adicionar argumento ao exemplo", key=f"add_arg_ex_{data['roleset_id']}"):
-                                if novo_nome_arg.strip() and novo_valor_arg.strip():
-                                    st.session_state[novo_args_key].append((novo_nome_arg.strip(), novo_valor_arg.strip()))
+                tabs = st.tabs([f"Roleset {roleset.roleset_id}" for roleset in rolesets_ativos])
+
+                for tab, roleset in zip(tabs, rolesets_ativos):
+                    with tab:
+                        roleset_id = roleset.roleset_id
+                        st.markdown(f"### Roleset {roleset_id}")
+                        # Edição dos papéis semânticos...
+                        st.markdown("**Papéis semânticos (edite ou remova):**")
+                        for i, papel in enumerate(roleset.roles):
+                            papel_key = editor_key(document, "papel", roleset_id, i)
+                            col1, col2 = st.columns([4,1])
+                            with col1:
+                                st.text_input(
+                                    f"Papel {i+1}", value=papel, key=papel_key,
+                                    on_change=edit_role, args=(document, roleset_id, i, papel_key)
+                                )
+                            with col2:
+                                if st.button("Remover", key=editor_key(document, "remover_papel", roleset_id, i)):
+                                    document.remove_role(roleset_id, i)
+                                    # Os campos dos papéis seguintes mudam de posição: descarta o que foi digitado neles
+                                    for j in range(i, len(roleset.roles) + 1):
+                                        st.session_state.pop(editor_key(document, "papel", roleset_id, j), None)
+                                    st.rerun()  # Atualiza imediatamente a interface
+
+                        novo_papel = st.text_input("Adicionar novo papel", key=editor_key(document, "novo_papel", roleset_id))
+                        if st.button("Adicionar papel", key=editor_key(document, "adicionar_papel", roleset_id)):
+                            if novo_papel.strip():
+                                document.add_role(roleset_id, novo_papel.strip())
+                                st.rerun()  # Atualiza interface imediatamente
+                        # --- FIM DA EDIÇÃO DE PAPÉIS SEMÂNTICOS ---
+
+                        st.markdown("**Exemplos de uso:**")
+                        # Só a página atual de exemplos é exibida, e só o exemplo em edição tem campos de texto, então o
+                        # custo de cada execução não cresce com o tamanho do roleset
+                        editando_key = editor_key(document, "editando", roleset_id)
+                        pages = max(1, -(-len(roleset.examples) // EXAMPLES_PER_PAGE))
+                        page = 1
+                        if pages > 1:
+                            page = st.number_input(
+                                f"Página de exemplos (1 a {pages})", min_value=1, max_value=pages, step=1,
+                                key=editor_key(document, "pagina", roleset_id)
+                            )
+                        first = (page - 1) * EXAMPLES_PER_PAGE
+                        page_examples = roleset.examples[first:first + EXAMPLES_PER_PAGE]
+                        if pages > 1:
+                            st.caption(f"Exemplos {first + 1} a {first + len(page_examples)} de {len(roleset.examples)}")
+
+                        for example_idx, example in enumerate(page_examples, start=first):
+                            st.markdown(f"> {example.sentence}")
+                            if example.arguments and st.session_state.get(editando_key) != example_idx:
+                                st.markdown("**Argumentos:**")
+                                st.markdown("\n".join(f"- {argument.name}: {argument.value}" for argument in example.arguments))
+                                if st.button("Editar argumentos", key=editor_key(document, "editar_ex", roleset_id, example_idx)):
+                                    st.session_state[editando_key] = example_idx
                                     st.rerun()
-
-                            # Lista de argumentos já adicionados
-                            for i, (nome, valor) in enumerate(st.session_state[novo_args_key]):
-                                st.write(f"{nome}: {valor}")
-                                if st.button("Remover argumento", key=f"remover_novo_arg_{data['roleset_id']}_{i}"):
-                                    del st.session_state[novo_args_key][i]
+                            elif example.arguments:
+                                st.markdown("**Argumentos:**")
+                                for arg_idx, argument in enumerate(example.arguments):
+                                    nome_key = editor_key(document, "nomearg", roleset_id, example_idx, arg_idx)
+                                    valor_key = editor_key(document, "valorarg", roleset_id, example_idx, arg_idx)
+                                    callback_args = (document, roleset_id, example_idx, arg_idx, nome_key, valor_key)
+                                    cols = st.columns([1,2])
+                                    with cols[0]:
+                                        st.text_input(
+                                            "Nome do argumento", value=argument.name, key=nome_key,
+                                            on_change=edit_argument, args=callback_args
+                                        )
+                                    with cols[1]:
+                                        st.text_input(
+                                            "Valor do argumento", value=argument.value, key=valor_key,
+                                            on_change=edit_argument, args=callback_args
+                                        )
+                                if st.button("Concluir edição", key=editor_key(document, "concluir_ex", roleset_id, example_idx)):
+                                    del st.session_state[editando_key]
                                     st.rerun()
 
-                            # Botão para adicionar o novo exemplo ao roleset
-                            if st.button("Adicionar exemplo ao roleset", key=f"add_ex_{data['roleset_id']}"):
-                                if st.session_state[nova_sentenca_key].strip():
-                                    novo_exemplo = {
-                                        'sentence': st.session_state[nova_sentenca_key].strip(),
-                                        'arguments': {nome: valor for nome, valor in st.session_state[novo_args_key]}
-                                    }
-                                    # Adiciona no objeto 'data['examples']'
-                                    data['examples'].append(novo_exemplo)
-                                    # Sinaliza para limpar na próxima execução
-                                    st.session_state[f"limpar_{nova_sentenca_key}"] = True
-                                    st.session_state[f"limpar_{novo_args_key}"] = True
+                            if example.removed:
+                                st.warning("Este exemplo está marcado como removido e não será exportado.")
+                                if st.button("Restaurar exemplo", key=editor_key(document, "restaurar_ex", roleset_id, example_idx)):
+                                    document.set_example_removed(roleset_id, example_idx, False)
                                     st.rerun()
 
-                            # Recupera o valor atual do campo e o último valor salvo
-                            desc_key = f"desc_{data['roleset_id']}"
-                            desc_atual = st.text_area(
-                                f"Descrição para o Roleset {data['roleset_id']}",
-                                key=desc_key,
-                                value=st.session_state.get(desc_key, "")
-                            )
-                
\ No newline at end of file
+                            else:
+                                if st.button("Remover exemplo", key=editor_key(document, "rem_ex", roleset_id, example_idx)):
+                                    document.set_example_removed(roleset_id, example_idx, True)
+                                    st.rerun()  # Atualiza a interface imediatamente
+
+                        # --- ADIÇÃO DE NOVO EXEMPLO ---
+                        st.markdown("**Adicionar novo exemplo:**")
+
+                        # Inicializa o campo da sentença, se ainda não existe
+                        nova_sentenca_key = editor_key(document, "nova_sent", roleset_id)
+                        novo_args_key = editor_key(document, "novo_args", roleset_id)
+
+                        # Inicializa se não existir
+                        if nova_sentenca_key not in st.session_state:
+                            st.session_state[nova_sentenca_key] = ""
+                        if novo_args_key not in st.session_state:
+                            st.session_state[novo_args_key] = []
+
+                        # Limpa se a flag estiver ativa
+                        if st.session_state.get(f"limpar_{nova_sentenca_key}", False):
+                            st.session_state[nova_sentenca_key] = ""
+                            st.session_state[f"limpar_{nova_sentenca_key}"] = False
+
+                        if st.session_state.get(f"limpar_{novo_args_key}", False):
+                            st.session_state[novo_args_key] = []
+                            st.session_state[f"limpar_{novo_args_key}"] = False
+
+                        # Campo para sentença
+                        nova_sentenca = st.text_input("Sentença do exemplo", key=nova_sentenca_key)
+
+                        st.markdown("Adicione argumentos (nome e valor):")
+                        col_arg_nome, col_arg_valor = st.columns(2)
+                        novo_nome_arg = col_arg_nome.text_input("Nome do argumento", key=editor_key(document, "novo_nome_arg", roleset_id))
+                        novo_valor_arg = col_arg_valor.text_input("Valor do argumento", key=editor_key(document, "novo_valor_arg", roleset_id))
+
+                        if st.button("Adicionar argumento ao exemplo", key=editor_key(document, "add_arg_ex", roleset_id)):
+                            if novo_nome_arg.strip() and novo_valor_arg.strip():
+                                st.session_state[novo_args_key].append((novo_nome_arg.strip(), novo_valor_arg.strip()))
+                                st.rerun()
+
+                        # Lista de argumentos já adicionados
+                        for i, (nome, valor) in enumerate(st.session_state[novo_args_key]):
+                            st.write(f"{nome}: {valor}")
+                            if st.button("Remover argumento", key=editor_key(document, "remover_novo_arg", roleset_id, i)):
+                                del st.session_state[novo_args_key][i]
+                                st.rerun()
+
+                        # Botão para adicionar o novo exemplo ao roleset
+                        if st.button("Adicionar exemplo ao roleset", key=editor_key(document, "add_ex", roleset_id)):
+                            if nova_sentenca.strip():
+                                # Um valor por nome de argumento, como nos exemplos do corpus
+                                argumentos = {nome: valor for nome, valor in st.session_state[novo_args_key]}
+                                document.add_example(roleset_id, nova_sentenca.strip(), list(argumentos.items()))
+                                # Sinaliza para limpar na próxima execução
+                                st.session_state[f"limpar_{nova_sentenca_key}"] = True
+                                st.session_state[f"limpar_{novo_args_key}"] = True
+                                st.rerun()
+
+                        desc_key = editor_key(document, "desc", roleset_id)
+                        st.text_area(
+                            f"Descrição para o Roleset {roleset_id}", value=roleset.description, key=desc_key,
+                            on_change=edit_description, args=(document, roleset_id, desc_key)
+                        )
\ No newline at end of file
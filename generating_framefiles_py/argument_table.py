@@ -0,0 +1,157 @@
+import os
+from typing import Optional
+
+import numpy as np
+
+class ArgumentTable:
+    """
+    Tabela das anotações Arg* do MISC do corpus, lidas uma vez ao carregar: uma linha por anotação, com a sentença,
+    o token predicado (a quem o argumento se refere), o papel (Arg0, ArgM-tmp, ...) e o token argumento. Os tokens
+    são posições no corpus (o id do token é a coluna id nessa posição); o predicado é -1 se o id anotado não existe
+    na sentença. As linhas ficam na ordem do corpus, então as linhas da sentença i estão em [starts[i], starts[i + 1]).
+    """
+
+    def __init__(self, sentences: np.ndarray, predicates: np.ndarray, roles: np.ndarray, arguments: np.ndarray, role_names: np.ndarray, starts: np.ndarray):
+        self.sentences = sentences
+        self.predicates = predicates
+        self.roles = roles
+        self.arguments = arguments
+        self.role_names = role_names  # em ordem alfabética: ordenar os códigos dos papéis ordena os nomes
+        self.starts = starts
+
+    def __len__(self) -> int:
+        return len(self.roles)
+
+    @classmethod
+    def build(cls, misc_codes: np.ndarray, id_codes: np.ndarray, strings: list, sentence_offsets: np.ndarray) -> "ArgumentTable":
+        """
+        Monta a tabela a partir das colunas de um armazenamento colunar. Cada MISC distinto é lido uma só vez: as
+        anotações são os itens 'papel:id' (separados por '|') cujo papel contém 'Arg'.
+
+        Args:
+            misc_codes (np.ndarray): código do MISC de cada token.
+            id_codes (np.ndarray): código do id de cada token.
+            strings (list): tabela de strings dos códigos.
+            sentence_offsets (np.ndarray): início dos tokens de cada sentença (e o total de tokens, ao final).
+        Returns:
+            ArgumentTable: a tabela de todas as anotações do corpus.
+        """
+        # Anotações de cada MISC com 'Arg': (código do MISC, papel, id do predicado)
+        annotated, role_strings, predicate_numbers = [], [], []
+        for code in np.unique(misc_codes).tolist():
+            if "Arg" not in strings[code]:
+                continue
+            for item in strings[code].split("|"):
+                parts = item.split(":")
+                if len(parts) > 1 and "Arg" in parts[0]:
+                    annotated.append(code)
+                    role_strings.append(parts[0])
+                    predicate_numbers.append(token_id_number(parts[1]))
+
+        role_names, item_roles = np.unique(np.array(role_strings, dtype=str), return_inverse=True)
+        # Anotações agrupadas por MISC: as do MISC de código c estão em [item_starts[c], item_starts[c + 1])
+        item_counts = np.bincount(np.array(annotated, dtype=np.int64), minlength=len(strings))
+        item_starts = np.concatenate(([0], np.cumsum(item_counts)))
+
+        # Uma linha por (token, anotação do seu MISC), na ordem do corpus e dos itens do MISC
+        tokens = np.flatnonzero(item_counts[misc_codes])
+        counts = item_counts[misc_codes[tokens]]
+        arguments = np.repeat(tokens, counts)
+        items = np.repeat(item_starts[misc_codes[tokens]] - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        sentences = np.searchsorted(sentence_offsets, arguments, side="right") - 1
+
+        predicate_numbers = np.array(predicate_numbers, dtype=np.int64)[items]
+        predicates = resolve_token_ids(sentences, predicate_numbers, id_codes, strings, sentence_offsets)
+        starts = np.searchsorted(sentences, np.arange(len(sentence_offsets)))
+        # Posições de tokens e de sentenças cabem em 32 bits, como os deslocamentos do armazenamento colunar
+        return cls(
+            sentences.astype(np.uint32), predicates.astype(np.int32), item_roles[items].astype(np.int32),
+            arguments.astype(np.uint32), role_names, starts.astype(np.uint32),
+        )
+
+    def rows(self, sentence_indices: np.ndarray) -> tuple:
+        """
+        Retorna as linhas das sentenças pedidas, na ordem pedida.
+
+        Args:
+            sentence_indices (np.ndarray): posições das sentenças no corpus.
+        Returns:
+            tuple: (linhas da tabela, posição em sentence_indices da sentença de cada linha).
+        """
+        sentence_indices = np.asarray(sentence_indices, dtype=np.int64)
+        starts = self.starts[sentence_indices].astype(np.int64)
+        counts = self.starts[sentence_indices + 1].astype(np.int64) - starts
+        rows = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        return rows, np.repeat(np.arange(len(sentence_indices)), counts)
+
+    def save(self, table_path: str) -> None:
+        """
+        Grava a tabela em disco.
+
+        Args:
+            table_path (str): caminho do arquivo da tabela.
+        """
+        temporary_path = table_path + ".tmp.npz"
+        np.savez(
+            temporary_path,
+            sentences=self.sentences, predicates=self.predicates, roles=self.roles,
+            arguments=self.arguments, role_names=self.role_names, starts=self.starts,
+        )
+        os.replace(temporary_path, table_path)
+
+    @classmethod
+    def load(cls, table_path: str) -> Optional["ArgumentTable"]:
+        """
+        Lê a tabela gravada em disco, se existe.
+
+        Args:
+            table_path (str): caminho do arquivo da tabela.
+        Returns:
+            Optional[ArgumentTable]: a tabela, ou None se não existe.
+        """
+        if not os.path.isfile(table_path):
+            return None
+        with np.load(table_path) as saved:
+            return cls(saved["sentences"], saved["predicates"], saved["roles"], saved["arguments"], saved["role_names"], saved["starts"])
+
+def token_id_number(token_id: str) -> int:
+    """
+    Retorna o número de um id de token do CONLL-U, ou -1 se não é um id inteiro escrito como no padrão (ids de
+    intervalo, como '3-4', decimais, como '5.1', e textos como '05' não são números de tokens).
+    """
+    return int(token_id) if token_id.isdigit() and str(int(token_id)) == token_id else -1
+
+def resolve_token_ids(sentences: np.ndarray, token_numbers: np.ndarray, id_codes: np.ndarray, strings: list, sentence_offsets: np.ndarray) -> np.ndarray:
+    """
+    Encontra a posição, no corpus, do token com um id numa sentença. Os ids inteiros de uma sentença são crescentes,
+    então (sentença, id) está em ordem no corpus e cada busca é uma busca binária.
+
+    Args:
+        sentences (np.ndarray): sentença de cada busca.
+        token_numbers (np.ndarray): número do id procurado em cada busca (de token_id_number; -1 não é encontrado).
+        id_codes (np.ndarray): código do id de cada token do corpus.
+        strings (list): tabela de strings dos códigos.
+        sentence_offsets (np.ndarray): início dos tokens de cada sentença (e o total de tokens, ao final).
+    Returns:
+        np.ndarray: posição do token de cada busca, ou -1 se a sentença não tem token com esse id.
+    """
+    # Número do id de cada token (-1 nos ids que não são inteiros)
+    id_numbers = np.full(len(strings), -1, dtype=np.int64)
+    for code in np.unique(id_codes).tolist():
+        id_numbers[code] = token_id_number(strings[code])
+    corpus_numbers = id_numbers[id_codes]
+    numbered = np.flatnonzero(corpus_numbers >= 0)
+    width = int(corpus_numbers.max(initial=0)) + 1
+    keys = (np.searchsorted(sentence_offsets, numbered, side="right") - 1) * width + corpus_numbers[numbered]
+    if not np.all(keys[1:] > keys[:-1]):  # corpus fora do padrão: ids fora de ordem
+        order = np.argsort(keys, kind="stable")
+        keys, numbered = keys[order], numbered[order]
+
+    positions = np.full(len(token_numbers), -1, dtype=np.int64)
+    if not len(keys):
+        return positions
+    targets = sentences.astype(np.int64) * width + token_numbers
+    found = np.minimum(np.searchsorted(keys, targets), len(keys) - 1)
+    matches = (token_numbers >= 0) & (token_numbers < width) & (keys[found] == targets)
+    positions[matches] = numbered[found[matches]]
+    return positions
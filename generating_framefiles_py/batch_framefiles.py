@@ -0,0 +1,228 @@
+import argparse
+import json
+import multiprocessing
+import logging
+import os
+import shutil
+import time
+from functools import partial
+from multiprocessing.pool import ThreadPool
+
+from bert_embeddings import default_num_threads
+from conllu_store import load_conllu
+from corpus_cache import content_hash
+from cornerstone_xml import FRAMESET_DTD
+from cria_framefiles import framefile_path, group_by_args, group_using_bert, group_using_bert_by_verb, write_file, write_xml_file
+
+# Métodos de agrupamento disponíveis na geração em lote (os mesmos da opção 1, 2 e 4 de cria_framefiles.py)
+METHODS = ("args", "bert", "bert-verbo")
+
+# Formatos dos framefiles: o texto de cria_framefiles.py ou o XML do Cornerstone (frameset.dtd)
+FORMATS = ("txt", "xml")
+
+# Arquivo, no diretório de saída, com os parâmetros do lote e os verbos já concluídos
+MANIFEST_FILE = "lote.json"
+
+# Intervalo mínimo (em segundos) entre duas gravações do arquivo de progresso
+MANIFEST_SAVE_INTERVAL = 2.0
+
+# Corpus do processo: carregado uma vez, antes de criar os workers (com fork, os processos o herdam sem copiar)
+_corpus = None
+
+def init_worker(file_path: str, log_level: str) -> None:
+    """
+    Prepara um worker: carrega o corpus e configura as mensagens de depuração, se o processo ainda não os herdou
+    (sistemas sem fork, como o Windows).
+
+    Args:
+        file_path (str): o caminho para o arquivo CONLL-U.
+        log_level (str): nível das mensagens dos agrupamentos (DEBUG, INFO, WARNING...).
+    """
+    global _corpus
+    if _corpus is None:
+        _corpus = load_conllu(file_path)
+    logging.basicConfig(level=log_level, format="%(message)s")
+
+def generate_framefile(verb: str, settings: dict) -> tuple:
+    """
+    Agrupa as sentenças de um verbo pelo método escolhido e escreve o seu framefile.
+
+    Args:
+        verb (str): lema do verbo, em minúsculas.
+        settings (dict): parâmetros do lote (método, limite, limiar, ArgMs, índice aproximado, formato, diretório de
+            saída, diretório dos framesets a mesclar).
+    Returns:
+        tuple: (verbo, quantidade de sentenças, quantidade de rolesets, mensagem de erro ou None). Sem sentenças,
+            nenhum arquivo é escrito. Um erro num verbo não interrompe o lote: o verbo só não é marcado como concluído.
+    """
+    try:
+        filtered_sentences = _corpus.filter_by_verb(verb)
+        if filtered_sentences.empty:
+            return verb, 0, 0, None
+
+        if settings["method"] == "args":
+            rolesets = group_by_args(filtered_sentences, verb, settings["limit"], settings["argm"], _corpus)
+        elif settings["method"] == "bert":
+            rolesets = group_using_bert(filtered_sentences, settings["limit"], settings["threshold"], settings["ann"])
+        else:
+            rolesets = group_using_bert_by_verb(filtered_sentences, verb, settings["limit"], settings["threshold"], settings["ann"])
+
+        if settings["format"] == "xml":
+            write_xml_file(rolesets, verb, settings["output_dir"], settings["merge_dir"])
+        else:
+            write_file(rolesets, verb, settings["output_dir"])
+        return verb, len(filtered_sentences), len(rolesets), None
+    except Exception as error:
+        return verb, 0, 0, f"{type(error).__name__}: {error}"
+
+def read_manifest(output_dir: str, parameters: dict) -> dict:
+    """
+    Lê os verbos já concluídos de um lote anterior com os mesmos parâmetros. Com parâmetros diferentes (outro
+    corpus, método ou limiar), nada é reaproveitado.
+
+    Args:
+        output_dir (str): diretório de saída do lote.
+        parameters (dict): parâmetros do lote atual.
+    Returns:
+        dict: verbo -> {"sentencas": ..., "rolesets": ...} dos verbos concluídos.
+    """
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILE), "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("parametros") != parameters:
+        return {}
+    return manifest.get("verbos", {})
+
+def write_manifest(output_dir: str, parameters: dict, done: dict) -> None:
+    """
+    Grava o progresso do lote (escreve outro arquivo e o renomeia, para nunca deixar um arquivo pela metade).
+
+    Args:
+        output_dir (str): diretório de saída do lote.
+        parameters (dict): parâmetros do lote.
+        done (dict): verbo -> {"sentencas": ..., "rolesets": ...} dos verbos concluídos.
+    """
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump({"parametros": parameters, "verbos": done}, file, ensure_ascii=False, indent=1)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+def is_done(verb: str, done: dict, output_dir: str, file_format: str) -> bool:
+    """
+    Um verbo está concluído se está no progresso e o seu framefile ainda existe (verbos sem sentenças não têm arquivo).
+    """
+    return verb in done and (done[verb]["rolesets"] == 0 or os.path.isfile(framefile_path(verb, output_dir, file_format)))
+
+def run_batch(file_path: str, verbs: list, settings: dict, workers: int, restart: bool = False) -> dict:
+    """
+    Gera os framefiles de vários verbos: o corpus é lido uma vez e os verbos são divididos entre os workers. O
+    agrupamento por argumentos (Python puro) usa processos; os agrupamentos por BERT usam threads, que dividem um
+    só modelo e o armazenamento de vetores. O progresso fica em MANIFEST_FILE: executar de novo com os mesmos
+    parâmetros continua de onde o lote parou.
+
+    Args:
+        file_path (str): o caminho para o arquivo CONLL-U.
+        verbs (list): lemas dos verbos; todos os lemas com UPOS VERB, se vazio.
+        settings (dict): parâmetros do agrupamento (método, limite, limiar, ArgMs, índice aproximado, formato, diretório
+            de saída, diretório dos framesets a mesclar).
+        workers (int): quantidade de processos ou threads.
+        restart (bool): se True, ignora o progresso de um lote anterior.
+    Returns:
+        dict: verbo -> {"sentencas": ..., "rolesets": ...} de todos os verbos concluídos.
+    """
+    global _corpus
+    start_time = time.perf_counter()
+    _corpus = load_conllu(file_path)
+    index = _corpus.lemma_index()
+    verbs = list(dict.fromkeys(verb.strip().lower() for verb in verbs)) or index.lemmas_with_upos("VERB")
+
+    os.makedirs(settings["output_dir"], exist_ok=True)
+    # Os framefiles XML referenciam o frameset.dtd pelo nome: o Cornerstone o procura no mesmo diretório
+    dtd_path = os.path.join(settings["output_dir"], os.path.basename(FRAMESET_DTD))
+    if settings["format"] == "xml" and not os.path.isfile(dtd_path):
+        shutil.copyfile(FRAMESET_DTD, dtd_path)
+    parameters = {key: value for key, value in settings.items() if key != "output_dir"}
+    parameters["corpus"] = content_hash(file_path)
+    done = {} if restart else read_manifest(settings["output_dir"], parameters)
+    pending = [verb for verb in verbs if not is_done(verb, done, settings["output_dir"], settings["format"])]
+    print(f"Corpus carregado em {time.perf_counter() - start_time:.1f}s: {len(verbs) - len(pending)} verbos já concluídos, {len(pending)} a gerar")
+
+    # Verbos com mais sentenças primeiro, para nenhum worker ficar com um verbo grande sozinho no final
+    pending.sort(key=lambda verb: -len(index.sentences(verb, "VERB")))
+
+    if settings["method"] == "args":
+        context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+        pool = context.Pool(workers, initializer=init_worker, initargs=(file_path, logging.getLevelName(logging.getLogger().level)))
+    else:
+        pool = ThreadPool(workers)
+
+    completed, failed = len(verbs) - len(pending), []
+    unsaved, last_save = False, time.perf_counter()
+    # Ao sair do bloco (também com Ctrl+C), o pool é encerrado e os verbos na fila são descartados
+    with pool:
+        try:
+            for verb, sentence_count, roleset_count, error in pool.imap_unordered(partial(generate_framefile, settings=settings), pending):
+                completed += 1
+                if error is not None:
+                    failed.append(verb)
+                    print(f"[{completed}/{len(verbs)}] {verb}: erro: {error}")
+                    continue
+                done[verb] = {"sentencas": sentence_count, "rolesets": roleset_count}
+                unsaved = True
+                print(f"[{completed}/{len(verbs)}] {verb}: {sentence_count} sentenças, {roleset_count} rolesets")
+                if time.perf_counter() - last_save >= MANIFEST_SAVE_INTERVAL:
+                    write_manifest(settings["output_dir"], parameters, done)
+                    unsaved, last_save = False, time.perf_counter()
+        finally:
+            if unsaved:
+                write_manifest(settings["output_dir"], parameters, done)
+
+    if failed:
+        print(f"{len(failed)} verbos com erro (executar de novo tenta gerá-los outra vez): {', '.join(failed)}")
+    print(f"Lote concluído em {time.perf_counter() - start_time:.1f}s")
+    return done
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera, sem perguntas, os framefiles de vários verbos de um corpus CONLL-U.")
+    parser.add_argument("conllu", nargs="?", default="PBP-classic-complete.conllu", help="arquivo CONLL-U (padrão: PBP-classic-complete.conllu)")
+    parser.add_argument("--verbos", nargs="+", default=[], help="verbos (lemas) a gerar; todos os verbos do corpus, se omitido")
+    parser.add_argument("--verbos-arquivo", help="arquivo com um verbo por linha, em vez de --verbos")
+    parser.add_argument("--metodo", choices=METHODS, default="args", help="agrupamento: por argumentos, BERT [CLS] ou BERT do verbo (padrão: args)")
+    parser.add_argument("--limite", type=int, help="limite de sentenças por roleset (padrão: sem limite)")
+    parser.add_argument("--argm", action="store_true", help="considera os ArgMs para diferenciar os rolesets (método args)")
+    parser.add_argument("--limiar", type=float, default=0.9, help="limiar de similaridade do cosseno (métodos BERT, padrão: 0.9)")
+    parser.add_argument("--ann", action="store_true", help="usa o índice aproximado nos agrupamentos com BERT")
+    parser.add_argument("--formato", choices=FORMATS, default="txt", help="formato dos framefiles: texto ou XML do Cornerstone (padrão: txt)")
+    parser.add_argument("--mesclar", help="diretório de framesets XML existentes (como tools/cornerstone/Framefiles PB) a mesclar com os gerados (formato xml)")
+    parser.add_argument("--saida", default="framefiles", help="diretório dos framefiles e do progresso (padrão: framefiles)")
+    parser.add_argument("--workers", type=int, default=default_num_threads(), help="processos (args) ou threads (BERT) em paralelo")
+    parser.add_argument("--refazer", action="store_true", help="ignora o progresso de um lote anterior e gera todos os verbos")
+    parser.add_argument("--log", default="WARNING", choices=("DEBUG", "INFO", "WARNING"), help="nível das mensagens dos agrupamentos (DEBUG mostra cada sentença)")
+    arguments = parser.parse_args()
+    logging.basicConfig(level=arguments.log, format="%(message)s")
+
+    if arguments.limite is not None and arguments.limite <= 0:
+        parser.error("o limite deve ser maior que zero")
+    if not -1 <= arguments.limiar <= 1:
+        parser.error("o limiar deve estar entre -1 e 1")
+    if arguments.mesclar is not None and (arguments.formato != "xml" or not os.path.isdir(arguments.mesclar)):
+        parser.error("--mesclar precisa de --formato xml e de um diretório existente")
+
+    verbs = list(arguments.verbos)
+    if arguments.verbos_arquivo:
+        with open(arguments.verbos_arquivo, "r", encoding="utf-8") as file:
+            verbs += [line.strip() for line in file if line.strip()]
+
+    settings = {
+        "method": arguments.metodo,
+        "limit": arguments.limite,
+        "argm": arguments.argm,
+        "threshold": arguments.limiar,
+        "ann": arguments.ann,
+        "format": arguments.formato,
+        "output_dir": arguments.saida,
+        "merge_dir": arguments.mesclar and os.path.abspath(arguments.mesclar),
+    }
+    run_batch(arguments.conllu, verbs, settings, max(1, arguments.workers), arguments.refazer)
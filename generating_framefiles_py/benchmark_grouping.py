@@ -0,0 +1,200 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from sklearn.metrics import adjusted_rand_score
+from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
+
+from ann_index import IVFIndex
+from similarity_grouping import greedy_groups, threshold_components
+
+# Quantidades de sentenças de um verbo medidas por padrão (verbo raro, comum e muito frequente)
+DEFAULT_SIZES = (10, 1000, 10000)
+
+# Listas consultadas medidas no índice aproximado
+DEFAULT_PROBES = (1, 2, 4, 8, 16)
+
+# Sentenças sorteadas para medir a revocação das buscas do índice aproximado
+RECALL_QUERIES = 200
+
+# Acima disso, o laço original par a par levaria horas e não é medido
+MAX_ORIGINAL_SIZE = 1000
+
+def synthetic_vectors(size: int, dimension: int = 768, senses: int = 8, seed: int = 0) -> np.ndarray:
+    """
+    Gera vetores parecidos com os [CLS] do BERT: todos próximos de uma direção comum (similaridades altas entre
+    quaisquer sentenças), com alguns sentidos e ruído por sentença.
+
+    Args:
+        size (int): quantidade de sentenças.
+        dimension (int): tamanho dos vetores.
+        senses (int): quantidade de sentidos (centros).
+        seed (int): semente do gerador aleatório.
+    Returns:
+        np.ndarray: matriz float32 com um vetor por sentença.
+    """
+    generator = np.random.default_rng(seed)
+    common = generator.normal(size=dimension) * 3
+    centers = common + generator.normal(size=(senses, dimension))
+    labels = generator.integers(senses, size=size)
+    return (centers[labels] + generator.normal(scale=0.6, size=(size, dimension))).astype(np.float32)
+
+def original_greedy_groups(vectors: np.ndarray, similarity_threshold: float) -> list:
+    """
+    O agrupamento guloso como era feito em group_using_bert: um cosine_similarity por par de sentenças.
+
+    Args:
+        vectors (np.ndarray): um vetor por sentença.
+        similarity_threshold (float): valor para similaridade de cossenos, que vai de -1 a 1.
+    Returns:
+        list: grupos (listas de posições das sentenças), na ordem dos líderes.
+    """
+    grouped = []
+    used = [False] * len(vectors)
+    for i in range(len(vectors)):
+        if used[i]:
+            continue
+        group = [i]
+        used[i] = True
+        for j in range(i + 1, len(vectors)):
+            if not used[j]:
+                sim = cosine_similarity([vectors[i]], [vectors[j]])[0][0]
+                if sim >= similarity_threshold:
+                    group.append(j)
+                    used[j] = True
+        grouped.append(group)
+    return grouped
+
+def original_threshold_components(vectors: np.ndarray, similarity_threshold: float) -> list:
+    """
+    Os componentes conexos como eram calculados em group_using_bert_by_verb: matriz de similaridade inteira,
+    lista de adjacência preenchida par a par e busca em profundidade recursiva.
+
+    Args:
+        vectors (np.ndarray): um vetor por sentença.
+        similarity_threshold (float): valor mínimo para similaridade de cossenos, que vai de -1 a 1.
+    Returns:
+        list: grupos (listas de posições das sentenças).
+    """
+    similarity_matrix = cosine_similarity(vectors)
+    n = len(vectors)
+    adj = {i: [] for i in range(n)}
+    for i in range(n):
+        for j in range(i + 1, n):
+            if similarity_matrix[i][j] >= similarity_threshold:
+                adj[i].append(j)
+                adj[j].append(i)
+
+    visited = [False] * n
+    groups = []
+
+    def dfs(node, group):
+        visited[node] = True
+        group.append(node)
+        for neighbor in adj[node]:
+            if not visited[neighbor]:
+                dfs(neighbor, group)
+
+    for i in range(n):
+        if not visited[i]:
+            group = []
+            dfs(i, group)
+            groups.append(group)
+    return groups
+
+# Agrupamentos medidos: nome -> (implementação atual, implementação original)
+METHODS = {
+    "guloso (group_using_bert)": (greedy_groups, original_greedy_groups),
+    "componentes (group_using_bert_by_verb)": (threshold_components, original_threshold_components),
+}
+
+def measure(function, *arguments, **keyword_arguments) -> tuple:
+    """
+    Executa uma função e mede o tempo gasto.
+
+    Returns:
+        tuple: (resultado, segundos).
+    """
+    start = time.perf_counter()
+    result = function(*arguments, **keyword_arguments)
+    return result, time.perf_counter() - start
+
+def search_recall(vectors: np.ndarray, similarity_threshold: float, n_probe: int, seed: int = 0) -> float:
+    """
+    Mede a revocação das buscas do índice aproximado: a fração dos vizinhos verdadeiros (similaridade >= limiar)
+    de sentenças sorteadas que estão entre as candidatas que o índice compara com elas.
+
+    Args:
+        vectors (np.ndarray): um vetor por sentença.
+        similarity_threshold (float): limiar de similaridade do cosseno.
+        n_probe (int): listas do índice consultadas por busca.
+        seed (int): semente do sorteio das sentenças.
+    Returns:
+        float: fração dos vizinhos achados (1.0 se as sentenças sorteadas não têm vizinhos).
+    """
+    normalized = normalize(vectors.astype(np.float64))
+    index = IVFIndex.build(normalized, n_probe=n_probe)
+    queries = np.random.default_rng(seed).choice(len(vectors), min(len(vectors), RECALL_QUERIES), replace=False)
+    found = expected = 0
+    for query in queries.tolist():
+        neighbors = np.flatnonzero(normalized @ normalized[query] >= similarity_threshold)
+        neighbors = neighbors[neighbors != query]
+        expected += len(neighbors)
+        found += np.isin(neighbors, index.candidates(query)).sum()
+    return found / expected if expected else 1.0
+
+def group_labels(groups: list, size: int) -> np.ndarray:
+    """
+    Converte grupos (listas de posições) no grupo de cada sentença, para comparar agrupamentos.
+    """
+    labels = np.empty(size, dtype=np.int64)
+    for label, group in enumerate(groups):
+        labels[group] = label
+    return labels
+
+def compare_ann(sizes: list, similarity_threshold: float, senses: int, probes: list) -> None:
+    """
+    Compara os agrupamentos com o índice aproximado com os exatos: tempo, revocação das buscas e concordância
+    dos grupos (índice de Rand ajustado: 1.0 = mesmos grupos).
+    """
+    for name, function in (("guloso", greedy_groups), ("componentes", threshold_components)):
+        print(f"\n{name} com índice aproximado (IVF), {senses} sentidos")
+        print(f"{'sentenças':>10} {'n_probe':>8} {'grupos':>7} {'exato':>7} {'IVF (s)':>9} {'exato (s)':>10} {'revocação':>10} {'Rand aj.':>9}")
+        for size in sizes:
+            vectors = synthetic_vectors(size, senses=senses)
+            exact_groups, exact_elapsed = measure(function, vectors, similarity_threshold)
+            exact_labels = group_labels(exact_groups, size)
+            for n_probe in probes:
+                groups, elapsed = measure(function, vectors, similarity_threshold, use_ann=True, n_probe=n_probe)
+                recall = search_recall(vectors, similarity_threshold, n_probe)
+                agreement = adjusted_rand_score(exact_labels, group_labels(groups, size))
+                print(f"{size:>10} {n_probe:>8} {len(groups):>7} {len(exact_groups):>7} {elapsed:>9.3f} {exact_elapsed:>10.3f} {recall:>10.4f} {agreement:>9.4f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede os agrupamentos por similaridade dos modos BERT em vetores sintéticos.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=list(DEFAULT_SIZES), help="quantidades de sentenças medidas")
+    parser.add_argument("--limiar", type=float, default=0.9, help="limiar de similaridade do cosseno (padrão: 0.9)")
+    parser.add_argument("--ann", action="store_true", help="compara também o índice aproximado (IVF) com o agrupamento exato")
+    parser.add_argument("--sentidos", type=int, default=8, help="quantidade de sentidos dos vetores sintéticos (padrão: 8)")
+    parser.add_argument("--n-probe", type=int, nargs="+", default=list(DEFAULT_PROBES), help="listas consultadas medidas no índice aproximado")
+    arguments = parser.parse_args()
+
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 2 * MAX_ORIGINAL_SIZE))  # busca recursiva original
+
+    for name, (function, original_function) in METHODS.items():
+        print(f"\n{name}")
+        print(f"{'sentenças':>10} {'grupos':>7} {'atual (s)':>10} {'original (s)':>13} {'iguais':>7}")
+        for size in arguments.tamanhos:
+            vectors = synthetic_vectors(size, senses=arguments.sentidos)
+            groups, elapsed = measure(function, vectors, arguments.limiar)
+            if size <= MAX_ORIGINAL_SIZE:
+                original_groups, original_elapsed = measure(original_function, vectors, arguments.limiar)
+                print(f"{size:>10} {len(groups):>7} {elapsed:>10.4f} {original_elapsed:>13.4f} {str(groups == original_groups):>7}")
+            else:
+                print(f"{size:>10} {len(groups):>7} {elapsed:>10.4f} {'-':>13} {'-':>7}")
+
+    if arguments.ann:
+        compare_ann(arguments.tamanhos, arguments.limiar, arguments.sentidos, arguments.n_probe)
@@ -0,0 +1,142 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+import numpy as np
+import torch
+from transformers import AutoTokenizer, AutoModel
+
+# Modelo pré-treinado usado nos agrupamentos (BERTimbau base)
+MODEL_NAME = "neuralmind/bert-base-portuguese-cased"
+
+# Tamanho máximo (em tokens do BERT) de cada sentença; o restante é truncado
+MAX_LENGTH = 128
+
+# Quantidade de sentenças por passagem do modelo
+DEFAULT_BATCH_SIZE = 32
+
+# Um motor por modelo e por processo: carregar o BERT leva segundos e ocupa centenas de MB
+_engines = {}
+_engines_lock = threading.Lock()
+
+# Vazão de cada cálculo de embeddings (nível INFO); quem quiser o valor lê EmbeddingEngine.last_throughput
+logger = logging.getLogger(__name__)
+
+def default_num_threads() -> int:
+    """
+    Retorna a quantidade de threads das operações do PyTorch: os núcleos que este processo pode usar de fato
+    (num contêiner ou com afinidade restrita, são menos que os da máquina, que o PyTorch usa por padrão).
+
+    Returns:
+        int: quantidade de threads.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+class EmbeddingEngine:
+    """
+    Calcula os vetores do BERT de várias sentenças: o do token [CLS], que representa a sentença toda, e o do
+    token do verbo, numa mesma passagem do modelo. As sentenças são ordenadas pelo tamanho e passadas em lotes
+    com padding, então cada lote tem sentenças de tamanho parecido e pouco padding.
+    """
+
+    def __init__(self, model_name: str = MODEL_NAME, batch_size: int = DEFAULT_BATCH_SIZE, num_threads: Optional[int] = None):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.num_threads = num_threads or default_num_threads()
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name) # cria tokens a partir de frases
+        self.model = AutoModel.from_pretrained(model_name) # retorna embeddings dos tokens
+        self.model.eval()
+        self.last_throughput = None
+        self._lock = threading.Lock()  # várias threads (sessões do Streamlit, geração em lote) usam o mesmo motor
+
+    def embed(self, texts: list, verb_forms: Optional[list] = None, progress: Optional[Callable[[int, int], None]] = None) -> tuple:
+        """
+        Calcula os vetores [CLS] e do verbo de cada sentença. O modelo é usado por uma thread de cada vez, mas lote a
+        lote: chamadas de threads diferentes se alternam entre os lotes, em vez de uma esperar a outra terminar.
+
+        Args:
+            texts (list): textos das sentenças.
+            verb_forms (list): forma do verbo em cada sentença (a primeira ocorrência no texto é usada); se None,
+                só os vetores [CLS] interessam e o vetor do verbo é o próprio [CLS].
+            progress (Callable): chamada depois de cada lote com (sentenças calculadas, total); uma exceção levantada
+                por ela (por exemplo, um cancelamento) interrompe o cálculo.
+        Returns:
+            tuple: (vetores [CLS], vetores do verbo), duas matrizes float32 de uma linha por sentença, na ordem de texts.
+                Se o verbo não é encontrado nos tokens da sentença, o seu vetor é o [CLS].
+        """
+        hidden_size = self.model.config.hidden_size
+        cls_vectors = np.zeros((len(texts), hidden_size), dtype=np.float32)
+        verb_vectors = np.zeros((len(texts), hidden_size), dtype=np.float32)
+        if not texts:
+            return cls_vectors, verb_vectors
+
+        # Posição (em caracteres) do verbo no texto, como a sentença foi escrita
+        if verb_forms is None:
+            verb_char_indices = [-1] * len(texts)
+        else:
+            verb_char_indices = [text.lower().find(form.lower()) if form else -1 for text, form in zip(texts, verb_forms)]
+
+        # Ordena pelo tamanho em tokens, para cada lote ter pouco padding (o tokenizador também não pode ser usado
+        # por duas threads ao mesmo tempo)
+        with self._lock:
+            lengths = [len(ids) for ids in self.tokenizer(texts, truncation=True, max_length=MAX_LENGTH)["input_ids"]]
+        order = np.argsort(lengths, kind="stable")
+
+        start_time = time.perf_counter()
+        for batch_start in range(0, len(texts), self.batch_size):
+            batch = order[batch_start:batch_start + self.batch_size].tolist()
+            # Uma passagem de cada vez (o modelo já usa todos os núcleos)
+            with self._lock:
+                previous_threads = torch.get_num_threads()
+                torch.set_num_threads(self.num_threads)
+                try:
+                    with torch.inference_mode(): # sem gradientes nem controle de versões dos tensores
+                        encoded = self.tokenizer(
+                            [texts[i] for i in batch],
+                            return_tensors="pt",
+                            truncation=True,
+                            max_length=MAX_LENGTH,
+                            padding=True,
+                            return_offsets_mapping=True
+                        )
+                        offsets = encoded.pop("offset_mapping").tolist()  # O modelo não aceita o offset
+                        hidden = self.model(**encoded).last_hidden_state.numpy()
+                finally:
+                    torch.set_num_threads(previous_threads)
+
+            # Token do BERT que contém o início do verbo (os tokens especiais e o padding têm offset (0, 0))
+            verb_token_indices = []
+            for row, i in enumerate(batch):
+                verb_token_indices.append(next(
+                    (token for token, (start, end) in enumerate(offsets[row]) if start <= verb_char_indices[i] < end), 0
+                ))
+            cls_vectors[batch] = hidden[:, 0, :]
+            verb_vectors[batch] = hidden[np.arange(len(batch)), verb_token_indices, :]
+            if progress is not None:
+                progress(batch_start + len(batch), len(texts))
+
+        elapsed = time.perf_counter() - start_time
+        self.last_throughput = len(texts) / elapsed if elapsed > 0 else float("inf")
+        logger.info(
+            "Embeddings de %d sentenças em %.2fs (%.1f sentenças/s, %d threads)",
+            len(texts), elapsed, self.last_throughput, self.num_threads
+        )
+        return cls_vectors, verb_vectors
+
+def get_engine(model_name: str = MODEL_NAME) -> EmbeddingEngine:
+    """
+    Retorna o motor de embeddings de um modelo, carregando o modelo só na primeira chamada do processo.
+
+    Args:
+        model_name (str): nome (ou caminho) do modelo pré-treinado.
+    Returns:
+        EmbeddingEngine: o motor do modelo.
+    """
+    with _engines_lock:
+        if model_name not in _engines:
+            _engines[model_name] = EmbeddingEngine(model_name)
+        return _engines[model_name]
@@ -0,0 +1,392 @@
+import io
+import os
+from array import array
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from argument_table import ArgumentTable
+from corpus_cache import CACHE_DIR, content_hash, new_entry, open_entry, publish_entry
+from lemma_index import LemmaIndex, index_path_for, source_fingerprint
+
+# Colunas do CONLL-U guardadas no armazenamento colunar (as demais não são usadas pelos agrupamentos)
+COLUMNS = ("id", "form", "lemma", "upos", "head", "deprel", "misc")
+
+# Posição de cada coluna guardada numa linha de token do CONLL-U
+COLUMN_POSITIONS = {"id": 0, "form": 1, "lemma": 2, "upos": 3, "head": 6, "deprel": 7, "misc": 9}
+
+# Quantidade de tokens acumulados antes de passá-los para os vetores das colunas
+PENDING_LIMIT = 1 << 16
+
+# Arquivos de uma entrada do cache: tokens (uma coluna por coluna do CONLL-U), tabela de strings, sentenças, índice
+# e tabela de argumentos
+CACHE_FILES = {
+    "tokens": "tokens.arrow", "strings": "strings.arrow", "sentences": "sentences.arrow",
+    "index": "lemma_index.npz", "arguments": "arguments.npz",
+}
+
+def iter_conllu_sentences(file_path) -> Iterator[tuple]:
+    """
+    Lê um arquivo CONLL-U sob demanda, devolvendo uma sentença de cada vez, sem carregar o arquivo inteiro.
+    Aceita tanto caminho do arquivo (str) quanto objeto de arquivo (Streamlit UploadedFile).
+
+    Args:
+        file_path (str): o caminho para o arquivo CONLL-U, ou um objeto de arquivo binário.
+    Yields:
+        tuple: (sent_id, text, tokens) de cada sentença, em que tokens é a lista das colunas (lista de str) de cada token.
+    """
+    # Arquivo em memória (tem método 'read'), como o do Streamlit: lido como texto sem copiar o conteúdo
+    if hasattr(file_path, "read"):
+        if file_path.seekable():
+            file_path.seek(0)
+        lines = io.TextIOWrapper(file_path, encoding="utf-8")
+    else:
+        lines = open(file_path, "r", encoding="utf-8")
+
+    try:
+        sent_id, text, tokens = "", "", []
+        for line in lines:
+            line = line.strip()
+            if line == "":
+                if tokens:
+                    yield sent_id, text, tokens
+                    sent_id, text, tokens = "", "", []
+            elif line[0] == "#":  # Comentários: só sent_id e text interessam
+                if line.startswith("# sent_id"):
+                    sent_id = line.split(" = ")[1]
+                elif line.startswith("# text"):
+                    text = line.split(" = ")[1]
+            else:
+                parts = line.split("\t")
+                if len(parts) >= 10:
+                    tokens.append(parts)
+        # Última sentença, se o arquivo não termina com linha em branco
+        if tokens:
+            yield sent_id, text, tokens
+    finally:
+        if isinstance(lines, io.TextIOWrapper) and hasattr(file_path, "read"):
+            lines.detach()  # Não fecha o arquivo de quem chamou
+        else:
+            lines.close()
+
+class ConlluStore:
+    """
+    Armazenamento colunar dos tokens de um corpus CONLL-U. Cada coluna (id, form, lemma, upos, head, deprel, misc)
+    é um vetor de códigos inteiros que apontam para uma tabela única de strings, então cada string distinta do
+    corpus é guardada uma só vez. Os tokens da sentença i ocupam as posições [sentence_offsets[i], sentence_offsets[i + 1]).
+    """
+
+    def __init__(self):
+        self._codes = {}  # string -> código (na ordem de inserção, então o código é a posição na tabela)
+        self._strings = []
+        self.columns = {column: array("i") for column in COLUMNS}
+        self._pending = {column: [] for column in COLUMNS}  # códigos ainda não passados para os vetores
+        self.sentence_offsets = array("I", [0])
+        self.sent_ids = []
+        self.texts = []
+        self._lowercase_lemmas = None
+        self.index = None
+        self.arguments = None
+
+    def intern(self, value: str) -> int:
+        """
+        Retorna o código de uma string na tabela, acrescentando-a se ainda não existe.
+
+        Args:
+            value (str): a string a ser guardada.
+        Returns:
+            int: o código da string.
+        """
+        return self._codes.setdefault(value, len(self._codes))
+
+    @property
+    def strings(self) -> list:
+        """
+        Tabela de strings (código -> string), refeita só quando novas strings foram guardadas.
+        """
+        if len(self._strings) != len(self._codes):
+            self._strings = list(self._codes)
+        return self._strings
+
+    def add_sentence(self, sent_id: str, text: str, tokens: list) -> None:
+        """
+        Acrescenta uma sentença ao final do armazenamento.
+
+        Args:
+            sent_id (str): identificador da sentença.
+            text (str): texto da sentença.
+            tokens (list): lista das colunas (lista de str) de cada token, como na linha do CONLL-U.
+        """
+        codes = self._codes
+        values_by_position = list(zip(*tokens))
+        for column, position in COLUMN_POSITIONS.items():
+            values = values_by_position[position]
+            column_codes = list(map(codes.get, values))  # quase todas as strings já estão na tabela
+            if None in column_codes:
+                column_codes = [codes.setdefault(value, len(codes)) for value in values]
+            self._pending[column] += column_codes
+        if len(self._pending["id"]) >= PENDING_LIMIT:
+            self._flush()
+        self.sentence_offsets.append(self.sentence_offsets[-1] + len(tokens))
+        self.sent_ids.append(sent_id)
+        self.texts.append(text)
+        self._lowercase_lemmas = None
+
+    def _flush(self) -> None:
+        # Passa os códigos pendentes para os vetores em blocos (estender um array a cada sentença é lento)
+        if self._pending["id"]:
+            for column, codes in self._pending.items():
+                self.columns[column].extend(codes)
+                codes.clear()
+
+    @classmethod
+    def from_conllu(cls, file_path) -> "ConlluStore":
+        """
+        Monta o armazenamento a partir de um arquivo CONLL-U, lido sentença a sentença.
+
+        Args:
+            file_path (str): o caminho para o arquivo CONLL-U, ou um objeto de arquivo binário.
+        Returns:
+            ConlluStore: o armazenamento com todas as sentenças do arquivo.
+        """
+        store = cls()
+        for sent_id, text, tokens in iter_conllu_sentences(file_path):
+            store.add_sentence(sent_id, text, tokens)
+        store._flush()
+        return store
+
+    def __len__(self) -> int:
+        return len(self.sent_ids)
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Retorna os códigos de uma coluna como vetor do NumPy, sem cópia.
+
+        Args:
+            name (str): nome da coluna (id, form, lemma, upos, head, deprel ou misc).
+        Returns:
+            np.ndarray: vetor de códigos (int32), um por token do corpus.
+        """
+        self._flush()
+        return np.frombuffer(self.columns[name], dtype=np.int32)
+
+    def sentence_tokens(self, index: int) -> list:
+        """
+        Monta os tokens de uma sentença no formato de dicionários usado pelos agrupamentos.
+
+        Args:
+            index (int): posição da sentença no armazenamento.
+        Returns:
+            list: um dicionário (coluna -> valor) por token.
+        """
+        self._flush()
+        start, end = self.sentence_offsets[index], self.sentence_offsets[index + 1]
+        values = [[self.strings[code] for code in self.columns[column][start:end]] for column in COLUMNS]
+        return [dict(zip(COLUMNS, token_values)) for token_values in zip(*values)]
+
+    def _lowercase_lemma_codes(self) -> np.ndarray:
+        # Código do lema em minúsculas de cada token, calculado uma vez por tabela de strings
+        if self._lowercase_lemmas is None:
+            lowercase_codes = np.array([self.intern(string.lower()) for string in list(self.strings)], dtype=np.int32)
+            self._lowercase_lemmas = lowercase_codes[self.column("lemma")]
+        return self._lowercase_lemmas
+
+    def lemma_index(self) -> LemmaIndex:
+        """
+        Retorna o índice invertido (lema em minúsculas, UPOS) -> tokens e sentenças, montando-o se ainda não existe
+        ou se o armazenamento recebeu sentenças depois de montado.
+
+        Returns:
+            LemmaIndex: o índice dos tokens do armazenamento.
+        """
+        total_tokens = self.sentence_offsets[-1]
+        if self.index is None or len(self.index.token_positions) != total_tokens:
+            lowercase_lemmas = self._lowercase_lemma_codes()
+            self.index = LemmaIndex.build(
+                lowercase_lemmas, self.column("upos"), self.strings, np.frombuffer(self.sentence_offsets, dtype=np.uint32)
+            )
+        return self.index
+
+    def argument_table(self) -> ArgumentTable:
+        """
+        Retorna a tabela das anotações Arg* do MISC, montando-a se ainda não existe ou se o armazenamento recebeu
+        sentenças depois de montada.
+
+        Returns:
+            ArgumentTable: a tabela de argumentos do armazenamento.
+        """
+        if self.arguments is None or len(self.arguments.starts) != len(self.sentence_offsets):
+            self.arguments = ArgumentTable.build(
+                self.column("misc"), self.column("id"), self.strings, np.frombuffer(self.sentence_offsets, dtype=np.uint32)
+            )
+        return self.arguments
+
+    def verb_occurrences(self, chosen_verb: str) -> np.ndarray:
+        """
+        Retorna as posições (no corpus) dos tokens do verbo escolhido (lema em minúsculas, com UPOS VERB).
+
+        Args:
+            chosen_verb (str): lema do verbo, em minúsculas.
+        Returns:
+            np.ndarray: posições dos tokens, em ordem.
+        """
+        return self.lemma_index().tokens(chosen_verb, "VERB").astype(np.int64)
+
+    def sentences_with_verb(self, chosen_verb: str) -> np.ndarray:
+        """
+        Encontra as sentenças que têm o verbo escolhido (lema em minúsculas, com UPOS VERB) pelo índice invertido.
+
+        Args:
+            chosen_verb (str): lema do verbo, em minúsculas.
+        Returns:
+            np.ndarray: posições das sentenças encontradas, em ordem.
+        """
+        return self.lemma_index().sentences(chosen_verb, "VERB")
+
+    def to_dataframe(self, sentence_indices: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Monta o dataframe de sentenças (sent_id, text, tokens) usado pelos agrupamentos, só para as sentenças pedidas.
+
+        Args:
+            sentence_indices (np.ndarray): posições das sentenças; todas, se None.
+        Returns:
+            pd.DataFrame: uma linha por sentença, indexada pela posição da sentença no armazenamento.
+        """
+        if sentence_indices is None:
+            sentence_indices = np.arange(len(self))
+        sentence_indices = np.asarray(sentence_indices, dtype=np.int64)
+
+        # Posições de todos os tokens das sentenças pedidas, e as strings de cada coluna num só passo
+        offsets = np.frombuffer(self.sentence_offsets, dtype=np.uint32).astype(np.int64)
+        starts, ends = offsets[sentence_indices], offsets[sentence_indices + 1]
+        lengths = ends - starts
+        token_positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        strings = np.array(self.strings, dtype=object)
+        values = [strings[self.column(column)[token_positions]].tolist() for column in COLUMNS]
+        all_tokens = [
+            {"id": token_id, "form": form, "lemma": lemma, "upos": upos, "head": head, "deprel": deprel, "misc": misc}
+            for token_id, form, lemma, upos, head, deprel, misc in zip(*values)
+        ]
+
+        bounds = np.concatenate(([0], np.cumsum(lengths))).tolist()
+        return pd.DataFrame(
+            {
+                "sent_id": [self.sent_ids[index] for index in sentence_indices.tolist()],
+                "text": [self.texts[index] for index in sentence_indices.tolist()],
+                "tokens": [all_tokens[bounds[i]:bounds[i + 1]] for i in range(len(sentence_indices))],
+            },
+            index=sentence_indices.tolist(),
+        )
+
+    def filter_by_verb(self, chosen_verb: str) -> pd.DataFrame:
+        """
+        Retorna o dataframe só com as sentenças que contêm o verbo escolhido.
+
+        Args:
+            chosen_verb (str): lema do verbo, em minúsculas.
+        Returns:
+            pd.DataFrame: sentenças filtradas que contêm o verbo chosen_verb.
+        """
+        return self.to_dataframe(self.sentences_with_verb(chosen_verb))
+
+    def save_arrow(self, directory: str) -> None:
+        """
+        Grava o armazenamento (e o índice de lemas e a tabela de argumentos, se já montados) em arquivos Arrow IPC sem compressão,
+        que são lidos de volta mapeando o arquivo na memória, sem reinterpretar texto.
+
+        Args:
+            directory (str): diretório (já existente) onde os arquivos são gravados.
+        """
+        tables = {
+            "tokens": pa.table({column: self.column(column) for column in COLUMNS}),
+            "strings": pa.table({"string": pa.array(self.strings, type=pa.string())}),
+            "sentences": pa.table({
+                "sent_id": pa.array(self.sent_ids, type=pa.string()),
+                "text": pa.array(self.texts, type=pa.string()),
+                "start": np.frombuffer(self.sentence_offsets, dtype=np.uint32)[:-1],
+            }),
+        }
+        for name, table in tables.items():
+            with pa.OSFile(os.path.join(directory, CACHE_FILES[name]), "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+        if self.index is not None:
+            self.index.save(os.path.join(directory, CACHE_FILES["index"]), [])
+        if self.arguments is not None:
+            self.arguments.save(os.path.join(directory, CACHE_FILES["arguments"]))
+
+    @classmethod
+    def load_arrow(cls, directory: str) -> "ConlluStore":
+        """
+        Lê um armazenamento gravado com save_arrow.
+
+        Args:
+            directory (str): diretório dos arquivos gravados.
+        Returns:
+            ConlluStore: o armazenamento, com o índice de lemas e a tabela de argumentos se eles foram gravados junto.
+        """
+        def read_table(name):
+            with pa.memory_map(os.path.join(directory, CACHE_FILES[name])) as source:
+                return pa.ipc.open_file(source).read_all().combine_chunks()
+
+        store = cls()
+        store._strings = read_table("strings").column("string").to_pylist()
+        store._codes = dict(zip(store._strings, range(len(store._strings))))
+        tokens = read_table("tokens")
+        for column in COLUMNS:
+            store.columns[column].frombytes(tokens.column(column).to_numpy().view(np.uint8))
+        sentences = read_table("sentences")
+        store.sent_ids = sentences.column("sent_id").to_pylist()
+        store.texts = sentences.column("text").to_pylist()
+        store.sentence_offsets.frombytes(sentences.column("start").to_numpy()[1:].view(np.uint8))
+        store.sentence_offsets.append(tokens.num_rows)
+        store.index = LemmaIndex.load(os.path.join(directory, CACHE_FILES["index"]), [])
+        store.arguments = ArgumentTable.load(os.path.join(directory, CACHE_FILES["arguments"]))
+        return store
+
+def load_conllu(file_path, cache_dir: Optional[str] = CACHE_DIR) -> ConlluStore:
+    """
+    Carrega um arquivo CONLL-U no armazenamento colunar, já com o índice invertido de lemas e a tabela de argumentos.
+    Aceita tanto caminho do arquivo (str) quanto objeto de arquivo (Streamlit UploadedFile). O corpus lido fica
+    no cache, identificado pelo hash do conteúdo: enquanto o arquivo não muda, as próximas cargas só leem os
+    arquivos Arrow do cache; quando muda, o hash é outro e o arquivo é lido de novo.
+    Sem cache, o índice de um caminho é gravado ao lado do .conllu e reaproveitado enquanto o arquivo não mudar.
+
+    Args:
+        file_path (str): o caminho para o arquivo CONLL-U do qual se extrairão os dados.
+        cache_dir (str): diretório do cache; None para ler sempre o arquivo.
+    Returns:
+        ConlluStore: armazenamento colunar com as sentenças e os tokens do arquivo.
+    """
+    if cache_dir is not None:
+        digest = content_hash(file_path, cache_dir)
+        entry = open_entry(digest, cache_dir)
+        if entry is not None:
+            store = ConlluStore.load_arrow(entry)
+            store.lemma_index()  # Só monta o índice se a entrada não o trouxe
+            if store.arguments is None:  # entrada gravada antes da tabela de argumentos: completa a entrada
+                store.argument_table().save(os.path.join(entry, CACHE_FILES["arguments"]))
+            return store
+
+        store = ConlluStore.from_conllu(file_path)
+        store.lemma_index()
+        store.argument_table()
+        temporary_entry = new_entry(digest, cache_dir)
+        store.save_arrow(temporary_entry)
+        publish_entry(temporary_entry, digest, cache_dir)
+        return store
+
+    store = ConlluStore.from_conllu(file_path)
+    store.argument_table()
+    if hasattr(file_path, "read"):
+        store.lemma_index()
+        return store
+
+    fingerprint = source_fingerprint(file_path)
+    store.index = LemmaIndex.load(index_path_for(file_path), fingerprint)
+    if store.index is None or len(store.index.token_positions) != store.sentence_offsets[-1]:
+        store.index = None
+        store.lemma_index().save(index_path_for(file_path), fingerprint)
+    return store
@@ -0,0 +1,210 @@
+import os
+import re
+import xml.etree.ElementTree as ET
+from typing import Iterable, Iterator, TextIO, Union
+from xml.sax.saxutils import escape, quoteattr
+
+# frameset.dtd do Cornerstone: os framefiles XML o referenciam pelo nome, então ele fica no mesmo diretório deles
+FRAMESET_DTD = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "tools", "cornerstone", "Framefiles PB", "frameset.dtd")
+
+# Indentação por nível, como nos framefiles do Cornerstone
+INDENT = "    "
+
+# Rótulos dos papéis: numerados (Arg0, Arg1, ..., ArgA) e modificadores (ArgM, ArgM-tmp, ArgM-loc, ...)
+NUMBERED_ROLE = re.compile(r"Arg([0-9]+|A)$")
+MODIFIER_ROLE = re.compile(r"ArgM(?:-(.+))?$")
+
+# Rótulo do verbo nos argumentos dos exemplos (elemento rel)
+REL_LABEL = "Rel"
+
+def role_attributes(label: str, modifier_n: str = "M") -> tuple:
+    """
+    Converte o rótulo de um papel (Arg0, ArgM-tmp...) nos atributos n e f do frameset.dtd.
+
+    Args:
+        label (str): rótulo do papel.
+        modifier_n (str): n dos modificadores: "M" nos papéis do roleset e "m" nos argumentos dos exemplos, como nos
+            framefiles do Cornerstone.
+    Returns:
+        tuple: (n, f); ("", "") se o rótulo não é um papel do PropBank (o rótulo vai então na descrição do papel).
+    """
+    numbered = NUMBERED_ROLE.match(label)
+    if numbered:
+        return numbered.group(1), ""
+    modifier = MODIFIER_ROLE.match(label)
+    if modifier:
+        return modifier_n, modifier.group(1) or ""
+    return "", ""
+
+def role_label(n: str, f: str = "", descr: str = "") -> str:
+    """
+    Converte os atributos n e f de um papel ou argumento do frameset.dtd no rótulo usado nos rolesets (inverso de
+    role_attributes).
+
+    Args:
+        n (str): número do papel (0, 1, ..., A) ou M/m nos modificadores.
+        f (str): etiqueta de função (tmp, loc...).
+        descr (str): descrição do papel, usada como rótulo quando n não é um papel do PropBank.
+    Returns:
+        str: o rótulo (Arg0, ArgM-tmp...).
+    """
+    if n.isdigit() or n == "A":
+        return f"Arg{n}"
+    if n in ("m", "M"):
+        return f"ArgM-{f}" if f else "ArgM"
+    return descr or n
+
+def attributes(**values) -> str:
+    """
+    Escreve atributos XML em ordem alfabética, como nos framefiles do Cornerstone.
+    """
+    return "".join(f" {name}={quoteattr(value)}" for name, value in sorted(values.items()))
+
+class FramesetWriter:
+    """
+    Escreve um frameset (framefile XML do Cornerstone, no formato do frameset.dtd) aos poucos: cada roleset vai para
+    o arquivo assim que é recebido, sem montar o documento inteiro em memória. Use com 'with', ou chame close ao final.
+    """
+
+    def __init__(self, file: TextIO):
+        self.file = file
+        self.lemma = None  # predicado aberto
+        file.write('<!DOCTYPE frameset SYSTEM "frameset.dtd">\n<frameset>\n')
+
+    def __enter__(self) -> "FramesetWriter":
+        return self
+
+    def __exit__(self, *exception) -> None:
+        self.close()
+
+    def start_predicate(self, lemma: str) -> None:
+        """
+        Abre o predicado de um lema (fechando o anterior); os rolesets seguintes ficam dentro dele.
+        """
+        self.end_predicate()
+        self.file.write(f"{INDENT}<predicate{attributes(lemma=lemma)}>\n")
+        self.lemma = lemma
+
+    def end_predicate(self) -> None:
+        if self.lemma is not None:
+            self.file.write(f"{INDENT}</predicate>\n")
+            self.lemma = None
+
+    def write_roleset(self, roleset_id: str, name: str, roles: Iterable[str], examples: Iterable[tuple]) -> None:
+        """
+        Escreve um roleset no predicado aberto.
+
+        Args:
+            roleset_id (str): id do roleset no frameset (lema.01, lema.02...).
+            name (str): nome (descrição do sentido) do roleset.
+            roles (Iterable[str]): rótulos dos papéis (Arg0, ArgM-tmp...).
+            examples (Iterable[tuple]): exemplos como (sentença, argumentos), com os argumentos como pares (rótulo,
+                texto); o rótulo Rel é o verbo.
+        """
+        write = self.file.write
+        write(f"{INDENT * 2}<roleset{attributes(id=roleset_id, name=name)}>\n")
+        write(f"{INDENT * 3}<roles>\n")
+        for role in roles:
+            n, f = role_attributes(role)
+            descr = "" if n else role
+            write(f"{INDENT * 4}<role{attributes(descr=descr, n=n, **({'f': f} if f else {}))}/>\n")
+        write(f"{INDENT * 3}</roles>\n")
+
+        for sentence, arguments in examples:
+            write(f"{INDENT * 3}<example>\n")
+            write(f"{INDENT * 4}<text>{escape(sentence)}</text>\n")
+            for label, text in arguments:
+                if label == REL_LABEL:
+                    write(f"{INDENT * 4}<rel{attributes(f='')}>{escape(text)}</rel>\n")
+                    continue
+                n, f = role_attributes(label, modifier_n="m")
+                write(f"{INDENT * 4}<arg{attributes(f=f, n=n or label)}>{escape(text)}</arg>\n")
+            write(f"{INDENT * 3}</example>\n")
+        write(f"{INDENT * 2}</roleset>\n")
+
+    def write_element(self, element: ET.Element, level: int = 2) -> None:
+        """
+        Escreve um elemento lido de outro frameset (iter_frameset) sem alterações: um roleset ou uma nota no predicado
+        aberto (nível 2) ou uma nota do próprio frameset (nível 1, depois de fechar o predicado).
+        """
+        if level == 1:
+            self.end_predicate()
+        ET.indent(element, space=INDENT, level=level)
+        element.tail = None
+        self.file.write(INDENT * level + ET.tostring(element, encoding="unicode") + "\n")
+
+    def close(self) -> None:
+        self.end_predicate()
+        self.file.write("</frameset>\n")
+
+def iter_frameset(source: Union[str, TextIO]) -> Iterator[tuple]:
+    """
+    Lê um frameset aos poucos (iterparse), na ordem do arquivo: a abertura de cada predicado e cada filho do frameset
+    e dos predicados (rolesets e notas). Cada filho é devolvido assim que termina e retirado da árvore, então a
+    memória usada não cresce com o tamanho do arquivo.
+
+    Args:
+        source (Union[str, TextIO]): caminho ou arquivo do frameset.
+    Yields:
+        tuple: (tipo, lema do predicado, elemento): ("predicate", lema, None) ao abrir um predicado, ("roleset", lema,
+            roleset) e ("note", lema, nota); o lema é None nas notas do próprio frameset.
+    """
+    parents = []  # elementos abertos, do frameset ao atual
+    for event, element in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            parents.append(element)
+            if len(parents) == 2 and element.tag == "predicate":
+                yield "predicate", element.get("lemma", ""), None
+            continue
+        parents.pop()
+        if len(parents) == 1 and element.tag in ("note", "predicate"):
+            parents[0].remove(element)
+            if element.tag == "note":
+                yield "note", None, element
+        elif len(parents) == 2 and parents[1].tag == "predicate" and element.tag in ("note", "roleset"):
+            parents[1].remove(element)
+            yield element.tag, parents[1].get("lemma", ""), element
+
+def iter_rolesets(source: Union[str, TextIO]) -> Iterator[tuple]:
+    """
+    Lê só os rolesets de um frameset aos poucos (veja iter_frameset).
+
+    Args:
+        source (Union[str, TextIO]): caminho ou arquivo do frameset.
+    Yields:
+        tuple: (lema do predicado, elemento do roleset).
+    """
+    for kind, lemma, element in iter_frameset(source):
+        if kind == "roleset":
+            yield lemma, element
+
+def roleset_number(roleset_id: str) -> int:
+    """
+    Retorna o número de um id de roleset (abafar.01 -> 1), ou 0 se o id não termina em número.
+    """
+    suffix = roleset_id.rsplit(".", 1)[-1]
+    return int(suffix) if suffix.isdigit() else 0
+
+def roleset_contents(element: ET.Element) -> tuple:
+    """
+    Extrai de um roleset lido (iter_rolesets) o que os rolesets do gerador guardam.
+
+    Args:
+        element (ET.Element): elemento roleset.
+    Returns:
+        tuple: (id, nome, rótulos dos papéis, exemplos como (sentença, argumentos como pares (rótulo, texto))).
+    """
+    roles = [
+        role_label(role.get("n", ""), role.get("f", ""), role.get("descr", ""))
+        for role in element.iterfind("roles/role")
+    ]
+    examples = []
+    for example in element.iterfind("example"):
+        arguments = []
+        for child in example:
+            if child.tag == "rel":
+                arguments.append((REL_LABEL, (child.text or "").strip()))
+            elif child.tag == "arg":
+                arguments.append((role_label(child.get("n", ""), child.get("f", "")), (child.text or "").strip()))
+        examples.append(((example.findtext("text") or "").strip(), arguments))
+    return element.get("id", ""), element.get("name", ""), roles, examples
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import shutil
+from typing import Optional
+
+# Diretório do cache do corpus já lido (ao lado deste módulo, para não depender do diretório de execução)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".conllu_cache")
+
+# Versão do formato das entradas: mudar o formato do armazenamento colunar invalida as entradas antigas
+CACHE_FORMAT = 1
+
+# Quantidade máxima de entradas guardadas (arquivos enviados pela interface não têm caminho para substituir)
+CACHE_MAX_ENTRIES = 4
+
+# Arquivo com o hash do conteúdo de cada caminho já lido, junto do tamanho e da data de modificação
+HASHES_FILE = "hashes.json"
+
+# Tamanho dos blocos lidos para calcular o hash de um arquivo
+HASH_BLOCK_SIZE = 1 << 20
+
+def content_hash(file_path, cache_dir: str = CACHE_DIR) -> str:
+    """
+    Calcula o hash (SHA-256) do conteúdo de um arquivo CONLL-U. Para um caminho, o hash já calculado é
+    reaproveitado enquanto o tamanho e a data de modificação do arquivo forem os mesmos.
+
+    Args:
+        file_path (str): o caminho para o arquivo CONLL-U, ou um objeto de arquivo binário.
+        cache_dir (str): diretório do cache.
+    Returns:
+        str: o hash do conteúdo, em hexadecimal.
+    """
+    if hasattr(file_path, "read"):
+        if hasattr(file_path, "getbuffer"):  # Arquivo em memória (Streamlit UploadedFile): sem copiar o conteúdo
+            with file_path.getbuffer() as buffer:
+                return hashlib.sha256(buffer).hexdigest()
+        file_path.seek(0)
+        digest = hashlib.sha256()
+        for block in iter(lambda: file_path.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+        return digest.hexdigest()
+
+    hashes = _read_hashes(cache_dir)
+    key = os.path.abspath(file_path)
+    status = os.stat(file_path)
+    saved = hashes.get(key)
+    if saved is not None and saved[:2] == [status.st_size, status.st_mtime_ns]:
+        return saved[2]
+
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    hashes[key] = [status.st_size, status.st_mtime_ns, digest.hexdigest()]
+    _write_hashes(cache_dir, hashes)
+
+    # O conteúdo desse caminho mudou: a entrada do conteúdo anterior não serve mais (a não ser para outro caminho)
+    if saved is not None and saved[2] != digest.hexdigest() and all(other[2] != saved[2] for other in hashes.values()):
+        shutil.rmtree(entry_path(saved[2], cache_dir), ignore_errors=True)
+    return digest.hexdigest()
+
+def entry_path(digest: str, cache_dir: str = CACHE_DIR) -> str:
+    """
+    Retorna o diretório da entrada do cache de um conteúdo.
+
+    Args:
+        digest (str): hash do conteúdo do arquivo CONLL-U.
+        cache_dir (str): diretório do cache.
+    Returns:
+        str: caminho do diretório da entrada.
+    """
+    return os.path.join(cache_dir, f"{digest}.v{CACHE_FORMAT}")
+
+def open_entry(digest: str, cache_dir: str = CACHE_DIR) -> Optional[str]:
+    """
+    Retorna o diretório da entrada de um conteúdo, se ela existe, marcando-a como usada agora.
+
+    Args:
+        digest (str): hash do conteúdo do arquivo CONLL-U.
+        cache_dir (str): diretório do cache.
+    Returns:
+        Optional[str]: caminho do diretório da entrada, ou None se o conteúdo não está no cache.
+    """
+    path = entry_path(digest, cache_dir)
+    if not os.path.isdir(path):
+        return None
+    os.utime(path)  # As entradas usadas há mais tempo são as primeiras a sair
+    return path
+
+def new_entry(digest: str, cache_dir: str = CACHE_DIR) -> str:
+    """
+    Cria um diretório temporário onde uma entrada é gravada antes de ser publicada com publish_entry.
+
+    Args:
+        digest (str): hash do conteúdo do arquivo CONLL-U.
+        cache_dir (str): diretório do cache.
+    Returns:
+        str: caminho do diretório temporário.
+    """
+    temporary_path = f"{entry_path(digest, cache_dir)}.tmp-{os.getpid()}"
+    shutil.rmtree(temporary_path, ignore_errors=True)
+    os.makedirs(temporary_path)
+    return temporary_path
+
+def publish_entry(temporary_path: str, digest: str, cache_dir: str = CACHE_DIR) -> None:
+    """
+    Troca de uma vez o diretório temporário pela entrada final, então uma entrada pela metade nunca é lida,
+    e remove as entradas usadas há mais tempo além de CACHE_MAX_ENTRIES.
+
+    Args:
+        temporary_path (str): diretório temporário criado por new_entry.
+        digest (str): hash do conteúdo do arquivo CONLL-U.
+        cache_dir (str): diretório do cache.
+    """
+    try:
+        os.replace(temporary_path, entry_path(digest, cache_dir))
+    except OSError:  # Outra execução gravou a mesma entrada antes
+        shutil.rmtree(temporary_path, ignore_errors=True)
+
+    entries = [
+        os.path.join(cache_dir, name) for name in os.listdir(cache_dir)
+        if name.endswith(f".v{CACHE_FORMAT}") and os.path.isdir(os.path.join(cache_dir, name))
+    ]
+    entries.sort(key=os.path.getmtime, reverse=True)
+    for old_entry in entries[CACHE_MAX_ENTRIES:]:
+        shutil.rmtree(old_entry, ignore_errors=True)
+
+def _read_hashes(cache_dir: str) -> dict:
+    # Hashes já calculados: caminho -> [tamanho, data de modificação, hash]
+    path = os.path.join(cache_dir, HASHES_FILE)
+    if not os.path.isfile(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except ValueError:
+        return {}
+
+def _write_hashes(cache_dir: str, hashes: dict) -> None:
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, HASHES_FILE)
+    temporary_path = f"{path}.tmp-{os.getpid()}"
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        json.dump(hashes, file)
+    os.replace(temporary_path, path)
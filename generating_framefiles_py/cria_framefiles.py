@@ -1,60 +1,39 @@
+import logging
+import os
+
 import numpy as np
 import pandas as pd
-import torch
 
-from typing import Union
-from transformers import AutoTokenizer, AutoModel
+from functools import partial
+from typing import Optional, Union
 from sklearn.metrics.pairwise import cosine_similarity
 
+from conllu_store import ConlluStore, load_conllu
+from embedding_store import embed_sentences
+from framefile_document import FramefileDocument
+from grouping_jobs import GroupingJob
+from similarity_grouping import iter_greedy_groups, iter_threshold_components
+
+# A partir dessa quantidade de sentenças, oferece o índice aproximado (IVF) nos agrupamentos com BERT
+ANN_SUGGESTED_SIZE = 5000
+
+# Mensagens de depuração dos agrupamentos (nível DEBUG; escolha o nível com a variável de ambiente LOG_LEVEL)
+logger = logging.getLogger(__name__)
+
 def parse_conllu(file_path) -> pd.DataFrame:
     """"
     Função para extrair as informações do formato CONLL-U para um dataframe do pandas.
     Aceita tanto caminho do arquivo (str) quanto objeto de arquivo (Streamlit UploadedFile).
+    Para o corpus inteiro, prefira load_conllu, que guarda os tokens em colunas e só monta o dataframe das sentenças filtradas.
+    Os tokens trazem só as colunas guardadas pelo ConlluStore (id, form, lemma, upos, head, deprel e misc): xpos, feats e
+    deps, que nenhum agrupamento usa, não são lidas.
 
     Args:
         file_path (str): o caminho para o arquivo CONLL-U do qual se extrairão os dados.
     Returns:
-        pd.Dataframe: estrutura de dataframe do pandas para acesso facilitado às colunas.
+        pd.Dataframe: uma linha por sentença (sent_id, text e tokens), com cada token como um dicionário das colunas acima.
     """
-    sentences = []
-    sentence = []
-
-    # Verifica se é um arquivo em memória (tem método 'read'), como o do Streamlit
-    if hasattr(file_path, "read"):
-        lines = file_path.read().decode("utf-8").splitlines()
-    else:
-        with open(file_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-
-
-    for line in lines:
-        line = line.strip()
-        if line.startswith("# sent_id"):
-            sent_id = line.split(" = ")[1]
-        elif line.startswith("# text"):
-            text = line.split(" = ")[1]
-        elif line == "":
-            if sentence:
-                sentences.append({"sent_id": sent_id, "text": text, "tokens": sentence})
-                sentence = []
-        elif not line.startswith("#"):
-            parts = line.split("\t")
-            if len(parts) >= 10:
-                token_info = {
-                    "id": parts[0],
-                    "form": parts[1],
-                    "lemma": parts[2],
-                    "upos": parts[3],
-                    "xpos": parts[4],
-                    "feats": parts[5],
-                    "head": parts[6],
-                    "deprel": parts[7],
-                    "deps": parts[8],
-                    "misc": parts[9]
-                }
-                sentence.append(token_info)
-
-    return pd.DataFrame(sentences)
+    return load_conllu(file_path).to_dataframe()
 
 def print_sentences(filtered_sentences:pd.DataFrame) -> None:
     """
@@ -149,76 +128,94 @@ def choose_cosine_similarity_threshold() -> float:
                 print("Valor inválido, tente novamente.")
     return similarity_threshold
 
-def group_by_args(filtered_sentences:pd.DataFrame, chosen_verb:str, max_sentences_per_roleset:int, take_argm_to_rolesets:bool) -> dict:
+def choose_to_use_ann_index() -> bool:
+    """
+    Para verbos com muitas sentenças, oferece ao usuário o índice aproximado (IVF) nos agrupamentos com BERT: cada
+    sentença é comparada só com as de sentido mais provável, em vez de com todas, e alguns pares próximos podem
+    ficar de fora.
+
+    Returns:
+        bool: True se o usuário deseja usar o índice aproximado, False caso contrário.
+    """
+    while True:
+        use_ann = input("Usar índice aproximado (mais rápido, pode separar alguns grupos)? (s/n): ").strip().lower()
+        if use_ann in ["s", "n"]:
+            return use_ann == "s"
+        print("Entrada inválida. Por favor, responda com 's' ou 'n'.")
+
+def group_by_args(filtered_sentences:pd.DataFrame, chosen_verb:str, max_sentences_per_roleset:int, take_argm_to_rolesets:bool, corpus:ConlluStore) -> dict:
     """
     Procura relações com o verbo desejado dentro das sentenças selecionadas e as agrupa de acordo com os mesmos argumentos.
+    As anotações Arg* já estão na tabela de argumentos do corpus (lidas uma vez, ao carregar): cada anotação vale para o
+    verbo se o predicado anotado é a ocorrência do verbo mais recente até o token argumento, como na leitura token a token.
     Args:
-        filtered_sentences (pd.DataFrame): sentenças filtradas que contêm o verbo chosen_verb.
+        filtered_sentences (pd.DataFrame): sentenças filtradas que contêm o verbo chosen_verb (indexadas pela posição no corpus, como em filter_by_verb).
 
         chosen_verb (str): verbo principal da sentença, a partir do qual buscamos relações de dependência.
 
         max_sentences_per_roleset (int): quantidade máxima de sentenças buscadas para cada roleset. É None caso o usuário não limite, e traz todos os resultados encontrados. Caso não tenha essa quantidade de sentenças (tenha menos), todas elas são guardadas e exibidas.
 
         take_argm_to_rolesets (bool): flag que indica se os ArgMs formarão ou não novos rolesets.
+
+        corpus (ConlluStore): corpus de onde as sentenças foram filtradas.
         
     Returns:
         dict: dicionário com os diferentes rolesets - id, quais argumentos possui e exemplos de sentenças.
     """
-    rolesets = {}  # Dicionário para armazenar roleset ids
-
-    for _, row in filtered_sentences.iterrows():
-        print("-" * 25)
-        print(f"Sentença analisada atualmente:\n{row}\n")
-        # Vamos coletar todos os argumentos para o verbo escolhido
-        args = set()  # Conjunto para garantir que não haja argumentos duplicados
-        verb_id = None  # Encontrar o ID do verbo escolhido
-        arguments_info = {}  # Dicionário para armazenar os argumentos de cada exemplo
-        
-
-        for token in row["tokens"]:
-            # Capturar o id do verbo para achar todos os args relacionados a ele
-            if token["lemma"].lower() == chosen_verb and token["upos"] == "VERB":
-                verb_id = token["id"]
-                print(f"Id do verbo na sentença: {verb_id}")
-                arguments_info["Rel"] = token["form"]
-            
-            if "Arg" in token["misc"]: # Um token faz um papel de arg. É em relação ao verbo?
-                # Procurando argumentos relacionados ao verbo escolhido
-                for arg in token["misc"].split("|"):
-                    arg = arg.split(":")
-                    if len(arg) > 1 and f"Arg" in arg[0] and arg[1] == str(verb_id): # id do verbo deve ser exatamente o mesmo do arg
-                        if arg[0][3:].isdigit():  # desconsiderar tmp, M, ...
-                            arg_role = arg[0]  # Nome do argumento (ex: Arg0, Arg1, etc.)
-                            print(arg_role)
-                            args.add(arg_role)
-                            arguments_info[arg_role] = token["form"] # Armazenando a palavra que realiza o papel do arg na sentença
-                        else:
-                            # Se for do tipo ArgM, Arg-Tmp, etc, apenas adiciona ao arguments_info, sem modificar rolesets
-                            print(f"Argumento não numérico encontrado: {arg}")
-                            arguments_info[arg[0]] = token["form"]
-
-                            # Se o usuário desejar, os args modificadores serão determinantes como novos rolesets também
-                            if take_argm_to_rolesets:
-                                args.add(arg[0])  # arg[0] é tipo 'ArgM-loc', 'ArgM-tmp' etc.
-
-            
-        # Ordenando os argumentos e criando uma tupla
-        args_tuple = tuple(sorted(args))  # Ordena os argumentos e os transforma em tupla
-        print(f"Args no final: {args_tuple}")
-
-        # Usamos os argumentos para gerar um roleset id único
-        if args_tuple not in rolesets:
-            # chave do dicionário: a tupla de argumentos (garantindo que seja única)
-            rolesets[args_tuple] = {"roleset_id": len(rolesets) + 1, "examples": [], "example_amt": 0}  # Atribuindo um roleset id único e inicializando a lista de exemplos
-
-        # Atribuindo o roleset id à sentença e adicionando a sentença à lista de exemplos
-        row["roleset_id"] = rolesets[args_tuple]["roleset_id"] # Para ter isso no DF caso seja necessário
-
-        # limitar o nro de sentenças se desejado
-        current_count = rolesets[args_tuple]["example_amt"]
-        if max_sentences_per_roleset is None or current_count < max_sentences_per_roleset: 
-            rolesets[args_tuple]["examples"].append({"sentence": row["text"], "arguments": arguments_info})  # Adicionando a sentença como exemplo desse roleset id, junto com o arg
-            rolesets[args_tuple]["example_amt"] += 1
+    sentence_indices = filtered_sentences.index.to_numpy(dtype=np.int64)
+    offsets = np.frombuffer(corpus.sentence_offsets, dtype=np.uint32).astype(np.int64)
+    verb_positions = corpus.verb_occurrences(chosen_verb)
+    table = corpus.argument_table()
+
+    # Anotações que valem para o verbo: o predicado é a última ocorrência do verbo até o token argumento
+    rows, owners = table.rows(sentence_indices)
+    arguments = table.arguments[rows].astype(np.int64)
+    occurrences = np.searchsorted(verb_positions, arguments, side="right") - 1
+    valid = occurrences >= 0
+    valid[valid] = verb_positions[occurrences[valid]] == table.predicates[rows[valid]]
+    rows, owners, arguments = rows[valid], owners[valid], arguments[valid]
+    roles = table.roles[rows]
+
+    # Assinatura de cada sentença: papéis numéricos (e ArgMs, se desejado), sem repetição e em ordem alfabética
+    numeric_roles = np.array([name[3:].isdigit() for name in table.role_names.tolist()], dtype=bool)
+    in_signature = numeric_roles[roles] if not take_argm_to_rolesets else np.ones(len(roles), dtype=bool)
+    role_names = table.role_names.tolist()
+    role_count = max(len(role_names), 1)
+    pairs = np.unique(owners[in_signature] * role_count + roles[in_signature])
+    bounds = np.searchsorted(pairs // role_count, np.arange(len(sentence_indices) + 1)).tolist()
+    role_codes = (pairs % role_count).tolist()
+    signatures = [tuple(role_names[code] for code in role_codes[bounds[i]:bounds[i + 1]]) for i in range(len(sentence_indices))]
+
+    # Roleset de cada sentença, numerado na ordem da primeira sentença de cada assinatura
+    roleset_of = {}
+    roleset_ids = np.array([roleset_of.setdefault(signature, len(roleset_of) + 1) for signature in signatures], dtype=np.int64)
+    rolesets = {signature: {"roleset_id": roleset_id, "examples": [], "example_amt": 0} for signature, roleset_id in roleset_of.items()}
+
+    # Exemplos: as primeiras sentenças de cada roleset, até o limite
+    order = np.argsort(roleset_ids, kind="stable")
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order)) - np.searchsorted(roleset_ids[order], roleset_ids[order])
+    chosen = np.arange(len(sentence_indices)) if max_sentences_per_roleset is None else np.flatnonzero(rank < max_sentences_per_roleset)
+
+    forms = corpus.column("form")
+    strings = corpus.strings
+    texts = filtered_sentences["text"].tolist()
+    row_bounds = np.searchsorted(owners, np.arange(len(sentence_indices) + 1)).tolist()
+    # Forma do verbo (Rel): a última ocorrência do verbo na sentença
+    last_verbs = np.searchsorted(verb_positions, offsets[sentence_indices + 1]) - 1
+    for i in chosen.tolist():
+        arguments_info = {}
+        last_verb = last_verbs[i]
+        if last_verb >= 0 and verb_positions[last_verb] >= offsets[sentence_indices[i]]:
+            arguments_info["Rel"] = strings[forms[verb_positions[last_verb]]]
+        for row in range(row_bounds[i], row_bounds[i + 1]):
+            arguments_info[role_names[roles[row]]] = strings[forms[arguments[row]]]
+
+        signature = signatures[i]
+        rolesets[signature]["examples"].append({"sentence": texts[i], "arguments": arguments_info})
+        rolesets[signature]["example_amt"] += 1
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Sentença %s: argumentos %s, roleset %s", filtered_sentences["sent_id"].iat[i], arguments_info, signature)
 
     return rolesets
 
@@ -231,7 +228,7 @@ def calculate_similarity_matrix(verb_vector):
     print("Matriz de similaridade entre os verbos:")
     print(np.round(similarity_matrix, 2))
 
-def group_using_bert(filtered_sentences:pd.DataFrame, max_sentences_per_roleset:int, similarity_threshold:float) -> dict:
+def group_using_bert(filtered_sentences:pd.DataFrame, max_sentences_per_roleset:int, similarity_threshold:float, use_ann:bool=False, job:Optional[GroupingJob]=None) -> dict:
     """
     Agrupa sentenças com base na similaridade de embeddings do modelo BERT (token [CLS]).
 
@@ -241,45 +238,26 @@ def group_using_bert(filtered_sentences:pd.DataFrame, max_sentences_per_roleset:
         max_sentences_per_roleset (int): quantidade máxima de sentenças buscadas para cada roleset. É None caso o usuário não limite, e traz todos os resultados encontrados. Caso não tenha essa quantidade de sentenças (tenha menos), todas elas são guardadas e exibidas.
 
         similarity_threshold (float): valor para similaridade de cossenos, que vai de -1 a 1.
+
+        use_ann (bool): se True, compara cada sentença só com as candidatas do índice aproximado (IVF).
+
+        job (GroupingJob): se passado, recebe o progresso e cada roleset assim que formado (agrupamento em segundo plano).
         
     Returns:
         dict: dicionário com os diferentes rolesets - id, quais argumentos possui e exemplos de sentenças.
     """
-    # Carrega o modelo pré-treinado (BERTimbau base)
-    tokenizer = AutoTokenizer.from_pretrained("neuralmind/bert-base-portuguese-cased") # cria tokens a partir de frases
-    model = AutoModel.from_pretrained("neuralmind/bert-base-portuguese-cased") # retorna embeddings dos tokens
-
     sentence_texts = filtered_sentences["text"].tolist() # nossas sentenças
 
-    # Vetores CLS para cada sentença 
-    cls_vectors = []
-    for text in sentence_texts:
-        # tokenizer: texto -> tokens -> word embedding para os tokens (vetores de 768 características)
-        inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=128, padding=True)
-        with torch.no_grad(): # nao calcule gradientes
-            outputs = model(**inputs)
-        cls_embedding = outputs.last_hidden_state[:, 0, :].squeeze().numpy()  # Vetor do token CLS, com 768 valores, representando semanticamente a sentença toda
-        cls_vectors.append(cls_embedding)
+    # Vetores CLS para cada sentença (768 valores, representando semanticamente a sentença toda), calculados em lotes
+    # pelo modelo pré-treinado (BERTimbau base) só para as sentenças que ainda não estão no armazenamento de vetores
+    cls_vectors = embed_sentences(sentence_texts, progress=job and partial(job.update, "Sentenças processadas pelo BERT"))
     
-    # Agrupar por similaridade
-    grouped = []
-    used = [False] * len(cls_vectors)
-
-    for i in range(len(cls_vectors)):
-        if used[i]:
-            continue
-        group = [i]
-        used[i] = True
-        for j in range(i + 1, len(cls_vectors)):
-            if not used[j]:
-                sim = cosine_similarity([cls_vectors[i]], [cls_vectors[j]])[0][0]
-                if sim >= similarity_threshold:
-                    group.append(j)
-                    used[j] = True
-        grouped.append(group)
+    # Agrupar por similaridade: cada sentença sem grupo vira líder e leva as seguintes próximas o bastante dela
+    grouped = iter_greedy_groups(cls_vectors, similarity_threshold, use_ann)
 
     # Criar o dicionário rolesets no mesmo formato que a opção 1
     rolesets = {}
+    grouped_sentences = 0
     for idx, group in enumerate(grouped):
         examples = []
         for i in group[:max_sentences_per_roleset or len(group)]:
@@ -287,16 +265,21 @@ def group_using_bert(filtered_sentences:pd.DataFrame, max_sentences_per_roleset:
                 "sentence": filtered_sentences.iloc[i]["text"],
                 "arguments": {}
             })
-        rolesets[("BERT-sense-" + str(idx+1),)] = {
+        key = ("BERT-sense-" + str(idx+1),)
+        rolesets[key] = {
             "roleset_id": idx + 1,
             "examples": examples,
             "example_amt": len(examples)
         }
+        if job is not None:
+            grouped_sentences += len(group)
+            job.publish(key, rolesets[key])
+            job.update("Sentenças agrupadas", grouped_sentences, len(filtered_sentences))
 
     return rolesets
 
 
-def group_using_bert_by_verb(filtered_sentences:pd.DataFrame, chosen_verb:str, max_sentences_per_roleset:int, similarity_threshold:float) -> dict:
+def group_using_bert_by_verb(filtered_sentences:pd.DataFrame, chosen_verb:str, max_sentences_per_roleset:int, similarity_threshold:float, use_ann:bool=False, job:Optional[GroupingJob]=None) -> dict:
     """
     Agrupa sentenças com base na similaridade de embeddings do modelo BERT (usando vetor do verbo principal).
 
@@ -305,115 +288,53 @@ def group_using_bert_by_verb(filtered_sentences:pd.DataFrame, chosen_verb:str, m
         chosen_verb (str): verbo principal (forma lematizada) usado como âncora semântica.
         max_sentences_per_roleset (int): quantidade máxima de sentenças buscadas para cada roleset. É None caso o usuário não limite, e traz todos os resultados encontrados. Caso não tenha essa quantidade de sentenças (tenha menos), todas elas são guardadas e exibidas.
         similarity_threshold (float): valor mínimo para similaridade de cossenos, que vai de -1 a 1, para formar grupos.
+        use_ann (bool): se True, busca as sentenças próximas com o índice aproximado (IVF), em vez de comparar todos os pares.
+        job (GroupingJob): se passado, recebe o progresso e cada roleset assim que formado (agrupamento em segundo plano).
 
     Returns:
         dict: dicionário com agrupamentos de diferentes rolesets - id, quais argumentos possui e exemplos de sentenças. 
     """
 
-    # Carrego o modelo
-    tokenizer = AutoTokenizer.from_pretrained("neuralmind/bert-base-portuguese-cased")
-    model = AutoModel.from_pretrained("neuralmind/bert-base-portuguese-cased")
-
-    verb_vectors = []
-
-    # Extrair o vetor do verbo principal de cada sentença
-    for _, row in filtered_sentences.iterrows():
-        text = row["text"]
-        tokens = row["tokens"]
-
-        # Encontra o token do verbo principal (por lema e UPOS)
+    # Encontra o token do verbo principal (por lema e UPOS) de cada sentença
+    texts, verb_forms, rows_with_verb = [], [], []
+    for row_position, (text, tokens) in enumerate(zip(filtered_sentences["text"], filtered_sentences["tokens"])):
         verb_token = next((t for t in tokens if t["lemma"].lower() == chosen_verb and t["upos"] == "VERB"), None)
-        if not verb_token:
-            verb_vectors.append(None)
-            continue
-
-        # Encontrar o verbo na sentença pra localizar token BERT
-        verb_form = verb_token["form"]
-        verb_char_index = text.lower().find(verb_form.lower())
-
-        # Tokeniza a sentença com offset_mapping (qual token é o verbo)
-        encoded = tokenizer(
-            text,
-            return_tensors="pt",
-            truncation=True,
-            max_length=128,
-            padding=True,
-            return_offsets_mapping=True
-        )
-        offsets = encoded.pop("offset_mapping")[0]  # Remove offset para não ser passado ao model (não aceita)
-
-        with torch.no_grad():
-            outputs = model(**encoded)
-
-        # Encontra o índice do token correspondente ao verbo
-        verb_token_index = None
-        for i, (start, end) in enumerate(offsets.tolist()):
-            if start <= verb_char_index < end:
-                verb_token_index = i
-                break
-
-        # Se não encontrar, usa CLS como fallback
-        if verb_token_index is None:
-            vector = outputs.last_hidden_state[:, 0, :].squeeze().numpy() # token CLS
-        else:
-            vector = outputs.last_hidden_state[0, verb_token_index, :].numpy() # token do verbo
+        if verb_token:
+            texts.append(text)
+            verb_forms.append(verb_token["form"])
+            rows_with_verb.append(row_position)
 
-        # Guardar todos os vetores dos verbos para fazer o agrupamento por similaridade depois
-        verb_vectors.append(vector)
+    # Extrair o vetor do verbo principal de cada sentença, em lotes, só das sentenças que ainda não estão no
+    # armazenamento de vetores (se o verbo não é encontrado nos tokens do BERT, usa CLS como fallback)
+    vectors = embed_sentences(texts, verb_forms, progress=job and partial(job.update, "Sentenças processadas pelo BERT"))
 
-    calculate_similarity_matrix(verb_vectors)
+    # Guardar todos os vetores dos verbos para fazer o agrupamento por similaridade depois
+    verb_vectors = [None] * len(filtered_sentences)
+    for row_position, vector in zip(rows_with_verb, vectors):
+        verb_vectors[row_position] = vector
 
     # Filtrar vetores None
     valid_idx_map = [i for i, v in enumerate(verb_vectors) if v is not None]
-    valid_vectors = [verb_vectors[i] for i in valid_idx_map]
+    valid_vectors = np.array([verb_vectors[i] for i in valid_idx_map])
 
-    if not valid_vectors:
+    if not valid_idx_map:
         return {}
-    
-    # Matriz de similaridade - checa todos os vetores BERT do verbo
-    similarity_matrix = cosine_similarity(valid_vectors)
 
-    # Construir grafo (lista de adjacência)
-    n = len(valid_vectors)
-    adj = {i: [] for i in range(n)}
-
-    # Para cada par de sentenças i, j
-    for i in range(n):
-        for j in range(i + 1, n):
-            # elas são suficientemente próximas semanticamente?
-            if similarity_matrix[i][j] >= similarity_threshold:
-                # conectar i e j (pertencem ao mesmo grupo de sentido de sentença)
-                adj[i].append(j)
-                adj[j].append(i)
-
-    # Busca DFS para componentes conexos (quais sentenças já foram visitadas)
-    visited = [False] * n
-    groups = []
-
-    # Encontrar todas as sentenças conectadas entre si
-    def dfs(node, group):
-        visited[node] = True
-        group.append(node)
-        for neighbor in adj[node]:
-            if not visited[neighbor]:
-                dfs(neighbor, group)
-
-    for i in range(n):
-        if not visited[i]:
-            group = []
-            dfs(i, group) # preenche group com todas as sentenças conectadas a i
-            groups.append(group) # group é um roleset
-    
+    # Grupos = componentes conexos do grafo em que duas sentenças estão ligadas se são suficientemente próximas
+    # semanticamente (similaridade >= limiar). A matriz de similaridade é calculada em blocos, sem ser guardada inteira.
+    if job is not None:
+        job.update("Procurando os grupos", 0, len(valid_idx_map))
+    groups = iter_threshold_components(valid_vectors, similarity_threshold, use_ann)
+
     # Se duas sentenças estão conectadas por uma cadeia de similaridade (mesmo que indireta), 
     # elas serão agrupadas em um mesmo group, ou seja, mesmo roleset.
 
     # Mapear grupos para índices originais do dataframe (porque filtrei os None pra montar o grafo)
-    mapped_groups = []
-    for group in groups:
-        mapped_groups.append([valid_idx_map[i] for i in group])
+    mapped_groups = ([valid_idx_map[i] for i in group] for group in groups)
 
     # Monta o dicionário no formato esperado
     rolesets = {}
+    grouped_sentences = 0
     for idx, group in enumerate(mapped_groups):
         examples = []
         for i in group[:max_sentences_per_roleset or len(group)]:
@@ -421,11 +342,16 @@ def group_using_bert_by_verb(filtered_sentences:pd.DataFrame, chosen_verb:str, m
                 "sentence": filtered_sentences.iloc[i]["text"],
                 "arguments": {}
             })
-        rolesets[("BERT-VERB-sense-" + str(idx + 1),)] = {
+        key = ("BERT-VERB-sense-" + str(idx + 1),)
+        rolesets[key] = {
             "roleset_id": idx + 1,
             "examples": examples,
             "example_amt": len(examples)
         }
+        if job is not None:
+            grouped_sentences += len(group)
+            job.publish(key, rolesets[key])
+            job.update("Sentenças agrupadas", grouped_sentences, len(valid_idx_map))
 
     return rolesets
 
@@ -466,16 +392,38 @@ def print_roleset(args_tuple:tuple, data:dict) -> None:
 
     print("-" * 50)  # Separador entre os rolesets
 
-def write_file(rolesets:dict, chosen_verb:str) -> None:
+def framefile_path(chosen_verb:str, output_dir:str=".", file_format:str="txt") -> str:
+    """
+    Retorna o caminho do arquivo de framefile de um verbo no diretório de saída: 'Framefile-[chosen_verb]-v.txt' no
+    formato texto, ou '[chosen_verb]-v.xml' no formato XML, o nome dos framefiles do Cornerstone.
+
+    Args:
+        chosen_verb (str): o verbo analisado nas sentenças.
+
+        output_dir (str): diretório onde o framefile é escrito.
+
+        file_format (str): "txt" ou "xml".
+    Returns:
+        str: caminho do arquivo.
+    """
+    if file_format == "xml":
+        return os.path.join(output_dir, f"{chosen_verb}-v.xml")
+    return os.path.join(output_dir, f"Framefile-{chosen_verb}-v.txt")
+
+def write_file(rolesets:dict, chosen_verb:str, output_dir:str=".") -> None:
     """"
     Esta função escreve um arquivo de nome 'Framefile-[chosen_verb]-v.txt' como framefile do verbo passado, considerando seus diferentes conjuntos de argumentos.
+    O arquivo é escrito com outro nome e renomeado ao final, então um framefile pela metade nunca fica no lugar do arquivo final.
 
     Args:
         rolesets (dict): tipos de argumentos considerados no modo como o verbo é empregado em cada sentença.
 
         chosen_verb (str): o verbo analisado nas sentenças.
+
+        output_dir (str): diretório onde o framefile é escrito (padrão: o diretório atual).
     """
-    with open(f"Framefile-{chosen_verb}-v.txt", "w", encoding="utf-8") as file:
+    path = framefile_path(chosen_verb, output_dir)
+    with open(path + ".tmp", "w", encoding="utf-8") as file:
         for args_tuple, data in rolesets.items():
             file.write(f"Roleset ID: {data['roleset_id']}\n")
             file.write("Roles:\n")
@@ -501,14 +449,36 @@ def write_file(rolesets:dict, chosen_verb:str) -> None:
                 file.write('\n')
             file.write("-" * 50)
             file.write('\n')
+    os.replace(path + ".tmp", path)
+
+def write_xml_file(rolesets:dict, chosen_verb:str, output_dir:str=".", merge_dir:Optional[str]=None) -> None:
+    """
+    Escreve o framefile do verbo no formato XML do Cornerstone (frameset.dtd), como '[chosen_verb]-v.xml'. Os rolesets
+    vão para o arquivo um a um, sem montar o XML em memória. Se merge_dir tem um frameset do verbo, ele é mesclado:
+    os seus rolesets são copiados e os novos vêm depois (veja FramefileDocument.write_xml).
+
+    Args:
+        rolesets (dict): tipos de argumentos considerados no modo como o verbo é empregado em cada sentença.
+
+        chosen_verb (str): o verbo analisado nas sentenças.
+
+        output_dir (str): diretório onde o framefile é escrito (padrão: o diretório atual).
+
+        merge_dir (Optional[str]): diretório com framesets existentes (como os do Cornerstone), ou None.
+    """
+    path = framefile_path(chosen_verb, output_dir, "xml")
+    existing = merge_dir and framefile_path(chosen_verb, merge_dir, "xml")
+    with open(path + ".tmp", "w", encoding="utf-8") as file:
+        FramefileDocument.from_rolesets(chosen_verb, rolesets).write_xml(file, existing if existing and os.path.isfile(existing) else None)
+    os.replace(path + ".tmp", path)
 
 
 def main():
     # Caminho do arquivo CONLL-U, de entrada
     file_path = "PBP-classic-complete.conllu"
 
-    # Criando o DataFrame
-    df = parse_conllu(file_path)
+    # Carregando o corpus em colunas (o DataFrame é montado só para as sentenças filtradas)
+    corpus = load_conllu(file_path)
 
     # Ler verbo para o qual se deseja fazer um framefile
     chosen_verb = input("Digite o verbo que deseja buscar: ").strip().lower()
@@ -517,7 +487,7 @@ def main():
 
     # Acessar arquivo PBP e buscar todas as sentenças (em formato conll-u) que contenham o verbo de interesse
         # Filtrar sentenças que contêm o verbo desejado no lema
-    filtered_sentences = df[df["tokens"].apply(lambda tokens: any(token["upos"] == "VERB" and token["lemma"].lower() == chosen_verb for token in tokens))]
+    filtered_sentences = corpus.filter_by_verb(chosen_verb)
 
     # Exibir as sentenças filtradas
     if filtered_sentences.empty:
@@ -537,18 +507,20 @@ def main():
         # opção 1: agrupar sentenças por papéis/args que os verbos tenham (heurística ingênua)
         if method == 1:
             take_argm_to_rolesets = choose_to_consider_argm()
-            rolesets = group_by_args(filtered_sentences, chosen_verb, max_sentences_per_roleset, take_argm_to_rolesets)
+            rolesets = group_by_args(filtered_sentences, chosen_verb, max_sentences_per_roleset, take_argm_to_rolesets, corpus)
         # opção 2: usar um modelo de língua (BERT?) para agrupar as sentenças
         elif method == 2:
             similarity_threshold = choose_cosine_similarity_threshold()
-            rolesets = group_using_bert(filtered_sentences, max_sentences_per_roleset, similarity_threshold)
+            use_ann = len(filtered_sentences) >= ANN_SUGGESTED_SIZE and choose_to_use_ann_index()
+            rolesets = group_using_bert(filtered_sentences, max_sentences_per_roleset, similarity_threshold, use_ann)
         # opção 3: usar um LLM (via prompt) para agrupar as sentenças
         elif method == 3:
             print("TODO: usar um LLM (via prompt) para agrupar as sentenças")
             rolesets = {}
         elif method == 4:
             similarity_threshold = choose_cosine_similarity_threshold()
-            rolesets = group_using_bert_by_verb(filtered_sentences, chosen_verb, max_sentences_per_roleset, similarity_threshold)
+            use_ann = len(filtered_sentences) >= ANN_SUGGESTED_SIZE and choose_to_use_ann_index()
+            rolesets = group_using_bert_by_verb(filtered_sentences, chosen_verb, max_sentences_per_roleset, similarity_threshold, use_ann)
         else:
             print("Algo inesperado ocorreu e o programa será encerrado.")
 
@@ -571,4 +543,5 @@ def main():
     print(f"Arquivo de Framefile do verbo {chosen_verb} foi escrito! Encerrando...")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=os.environ.get("LOG_LEVEL", "WARNING").upper(), format="%(message)s")
     main()
\ No newline at end of file
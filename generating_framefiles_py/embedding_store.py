@@ -0,0 +1,283 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+import numpy as np
+
+from bert_embeddings import MODEL_NAME, get_engine
+from conllu_store import load_conllu
+
+# Diretório dos vetores guardados (ao lado deste módulo, para não depender do diretório de execução)
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".embedding_store")
+
+# Formas de extrair o vetor de uma sentença: token [CLS] ou token do verbo
+POOLINGS = ("cls", "verb")
+
+# Tamanho (em bytes) da chave de cada vetor: hash do texto da sentença (e da forma do verbo, no pooling "verb")
+KEY_SIZE = 16
+
+# Quantidade de pares (sentença, verbo) calculados de cada vez no cálculo do corpus inteiro
+PRECOMPUTE_CHUNK = 4096
+
+# Tempo (em segundos) depois do qual um arquivo de trava esquecido por um processo interrompido é ignorado
+STALE_LOCK_SECONDS = 120
+
+def sentence_key(text: str, verb_form: Optional[str] = None) -> bytes:
+    """
+    Retorna a chave de uma sentença no armazenamento: o hash do texto e, para o vetor do verbo, da forma do verbo
+    (a mesma sentença tem vetores diferentes para verbos diferentes).
+
+    Args:
+        text (str): texto da sentença.
+        verb_form (str): forma do verbo na sentença; None para o vetor [CLS].
+    Returns:
+        bytes: a chave, com KEY_SIZE bytes.
+    """
+    content = text if verb_form is None else f"{text}\x00{verb_form}"
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=KEY_SIZE).digest()
+
+@contextmanager
+def file_lock(lock_path: str) -> Iterator[None]:
+    """
+    Trava entre processos baseada na criação exclusiva de um arquivo (funciona igual no Linux e no Windows).
+
+    Args:
+        lock_path (str): caminho do arquivo de trava.
+    """
+    while True:
+        try:
+            descriptor = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > STALE_LOCK_SECONDS:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        os.close(descriptor)
+        os.remove(lock_path)
+
+class EmbeddingStore:
+    """
+    Vetores do BERT guardados em disco para um modelo, um pooling e um tipo de dado (float16 ou float32).
+    Os vetores ficam numa matriz binária (uma linha por sentença) lida por mapeamento de memória, e as chaves
+    das linhas num segundo arquivo, na mesma ordem. Os dois arquivos só recebem linhas novas no final: as chaves
+    são gravadas depois dos vetores, então uma gravação interrompida nunca deixa uma chave sem o seu vetor.
+    """
+
+    def __init__(self, model_name: str = MODEL_NAME, pooling: str = "cls", dtype: str = "float32", root: str = STORE_DIR):
+        if pooling not in POOLINGS:
+            raise ValueError(f"Pooling inválido: {pooling}")
+        self.model_name = model_name
+        self.pooling = pooling
+        self.dtype = np.dtype(dtype)
+        self.directory = os.path.join(root, model_name.replace("/", "__"), f"{pooling}-{self.dtype.name}")
+        self.vectors_path = os.path.join(self.directory, "vectors.bin")
+        self.keys_path = os.path.join(self.directory, "keys.bin")
+        self.meta_path = os.path.join(self.directory, "meta.json")
+        self.lock_path = os.path.join(self.directory, "lock")
+        self.dimension = None
+        self._rows = {}  # chave -> linha da matriz
+        self._matrix = None
+        self._lock = threading.Lock()  # Streamlit atende cada sessão numa thread
+
+        if os.path.isfile(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as file:
+                self.dimension = json.load(file)["dimension"]
+        self._refresh()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _refresh(self) -> None:
+        # Lê as chaves gravadas (também por outros processos) desde a última leitura
+        if not os.path.isfile(self.keys_path):
+            return
+        with open(self.keys_path, "rb") as file:
+            file.seek(len(self._rows) * KEY_SIZE)
+            new_keys = file.read()
+        new_keys = new_keys[:len(new_keys) - len(new_keys) % KEY_SIZE]
+        for offset in range(0, len(new_keys), KEY_SIZE):
+            self._rows.setdefault(new_keys[offset:offset + KEY_SIZE], len(self._rows))
+        if new_keys:
+            self._matrix = None
+
+    def _vectors(self) -> np.ndarray:
+        # Matriz mapeada na memória com as linhas que têm chave (sem copiar o arquivo)
+        if self._matrix is None or len(self._matrix) != len(self._rows):
+            self._matrix = np.memmap(self.vectors_path, dtype=self.dtype, mode="r", shape=(len(self._rows), self.dimension))
+        return self._matrix
+
+    def get(self, keys: list) -> tuple:
+        """
+        Busca os vetores guardados de várias chaves.
+
+        Args:
+            keys (list): chaves das sentenças (de sentence_key).
+        Returns:
+            tuple: (matriz float32 com uma linha por chave, lista das posições das chaves que não estão guardadas,
+                cujas linhas ficam zeradas). Se nenhuma está guardada, a matriz é None.
+        """
+        with self._lock:
+            self._refresh()
+            rows = [self._rows.get(key) for key in keys]
+            missing = [position for position, row in enumerate(rows) if row is None]
+            if self.dimension is None or len(missing) == len(keys):
+                return None, missing
+
+            vectors = np.zeros((len(keys), self.dimension), dtype=np.float32)
+            found = [position for position, row in enumerate(rows) if row is not None]
+            vectors[found] = self._vectors()[[rows[position] for position in found]]
+            return vectors, missing
+
+    def add(self, keys: list, vectors: np.ndarray) -> None:
+        """
+        Guarda os vetores de chaves que ainda não estão no armazenamento.
+
+        Args:
+            keys (list): chaves das sentenças (de sentence_key).
+            vectors (np.ndarray): um vetor por chave.
+        """
+        if not keys:
+            return
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with file_lock(self.lock_path):
+                self._refresh()
+                if self.dimension is None:
+                    self.dimension = vectors.shape[1]
+                    with open(self.meta_path, "w", encoding="utf-8") as file:
+                        json.dump({"model": self.model_name, "pooling": self.pooling, "dtype": self.dtype.name, "dimension": self.dimension}, file)
+
+                new_rows = {}
+                for key, vector in zip(keys, vectors):
+                    if key not in self._rows and key not in new_rows:
+                        new_rows[key] = vector
+                if not new_rows:
+                    return
+
+                # Descarta vetores sem chave deixados por uma gravação interrompida, e acrescenta os novos
+                row_bytes = self.dimension * self.dtype.itemsize
+                with open(self.vectors_path, "ab") as file:
+                    file.truncate(len(self._rows) * row_bytes)
+                    file.write(np.asarray(list(new_rows.values()), dtype=self.dtype).tobytes())
+                with open(self.keys_path, "ab") as file:
+                    file.write(b"".join(new_rows))
+                for key in new_rows:
+                    self._rows[key] = len(self._rows)
+                self._matrix = None
+
+# Um armazenamento aberto por (modelo, pooling, tipo de dado) no processo
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_store(model_name: str = MODEL_NAME, pooling: str = "cls", dtype: str = "float32") -> EmbeddingStore:
+    """
+    Retorna o armazenamento de vetores de um modelo e pooling, abrindo-o só na primeira chamada do processo.
+
+    Args:
+        model_name (str): nome (ou caminho) do modelo pré-treinado.
+        pooling (str): "cls" ou "verb".
+        dtype (str): "float16" ou "float32".
+    Returns:
+        EmbeddingStore: o armazenamento.
+    """
+    with _stores_lock:
+        if (model_name, pooling, dtype) not in _stores:
+            _stores[(model_name, pooling, dtype)] = EmbeddingStore(model_name, pooling, dtype)
+        return _stores[(model_name, pooling, dtype)]
+
+def embed_sentences(texts: list, verb_forms: Optional[list] = None, model_name: str = MODEL_NAME, dtype: str = "float32", progress: Optional[Callable[[int, int], None]] = None) -> np.ndarray:
+    """
+    Retorna os vetores das sentenças, calculando com o BERT só os que ainda não estão guardados. Sem verb_forms,
+    retorna os vetores [CLS]; com verb_forms, os vetores do verbo. Cada passagem do modelo produz os dois, e os
+    dois são guardados.
+
+    Args:
+        texts (list): textos das sentenças.
+        verb_forms (list): forma do verbo em cada sentença; None para os vetores [CLS].
+        model_name (str): nome (ou caminho) do modelo pré-treinado.
+        dtype (str): tipo de dado dos vetores guardados ("float16" ou "float32").
+        progress (Callable): chamada com (sentenças com vetor, total) quando os vetores guardados são lidos e depois
+            de cada lote calculado pelo modelo.
+    Returns:
+        np.ndarray: matriz float32 com um vetor por sentença, na ordem de texts.
+    """
+    cls_store = get_store(model_name, "cls", dtype)
+    cls_keys = [sentence_key(text) for text in texts]
+    if verb_forms is None:
+        store, keys = cls_store, cls_keys
+    else:
+        store = get_store(model_name, "verb", dtype)
+        keys = [sentence_key(text, form) for text, form in zip(texts, verb_forms)]
+
+    vectors, missing = store.get(keys)
+    if progress is not None:
+        progress(len(texts) - len(missing), len(texts))
+    if not missing:
+        return vectors
+
+    # Só as sentenças que faltam passam pelo modelo
+    missing_texts = [texts[position] for position in missing]
+    missing_forms = None if verb_forms is None else [verb_forms[position] for position in missing]
+    engine_progress = None
+    if progress is not None:
+        engine_progress = lambda done, total: progress(len(texts) - len(missing) + done, len(texts))
+    cls_vectors, verb_vectors = get_engine(model_name).embed(missing_texts, missing_forms, engine_progress)
+    cls_store.add([cls_keys[position] for position in missing], cls_vectors)
+    if verb_forms is not None:
+        store.add([keys[position] for position in missing], verb_vectors)
+
+    # Arredondados como ficam guardados, para a mesma sentença ter sempre o mesmo vetor
+    computed = (cls_vectors if verb_forms is None else verb_vectors).astype(store.dtype).astype(np.float32)
+    if vectors is None:
+        return computed
+    vectors[missing] = computed
+    return vectors
+
+def precompute_corpus(file_path: str, model_name: str = MODEL_NAME, dtype: str = "float32") -> None:
+    """
+    Calcula e guarda, de uma vez, os vetores [CLS] de todas as sentenças de um corpus e os vetores do verbo de
+    cada verbo (lema com UPOS VERB) em cada sentença, como os agrupamentos por BERT os pedem.
+
+    Args:
+        file_path (str): o caminho para o arquivo CONLL-U.
+        model_name (str): nome (ou caminho) do modelo pré-treinado.
+        dtype (str): tipo de dado dos vetores guardados ("float16" ou "float32").
+    """
+    corpus = load_conllu(file_path)
+    embed_sentences(corpus.texts, model_name=model_name, dtype=dtype)
+
+    # Forma do verbo de cada sentença, para cada lema: o primeiro token com o lema, como em group_using_bert_by_verb
+    index = corpus.lemma_index()
+    forms = corpus.column("form")
+    offsets = np.frombuffer(corpus.sentence_offsets, dtype=np.uint32)
+    texts, verb_forms = [], []
+    for verb in index.lemmas_with_upos("VERB"):
+        positions = index.tokens(verb, "VERB")
+        sentences = np.searchsorted(offsets, positions, side="right") - 1
+        first_tokens = np.unique(sentences, return_index=True)[1]
+        texts += [corpus.texts[sentence] for sentence in sentences[first_tokens].tolist()]
+        verb_forms += [corpus.strings[code] for code in forms[positions[first_tokens]].tolist()]
+        if len(texts) >= PRECOMPUTE_CHUNK:
+            embed_sentences(texts, verb_forms, model_name=model_name, dtype=dtype)
+            texts, verb_forms = [], []
+    embed_sentences(texts, verb_forms, model_name=model_name, dtype=dtype)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calcula e guarda os vetores do BERT de todas as sentenças de um corpus CONLL-U.")
+    parser.add_argument("conllu", nargs="?", default="PBP-classic-complete.conllu", help="arquivo CONLL-U (padrão: PBP-classic-complete.conllu)")
+    parser.add_argument("--modelo", default=MODEL_NAME, help=f"modelo pré-treinado (padrão: {MODEL_NAME})")
+    parser.add_argument("--float16", action="store_true", help="guarda os vetores em float16 (metade do espaço em disco)")
+    arguments = parser.parse_args()
+    precompute_corpus(arguments.conllu, arguments.modelo, "float16" if arguments.float16 else "float32")
@@ -0,0 +1,353 @@
+import io
+import itertools
+from dataclasses import dataclass, field
+from typing import Optional, TextIO, Union
+
+from cornerstone_xml import FramesetWriter, iter_frameset, iter_rolesets, roleset_contents, roleset_number
+
+# Identificadores dos documentos criados no processo (distinguem os widgets de um documento dos de outro)
+_document_ids = itertools.count(1)
+
+@dataclass(slots=True)
+class Argument:
+    name: str
+    value: str
+
+@dataclass(slots=True)
+class Example:
+    sentence: str
+    arguments: list[Argument] = field(default_factory=list)
+    removed: bool = False
+
+@dataclass(slots=True)
+class Roleset:
+    roleset_id: int
+    key: tuple  # chave do roleset no agrupamento (tuple() nos rolesets criados à mão)
+    roles: list[str] = field(default_factory=list)
+    examples: list[Example] = field(default_factory=list)
+    description: str = ""
+    removed: bool = False
+
+@dataclass(slots=True)
+class Change:
+    version: int  # versão do documento depois da alteração
+    kind: str
+    roleset_id: Optional[int] = None
+    detail: str = ""
+
+class FramefileDocument:
+    """
+    Framefile em edição: os rolesets de um verbo, com papéis, descrição e exemplos, e o que foi removido. Toda
+    alteração passa por um método do documento, que incrementa a versão e registra a alteração em changes; os
+    arquivos exportados (texto e XML do Cornerstone) são gerados só quando pedidos e guardados até a próxima alteração.
+    """
+
+    __slots__ = ("verb", "document_id", "rolesets", "version", "changes", "_by_id", "_keys", "_exports")
+
+    def __init__(self, verb: str):
+        self.verb = verb
+        self.document_id = next(_document_ids)
+        self.rolesets: list[Roleset] = []
+        self.version = 0
+        self.changes: list[Change] = []
+        self._by_id: dict[int, Roleset] = {}
+        self._keys: set[tuple] = set()
+        self._exports: dict = {}  # formato -> (versão, frameset mesclado, conteúdo exportado)
+
+    @classmethod
+    def from_rolesets(cls, verb: str, rolesets: dict) -> "FramefileDocument":
+        """
+        Cria o documento a partir do resultado de um agrupamento.
+
+        Args:
+            verb (str): verbo analisado.
+            rolesets (dict): rolesets no formato dos agrupamentos (chave -> roleset_id, exemplos...).
+        Returns:
+            FramefileDocument: o documento, na versão 1.
+        """
+        document = cls(verb)
+        document.add_rolesets(rolesets)
+        return document
+
+    @classmethod
+    def from_frameset(cls, source: Union[str, TextIO], verb: Optional[str] = None) -> "FramefileDocument":
+        """
+        Cria o documento a partir de um framefile XML do Cornerstone (frameset.dtd), para editá-lo ou mesclá-lo. O
+        nome de cada roleset vira a descrição; os papéis e argumentos viram rótulos (Arg0, ArgM-tmp...).
+
+        Args:
+            source (Union[str, TextIO]): caminho ou arquivo do frameset.
+            verb (str): lema do predicado lido; o do primeiro predicado do arquivo, se None.
+        Returns:
+            FramefileDocument: o documento, com um roleset por roleset do predicado.
+        """
+        document = cls(verb or "")
+        for lemma, element in iter_rolesets(source):
+            document.verb = document.verb or lemma
+            if lemma != document.verb:
+                continue
+            frameset_id, name, roles, examples = roleset_contents(element)
+            document._append(Roleset(
+                len(document.rolesets) + 1, ("frameset", frameset_id), roles,
+                [Example(sentence, [Argument(label, text) for label, text in arguments]) for sentence, arguments in examples],
+                name,
+            ))
+        if document.rolesets:
+            document._changed("frameset lido", detail=str(len(document.rolesets)))
+        return document
+
+    def __len__(self) -> int:
+        return len(self.rolesets)
+
+    def roleset(self, roleset_id: int) -> Roleset:
+        """
+        Retorna o roleset de um id.
+        """
+        return self._by_id[roleset_id]
+
+    def active_rolesets(self) -> list[Roleset]:
+        """
+        Retorna os rolesets que não foram removidos, na ordem do documento.
+        """
+        return [roleset for roleset in self.rolesets if not roleset.removed]
+
+    def _append(self, roleset: Roleset) -> None:
+        self.rolesets.append(roleset)
+        self._by_id[roleset.roleset_id] = roleset
+        if roleset.key:
+            self._keys.add(roleset.key)
+
+    def _changed(self, kind: str, roleset_id: Optional[int] = None, detail: str = "") -> None:
+        self.version += 1
+        self.changes.append(Change(self.version, kind, roleset_id, detail))
+
+    def changes_since(self, version: int) -> list[Change]:
+        """
+        Retorna as alterações feitas depois de uma versão do documento.
+
+        Args:
+            version (int): versão já conhecida.
+        Returns:
+            list[Change]: as alterações posteriores, em ordem.
+        """
+        return [change for change in self.changes if change.version > version]
+
+    def add_rolesets(self, rolesets: dict) -> int:
+        """
+        Acrescenta os rolesets de um agrupamento que ainda não estão no documento (pela chave). Os que já estão não
+        são substituídos, então as edições feitas neles são mantidas.
+
+        Args:
+            rolesets (dict): rolesets no formato dos agrupamentos (chave -> roleset_id, exemplos...).
+        Returns:
+            int: quantidade de rolesets acrescentados.
+        """
+        added = 0
+        for key, data in rolesets.items():
+            if key in self._keys or data['roleset_id'] in self._by_id:
+                continue
+            examples = [
+                Example(example['sentence'], [Argument(name, value) for name, value in example['arguments'].items()])
+                for example in data['examples']
+            ]
+            self._append(Roleset(data['roleset_id'], key, list(key), examples))
+            added += 1
+        if added:
+            self._changed("rolesets acrescentados", detail=str(added))
+        return added
+
+    def add_roleset(self) -> int:
+        """
+        Cria um roleset vazio, com o maior id + 1.
+
+        Returns:
+            int: o id do novo roleset.
+        """
+        roleset_id = max(self._by_id, default=0) + 1
+        self._append(Roleset(roleset_id, tuple()))
+        self._changed("roleset criado", roleset_id)
+        return roleset_id
+
+    def set_roleset_removed(self, roleset_id: int, removed: bool) -> None:
+        """
+        Marca um roleset como removido (não exportado) ou o restaura.
+        """
+        self._by_id[roleset_id].removed = removed
+        self._changed("roleset removido" if removed else "roleset restaurado", roleset_id)
+
+    def set_role(self, roleset_id: int, position: int, role: str) -> None:
+        """
+        Edita um papel de um roleset (papéis vazios não são exportados).
+        """
+        roles = self._by_id[roleset_id].roles
+        if roles[position] != role:
+            roles[position] = role
+            self._changed("papel editado", roleset_id, f"{position}: {role}")
+
+    def add_role(self, roleset_id: int, role: str) -> None:
+        """
+        Acrescenta um papel ao final dos papéis de um roleset.
+        """
+        self._by_id[roleset_id].roles.append(role)
+        self._changed("papel acrescentado", roleset_id, role)
+
+    def remove_role(self, roleset_id: int, position: int) -> None:
+        """
+        Remove um papel de um roleset; os papéis seguintes passam uma posição para trás.
+        """
+        role = self._by_id[roleset_id].roles.pop(position)
+        self._changed("papel removido", roleset_id, role)
+
+    def set_description(self, roleset_id: int, description: str) -> None:
+        """
+        Edita a descrição de um roleset.
+        """
+        roleset = self._by_id[roleset_id]
+        if roleset.description != description:
+            roleset.description = description
+            self._changed("descrição editada", roleset_id)
+
+    def set_argument(self, roleset_id: int, example_idx: int, arg_idx: int, name: Optional[str] = None, value: Optional[str] = None) -> None:
+        """
+        Edita o nome e/ou o valor de um argumento de um exemplo.
+
+        Args:
+            roleset_id (int): id do roleset.
+            example_idx (int): posição do exemplo no roleset.
+            arg_idx (int): posição do argumento no exemplo.
+            name (str): novo nome, ou None para manter.
+            value (str): novo valor, ou None para manter.
+        """
+        argument = self._by_id[roleset_id].examples[example_idx].arguments[arg_idx]
+        if (name is None or name == argument.name) and (value is None or value == argument.value):
+            return
+        argument.name = argument.name if name is None else name
+        argument.value = argument.value if value is None else value
+        self._changed("argumento editado", roleset_id, f"{example_idx}.{arg_idx}: {argument.name}: {argument.value}")
+
+    def set_example_removed(self, roleset_id: int, example_idx: int, removed: bool) -> None:
+        """
+        Marca um exemplo como removido (não exportado) ou o restaura.
+        """
+        self._by_id[roleset_id].examples[example_idx].removed = removed
+        self._changed("exemplo removido" if removed else "exemplo restaurado", roleset_id, str(example_idx))
+
+    def add_example(self, roleset_id: int, sentence: str, arguments: list) -> None:
+        """
+        Acrescenta um exemplo ao final de um roleset.
+
+        Args:
+            roleset_id (int): id do roleset.
+            sentence (str): sentença do exemplo.
+            arguments (list): argumentos do exemplo, como pares (nome, valor).
+        """
+        example = Example(sentence, [Argument(name, value) for name, value in arguments])
+        self._by_id[roleset_id].examples.append(example)
+        self._changed("exemplo acrescentado", roleset_id, sentence)
+
+    def text(self) -> str:
+        """
+        Retorna o conteúdo do framefile, ignorando rolesets e exemplos removidos e papéis vazios. O texto só é gerado
+        de novo se o documento mudou desde a última chamada.
+
+        Returns:
+            str: o framefile, no formato de 'Baixar Framefile customizado'.
+        """
+        return self._export("text", self._render_text)
+
+    def xml(self, existing: Optional[bytes] = None) -> str:
+        """
+        Retorna o documento como framefile XML do Cornerstone (veja write_xml). O XML só é gerado de novo se o
+        documento ou o frameset mesclado mudou desde a última chamada.
+
+        Args:
+            existing (bytes): conteúdo de um frameset existente do verbo, para mesclar; None para só o documento.
+        Returns:
+            str: o frameset.
+        """
+        def render() -> str:
+            output = io.StringIO()
+            self.write_xml(output, None if existing is None else io.BytesIO(existing))
+            return output.getvalue()
+        return self._export("xml", render, existing)
+
+    def _export(self, export_format: str, render, source: Optional[bytes] = None) -> str:
+        cached = self._exports.get(export_format)
+        if cached is None or cached[0] != self.version or cached[1] != source:
+            cached = (self.version, source, render())
+            self._exports[export_format] = cached
+        return cached[2]
+
+    def write_xml(self, file: TextIO, existing: Union[str, TextIO, None] = None) -> None:
+        """
+        Escreve o documento como framefile XML do Cornerstone (frameset.dtd), aos poucos, sem rolesets e exemplos
+        removidos e papéis vazios. Os rolesets são numerados verbo.01, verbo.02..., e a descrição vira o nome.
+
+        Com um frameset existente, os dois são mesclados numa só passada: os predicados, rolesets e notas do frameset
+        são copiados sem alterações (com todos os atributos), e os rolesets do documento vêm no final, no predicado do
+        verbo, numerados depois do maior id verbo.NN do arquivo. Um roleset do documento com os mesmos papéis e
+        sentenças de um roleset existente do verbo não é repetido.
+
+        Args:
+            file (TextIO): arquivo de saída.
+            existing (Union[str, TextIO]): caminho ou arquivo do frameset existente do verbo, ou None.
+        """
+        last_number, existing_contents = 0, set()
+        with FramesetWriter(file) as writer:
+            for kind, lemma, element in (iter_frameset(existing) if existing is not None else ()):
+                if kind == "predicate":
+                    writer.start_predicate(lemma)
+                    continue
+                if kind == "note":
+                    writer.write_element(element, level=1 if lemma is None else 2)
+                    continue
+                frameset_id, _, roles, examples = roleset_contents(element)
+                if frameset_id.startswith(f"{self.verb}."):
+                    last_number = max(last_number, roleset_number(frameset_id))
+                if lemma == self.verb:
+                    existing_contents.add((tuple(roles), tuple(sentence for sentence, _ in examples)))
+                writer.write_element(element)
+            self._write_rolesets(writer, last_number, existing_contents)
+
+    def _write_rolesets(self, writer: FramesetWriter, last_number: int, existing_contents: set) -> None:
+        number = last_number
+        for roleset in self.active_rolesets():
+            roles = [role.strip() for role in roleset.roles if role.strip()]
+            examples = [
+                (example.sentence, [(argument.name, argument.value) for argument in example.arguments])
+                for example in roleset.examples
+                if not example.removed
+            ]
+            if (tuple(roles), tuple(sentence for sentence, _ in examples)) in existing_contents:
+                continue
+            number += 1
+            if writer.lemma != self.verb:
+                writer.start_predicate(self.verb)
+            writer.write_roleset(f"{self.verb}.{number:02d}", roleset.description, roles, examples)
+
+    def _render_text(self) -> str:
+        output = io.StringIO()
+        output.write(f"Verbo analisado: {self.verb}\n\n")
+
+        for roleset in self.active_rolesets():
+            roles = [role.strip() for role in roleset.roles if role.strip()]
+            output.write(f"Roleset ID: {roleset.roleset_id}\n")
+            output.write("Roles:\n")
+            if not roles:
+                output.write("\t\t-\n")
+            for role in roles:
+                output.write(f"\t\t{role}\n")
+            output.write(f"\nDescrição: {roleset.description}\n")
+            output.write("\n---Exemplos de sentenças--- \n\n")
+
+            for example in roleset.examples:
+                if example.removed:
+                    continue
+                output.write(f"\t{example.sentence}\n\n")
+                for argument in example.arguments:
+                    output.write(f"\t\t{argument.name}: {argument.value}\n")
+                output.write('*' * 10)
+                output.write('\n')
+            output.write("-" * 50)
+            output.write('\n')
+        return output.getvalue()
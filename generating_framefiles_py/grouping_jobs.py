@@ -0,0 +1,148 @@
+import copy
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+# Agrupamentos executados ao mesmo tempo no processo (os demais esperam na fila). As passagens do BERT de
+# agrupamentos diferentes se alternam lote a lote, então nenhum espera o outro terminar
+JOB_WORKERS = 4
+
+# Resultados de agrupamentos concluídos guardados no processo, compartilhados entre as sessões
+CACHED_RESULTS = 128
+
+# Estados de um agrupamento
+QUEUED, RUNNING, FINISHED, CANCELLED, FAILED = "na fila", "executando", "concluído", "cancelado", "erro"
+
+class JobCancelled(Exception):
+    """
+    Levantada dentro do agrupamento, no próximo relato de progresso, depois que o agrupamento é cancelado.
+    """
+
+class GroupingJob:
+    """
+    Agrupamento executado numa thread de fundo. A função de agrupamento recebe o próprio job e relata o progresso
+    (update) e cada roleset já formado (publish); a interface lê o progresso e os rolesets parciais a qualquer
+    momento, sem esperar o fim. Cancelar só marca o job: o agrupamento para no próximo relato de progresso.
+    """
+
+    def __init__(self, key: tuple):
+        self.key = key
+        self.status = QUEUED
+        self.stage = "Aguardando"
+        self.done = 0
+        self.total = 0
+        self.error = None
+        self._rolesets = {}
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (FINISHED, CANCELLED, FAILED)
+
+    @property
+    def published(self) -> int:
+        return len(self._rolesets)
+
+    @property
+    def fraction(self) -> float:
+        return min(self.done / self.total, 1.0) if self.total else 0.0
+
+    def update(self, stage: str, done: int, total: int) -> None:
+        """
+        Relata o progresso do agrupamento (chamada pela função de agrupamento).
+
+        Args:
+            stage (str): etapa atual, para exibição.
+            done (int): itens da etapa já concluídos.
+            total (int): total de itens da etapa.
+        """
+        if self._cancelled.is_set():
+            raise JobCancelled()
+        self.stage, self.done, self.total = stage, done, total
+
+    def publish(self, key: tuple, roleset: dict) -> None:
+        """
+        Publica um roleset já formado, que não muda mais até o fim do agrupamento.
+
+        Args:
+            key (tuple): chave do roleset (a mesma do resultado final).
+            roleset (dict): o roleset (roleset_id, exemplos...).
+        """
+        with self._lock:
+            self._rolesets[key] = copy.deepcopy(roleset)
+
+    def rolesets(self, start: int = 0) -> dict:
+        """
+        Retorna uma cópia dos rolesets publicados até agora (todos, se o agrupamento terminou), na ordem em que
+        foram publicados.
+
+        Args:
+            start (int): quantidade de rolesets já lidos, que não são copiados de novo.
+        Returns:
+            dict: os rolesets publicados a partir do start-ésimo.
+        """
+        with self._lock:
+            return copy.deepcopy(dict(list(self._rolesets.items())[start:]))
+
+    def cancel(self) -> None:
+        """
+        Pede o cancelamento do agrupamento (na fila, ele nem começa).
+        """
+        with self._lock:
+            self._cancelled.set()
+            if self.status == QUEUED:
+                self.status = CANCELLED
+
+_executor = ThreadPoolExecutor(JOB_WORKERS, thread_name_prefix="agrupamento")
+_results = OrderedDict()  # chave -> rolesets de um agrupamento concluído, do menos para o mais recente
+_results_lock = threading.Lock()
+
+def start_job(key: tuple, function: Callable, *arguments) -> GroupingJob:
+    """
+    Inicia um agrupamento em segundo plano, ou devolve um job já concluído se o mesmo agrupamento (mesma chave) já
+    foi feito no processo.
+
+    Args:
+        key (tuple): identifica o agrupamento: corpus, verbo, método e parâmetros.
+        function (Callable): função de agrupamento, chamada como function(*arguments, job=job).
+        arguments: argumentos da função.
+    Returns:
+        GroupingJob: o job, para acompanhar o progresso, ler os rolesets ou cancelar.
+    """
+    job = GroupingJob(key)
+    with _results_lock:
+        cached = _results.get(key)
+        if cached is not None:
+            _results.move_to_end(key)
+    if cached is not None:
+        job._rolesets = copy.deepcopy(cached)
+        job.stage, job.status = "Resultado já calculado", FINISHED
+        return job
+
+    _executor.submit(_run_job, job, function, arguments)
+    return job
+
+def _run_job(job: GroupingJob, function: Callable, arguments: tuple) -> None:
+    with job._lock:
+        if job._cancelled.is_set():
+            return
+        job.status = RUNNING
+    try:
+        rolesets = function(*arguments, job=job)
+    except JobCancelled:
+        job.status = CANCELLED
+        return
+    except Exception as error:
+        job.error = f"{type(error).__name__}: {error}"
+        job.status = FAILED
+        return
+
+    with job._lock:
+        job._rolesets = rolesets
+    with _results_lock:
+        _results[job.key] = copy.deepcopy(rolesets)
+        while len(_results) > CACHED_RESULTS:
+            _results.popitem(last=False)
+    job.status = FINISHED
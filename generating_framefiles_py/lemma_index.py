@@ -0,0 +1,154 @@
+import os
+from typing import Optional
+
+import numpy as np
+
+# Sufixo do arquivo do índice, gravado ao lado do .conllu
+INDEX_SUFFIX = ".lemma_index.npz"
+
+class LemmaIndex:
+    """
+    Índice invertido (lema em minúsculas, UPOS) -> tokens do corpus. As posições dos tokens de cada chave ficam
+    contíguas e em ordem, no intervalo [starts[k], starts[k + 1]) de token_positions, junto da sentença de cada token.
+    Buscar um verbo é só um acesso ao dicionário de chaves e um recorte dos vetores.
+    """
+
+    def __init__(self, lemmas: np.ndarray, upos: np.ndarray, starts: np.ndarray, token_positions: np.ndarray, token_sentences: np.ndarray):
+        self.lemmas = lemmas
+        self.upos = upos
+        self.starts = starts
+        self.token_positions = token_positions
+        self.token_sentences = token_sentences
+        self._slot_table = None
+
+    @property
+    def _slots(self) -> dict:
+        # (lema, UPOS) -> posição da chave, montado na primeira busca (carregar o índice do disco fica mais rápido)
+        if self._slot_table is None:
+            keys = zip(self.lemmas.tolist(), self.upos.tolist())
+            self._slot_table = {(lemma, tag): slot for slot, (lemma, tag) in enumerate(keys)}
+        return self._slot_table
+
+    @classmethod
+    def build(cls, lemma_codes: np.ndarray, upos_codes: np.ndarray, strings: list, sentence_offsets: np.ndarray) -> "LemmaIndex":
+        """
+        Monta o índice a partir das colunas de um armazenamento colunar.
+
+        Args:
+            lemma_codes (np.ndarray): código do lema (já em minúsculas) de cada token.
+            upos_codes (np.ndarray): código da UPOS de cada token.
+            strings (list): tabela de strings dos códigos.
+            sentence_offsets (np.ndarray): início dos tokens de cada sentença (e o total de tokens, ao final).
+        Returns:
+            LemmaIndex: o índice de todos os tokens.
+        """
+        keys = lemma_codes.astype(np.int64) << 32 | upos_codes.astype(np.int64)
+        token_positions = np.argsort(keys, kind="stable")  # estável: tokens de uma chave em ordem no corpus
+        sorted_keys = keys[token_positions]
+        unique_keys, starts = np.unique(sorted_keys, return_index=True)
+        starts = np.append(starts, len(sorted_keys))
+
+        lemmas = np.array([strings[code] for code in (unique_keys >> 32).tolist()], dtype=str)
+        upos = np.array([strings[code] for code in (unique_keys & 0xFFFFFFFF).tolist()], dtype=str)
+        token_sentences = np.searchsorted(sentence_offsets, token_positions, side="right") - 1
+        # Posições de tokens e de sentenças cabem em 32 bits, como os deslocamentos do armazenamento colunar
+        return cls(lemmas, upos, starts, token_positions.astype(np.uint32), token_sentences.astype(np.uint32))
+
+    def tokens(self, lemma: str, upos: str = "VERB") -> np.ndarray:
+        """
+        Retorna as posições (no corpus) dos tokens com esse lema e essa UPOS.
+
+        Args:
+            lemma (str): lema, em minúsculas.
+            upos (str): etiqueta UPOS.
+        Returns:
+            np.ndarray: posições dos tokens, em ordem.
+        """
+        slot = self._slots.get((lemma, upos))
+        if slot is None:
+            return np.array([], dtype=np.uint32)
+        return self.token_positions[self.starts[slot]:self.starts[slot + 1]]
+
+    def sentences(self, lemma: str, upos: str = "VERB") -> np.ndarray:
+        """
+        Retorna as sentenças que têm algum token com esse lema e essa UPOS.
+
+        Args:
+            lemma (str): lema, em minúsculas.
+            upos (str): etiqueta UPOS.
+        Returns:
+            np.ndarray: posições das sentenças, em ordem e sem repetição.
+        """
+        slot = self._slots.get((lemma, upos))
+        if slot is None:
+            return np.array([], dtype=np.uint32)
+        return np.unique(self.token_sentences[self.starts[slot]:self.starts[slot + 1]])
+
+    def lemmas_with_upos(self, upos: str = "VERB") -> list:
+        """
+        Lista os lemas que aparecem com essa UPOS no corpus (por exemplo, todos os verbos).
+
+        Args:
+            upos (str): etiqueta UPOS.
+        Returns:
+            list: lemas em ordem alfabética.
+        """
+        return sorted(lemma for lemma, tag in self._slots if tag == upos)
+
+    def save(self, index_path: str, source_fingerprint: list) -> None:
+        """
+        Grava o índice em disco, junto da impressão digital da origem.
+
+        Args:
+            index_path (str): caminho do arquivo do índice.
+            source_fingerprint (list): tamanho e data de modificação do .conllu (vazia no cache do corpus, identificado pelo hash).
+        """
+        temporary_path = index_path + ".tmp.npz"
+        np.savez(
+            temporary_path,
+            lemmas=self.lemmas, upos=self.upos, starts=self.starts,
+            token_positions=self.token_positions, token_sentences=self.token_sentences,
+            source_fingerprint=np.array(source_fingerprint, dtype=np.int64),
+        )
+        os.replace(temporary_path, index_path)
+
+    @classmethod
+    def load(cls, index_path: str, source_fingerprint: list) -> Optional["LemmaIndex"]:
+        """
+        Lê o índice gravado em disco, se existe e foi gerado a partir da mesma origem.
+
+        Args:
+            index_path (str): caminho do arquivo do índice.
+            source_fingerprint (list): tamanho e data de modificação atuais do .conllu.
+        Returns:
+            Optional[LemmaIndex]: o índice, ou None se não existe ou está desatualizado.
+        """
+        if not os.path.isfile(index_path):
+            return None
+        with np.load(index_path) as saved:
+            if saved["source_fingerprint"].tolist() != list(source_fingerprint):
+                return None
+            return cls(saved["lemmas"], saved["upos"], saved["starts"], saved["token_positions"], saved["token_sentences"])
+
+def index_path_for(conllu_path: str) -> str:
+    """
+    Retorna o caminho do índice de um arquivo .conllu (ao lado dele).
+
+    Args:
+        conllu_path (str): caminho do arquivo CONLL-U.
+    Returns:
+        str: caminho do arquivo do índice.
+    """
+    return conllu_path + INDEX_SUFFIX
+
+def source_fingerprint(conllu_path: str) -> list:
+    """
+    Retorna a impressão digital (tamanho e data de modificação) de um arquivo .conllu.
+
+    Args:
+        conllu_path (str): caminho do arquivo CONLL-U.
+    Returns:
+        list: [tamanho em bytes, data de modificação em nanossegundos].
+    """
+    status = os.stat(conllu_path)
+    return [status.st_size, status.st_mtime_ns]
@@ -0,0 +1,261 @@
+from typing import Iterator
+
+import numpy as np
+
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
+
+from ann_index import DEFAULT_PROBES, IVFIndex
+
+# Similaridades calculadas a menos disso do limiar são refeitas par a par com cosine_similarity: a ordem das
+# somas no produto matriz-vetor é outra, e um par no limite não pode mudar de lado
+BORDERLINE_MARGIN = 1e-4
+
+# Quantidade máxima de similaridades calculadas de uma vez (um bloco de linhas da matriz de similaridade)
+BLOCK_ELEMENTS = 1 << 22
+
+# Pares no limite refeitos de cada vez num produto de matrizes, como o de cosine_similarity (a similaridade de
+# cada par é a diagonal do bloco)
+BORDERLINE_CHUNK = 64
+
+# Quantidade de sentenças comparadas de cada vez ao procurar o próximo vizinho na busca em profundidade
+NEIGHBOR_CHUNK = 256
+
+def recheck_borderline(normalized: np.ndarray, sources: np.ndarray, targets: np.ndarray, similarities: np.ndarray, similarity_threshold: float) -> np.ndarray:
+    """
+    Compara similaridades calculadas em blocos com o limiar, refazendo as que estão a menos de BORDERLINE_MARGIN
+    dele com a conta de cosine_similarity da matriz inteira de antes (produto de matrizes dos vetores
+    normalizados): a ordem das somas muda com o formato dos blocos, e um par no limite não pode mudar de lado por
+    isso. É a verificação do agrupamento guloso (joining_candidates), com os pares refeitos em blocos de
+    BORDERLINE_CHUNK, e não um a um.
+
+    Args:
+        normalized (np.ndarray): vetores normalizados como em cosine_similarity, um por sentença.
+        sources (np.ndarray): primeira sentença de cada par.
+        targets (np.ndarray): segunda sentença de cada par.
+        similarities (np.ndarray): similaridade calculada de cada par.
+        similarity_threshold (float): valor para similaridade de cossenos, que vai de -1 a 1.
+    Returns:
+        np.ndarray: máscara booleana, uma posição por par, True se o par atinge o limiar.
+    """
+    joins = similarities >= similarity_threshold
+    borderline = np.flatnonzero(np.abs(similarities - similarity_threshold) <= BORDERLINE_MARGIN)
+    for start in range(0, len(borderline), BORDERLINE_CHUNK):
+        chunk = borderline[start:start + BORDERLINE_CHUNK]
+        recomputed = np.diagonal(normalized[sources[chunk]] @ normalized[targets[chunk]].T)
+        joins[chunk] = recomputed >= similarity_threshold
+    return joins
+
+def joining_candidates(vectors: np.ndarray, normalized: np.ndarray, leader: int, candidates: np.ndarray, similarity_threshold: float) -> np.ndarray:
+    """
+    Retorna quais candidatas têm similaridade do cosseno >= limiar com a líder, num só produto matriz-vetor.
+
+    Args:
+        vectors (np.ndarray): vetores originais, um por sentença.
+        normalized (np.ndarray): os mesmos vetores, normalizados.
+        leader (int): posição da sentença líder.
+        candidates (np.ndarray): posições das candidatas.
+        similarity_threshold (float): valor para similaridade de cossenos, que vai de -1 a 1.
+    Returns:
+        np.ndarray: máscara booleana, uma posição por candidata.
+    """
+    similarities = normalized[candidates] @ normalized[leader]
+    joins = similarities >= similarity_threshold
+
+    # Pares no limite: mesma conta de antes, para o resultado ser exatamente o mesmo
+    for position in np.flatnonzero(np.abs(similarities - similarity_threshold) <= BORDERLINE_MARGIN).tolist():
+        joins[position] = cosine_similarity([vectors[leader]], [vectors[candidates[position]]])[0][0] >= similarity_threshold
+    return joins
+
+def greedy_groups(vectors: np.ndarray, similarity_threshold: float, use_ann: bool = False, n_probe: int = DEFAULT_PROBES) -> list:
+    """
+    Agrupa vetores pelo método guloso de líderes (veja iter_greedy_groups).
+
+    Returns:
+        list: grupos (listas de posições das sentenças), na ordem dos líderes.
+    """
+    return list(iter_greedy_groups(vectors, similarity_threshold, use_ann, n_probe))
+
+def iter_greedy_groups(vectors: np.ndarray, similarity_threshold: float, use_ann: bool = False, n_probe: int = DEFAULT_PROBES) -> Iterator[list]:
+    """
+    Agrupa vetores pelo método guloso de líderes: a primeira sentença ainda sem grupo vira líder e leva para o
+    seu grupo todas as sentenças seguintes, ainda sem grupo, com similaridade do cosseno >= limiar em relação a
+    ela. Com os vetores normalizados, cada líder custa um só produto matriz-vetor sobre as sentenças restantes.
+    Com o índice aproximado, a líder só é comparada com as sentenças das listas que ela consulta no índice.
+    Cada grupo é devolvido assim que formado (ele não muda mais), antes de os seguintes serem calculados.
+
+    Args:
+        vectors (np.ndarray): um vetor por sentença.
+        similarity_threshold (float): valor para similaridade de cossenos, que vai de -1 a 1.
+        use_ann (bool): se True, usa o índice aproximado (IVF), que pode deixar de juntar sentenças próximas.
+        n_probe (int): listas do índice consultadas por líder, se use_ann.
+    Yields:
+        list: cada grupo (lista de posições das sentenças), na ordem dos líderes.
+    """
+    vectors = np.asarray(vectors)
+    normalized = normalize(vectors.astype(np.float64))
+
+    if use_ann and len(vectors):
+        index = IVFIndex.build(normalized, n_probe=n_probe)
+        available = np.ones(len(vectors), dtype=bool)
+        for leader in range(len(vectors)):
+            if not available[leader]:
+                continue
+            available[leader] = False
+            candidates = index.candidates(leader)
+            candidates = candidates[available[candidates]]
+            members = candidates[joining_candidates(vectors, normalized, leader, candidates, similarity_threshold)]
+            available[members] = False
+            yield [leader] + members.tolist()
+        return
+
+    remaining = np.arange(len(vectors))  # Sentenças ainda sem grupo, em ordem
+    while len(remaining):
+        leader, candidates = remaining[0], remaining[1:]
+        joins = joining_candidates(vectors, normalized, leader, candidates, similarity_threshold)
+        yield [int(leader)] + candidates[joins].tolist()
+        remaining = candidates[~joins]
+
+def component_labels(normalized: np.ndarray, similarity_threshold: float) -> np.ndarray:
+    """
+    Encontra os componentes conexos do grafo que liga as sentenças com similaridade do cosseno >= limiar, sem
+    guardar a matriz de similaridade nem as arestas: a matriz é calculada em blocos de linhas e as arestas de cada
+    bloco só juntam componentes (união de conjuntos), trocadas antes por pares de componentes distintos. Os pares
+    no limite são refeitos (recheck_borderline).
+
+    Args:
+        normalized (np.ndarray): vetores normalizados (norma L2 = 1), um por sentença.
+        similarity_threshold (float): valor mínimo para similaridade de cossenos, que vai de -1 a 1.
+    Returns:
+        np.ndarray: componente de cada sentença.
+    """
+    n = len(normalized)
+    labels = np.arange(n)
+    block_rows = max(1, BLOCK_ELEMENTS // max(n, 1))
+    for start in range(0, n, block_rows):
+        end = min(start + block_rows, n)
+        # Só os pares i < j, como no laço original: colunas a partir de 'start' e acima da diagonal
+        similarities = normalized[start:end] @ normalized[start:].T
+        # Pares acima do limiar ou perto dele (estes são refeitos em seguida)
+        rows, columns = np.nonzero(np.triu(similarities >= similarity_threshold - BORDERLINE_MARGIN, k=1))
+        joins = recheck_borderline(normalized, rows + start, columns + start, similarities[rows, columns], similarity_threshold)
+        rows, columns = rows[joins], columns[joins]
+        if not len(rows):
+            continue
+        pairs = np.unique(labels[rows + start] * n + labels[columns + start])
+        edges = coo_matrix((np.ones(len(pairs), dtype=np.int8), (pairs // n, pairs % n)), shape=(n, n))
+        _, merged = connected_components(edges, directed=False)
+        labels = merged[labels]
+    return labels
+
+def depth_first_order(normalized: np.ndarray, members: np.ndarray, similarity_threshold: float) -> list:
+    """
+    Ordena as sentenças de um componente como a busca em profundidade recursiva usada antes, que partia da primeira
+    sentença e visitava os vizinhos em ordem crescente: a próxima sentença é sempre o primeiro vizinho ainda não
+    visitado da sentença no topo da pilha. Os vizinhos são procurados na hora, em blocos, em vez de guardados, e os
+    pares no limite são refeitos como em component_labels.
+
+    Args:
+        normalized (np.ndarray): vetores normalizados (norma L2 = 1), um por sentença.
+        members (np.ndarray): posições das sentenças do componente, em ordem crescente.
+        similarity_threshold (float): valor mínimo para similaridade de cossenos, que vai de -1 a 1.
+    Returns:
+        list: posições das sentenças, na ordem da busca.
+    """
+    unvisited = members
+    visited = np.zeros(len(normalized), dtype=bool)
+    order = []
+    compacted_at = 0  # quantidade de visitadas na última vez que 'unvisited' foi refeito
+
+    def first_unvisited_neighbor(node):
+        for start in range(0, len(unvisited), NEIGHBOR_CHUNK):
+            chunk = unvisited[start:start + NEIGHBOR_CHUNK]
+            chunk = chunk[~visited[chunk]]
+            if len(chunk):
+                similarities = normalized[chunk] @ normalized[node]
+                # A aresta (i, j) era lida como similaridade[i][j], com i < j
+                sources, targets = np.minimum(chunk, node), np.maximum(chunk, node)
+                hits = np.flatnonzero(recheck_borderline(normalized, sources, targets, similarities, similarity_threshold))
+                if len(hits):
+                    return int(chunk[hits[0]])
+        return None
+
+    while len(order) < len(members):
+        # Começa pela primeira sentença não visitada (só não é a única vez com o índice aproximado, ou se o
+        # arredondamento de algum par no limite diferir do cálculo dos componentes)
+        root = int(unvisited[~visited[unvisited]][0])
+        visited[root] = True
+        order.append(root)
+        stack = [root]
+        while stack and len(order) < len(members):
+            if 2 * (len(order) - compacted_at) > len(unvisited):  # descarta as já visitadas de tempos em tempos
+                unvisited = unvisited[~visited[unvisited]]
+                compacted_at = len(order)
+            neighbor = first_unvisited_neighbor(stack[-1])
+            if neighbor is None:
+                stack.pop()
+            else:
+                visited[neighbor] = True
+                order.append(neighbor)
+                stack.append(neighbor)
+    return order
+
+def ann_component_labels(normalized: np.ndarray, similarity_threshold: float, n_probe: int = DEFAULT_PROBES) -> np.ndarray:
+    """
+    Encontra os componentes conexos com as arestas achadas por buscas no índice aproximado (IVF), em vez de
+    comparar todos os pares. Arestas não achadas podem separar um componente em vários; nunca juntam dois.
+
+    Args:
+        normalized (np.ndarray): vetores normalizados (norma L2 = 1), um por sentença.
+        similarity_threshold (float): valor mínimo para similaridade de cossenos, que vai de -1 a 1.
+        n_probe (int): listas do índice consultadas por sentença.
+    Returns:
+        np.ndarray: componente de cada sentença.
+    """
+    n = len(normalized)
+    sources, targets = IVFIndex.build(normalized, n_probe=n_probe).range_search(normalized, similarity_threshold)
+    edges = coo_matrix((np.ones(len(sources), dtype=np.int8), (sources, targets)), shape=(n, n))
+    return connected_components(edges, directed=False)[1]
+
+def threshold_components(vectors: np.ndarray, similarity_threshold: float, use_ann: bool = False, n_probe: int = DEFAULT_PROBES) -> list:
+    """
+    Agrupa as sentenças ligadas por uma cadeia de similaridades >= limiar (veja iter_threshold_components).
+
+    Returns:
+        list: grupos (listas de posições das sentenças).
+    """
+    return list(iter_threshold_components(vectors, similarity_threshold, use_ann, n_probe))
+
+def iter_threshold_components(vectors: np.ndarray, similarity_threshold: float, use_ann: bool = False, n_probe: int = DEFAULT_PROBES) -> Iterator[list]:
+    """
+    Agrupa as sentenças ligadas por uma cadeia de similaridades >= limiar (componentes conexos do grafo de
+    similaridade). Os grupos saem na ordem da sua primeira sentença e, dentro de cada grupo, na ordem da busca em
+    profundidade usada antes. A matriz de similaridade é calculada com a mesma conta de cosine_similarity (vetores
+    normalizados e produto de matrizes, no tipo de dado dos vetores), mas em blocos, sem ser guardada inteira; como
+    no agrupamento guloso, os pares a menos de BORDERLINE_MARGIN do limiar são refeitos antes de comparar. Depois
+    que os componentes são encontrados, cada grupo é devolvido assim que a sua ordem é calculada.
+
+    Args:
+        vectors (np.ndarray): um vetor por sentença.
+        similarity_threshold (float): valor mínimo para similaridade de cossenos, que vai de -1 a 1.
+        use_ann (bool): se True, acha as arestas com o índice aproximado (IVF), que pode separar grupos.
+        n_probe (int): listas do índice consultadas por sentença, se use_ann.
+    Yields:
+        list: cada grupo (lista de posições das sentenças).
+    """
+    if len(vectors) == 0:
+        return
+    normalized = normalize(np.asarray(vectors), copy=True)
+    if use_ann:
+        labels = ann_component_labels(normalized, similarity_threshold, n_probe)
+    else:
+        labels = component_labels(normalized, similarity_threshold)
+
+    # Sentenças de cada componente em ordem crescente; componentes na ordem da sua primeira sentença
+    order = np.argsort(labels, kind="stable")
+    _, starts, sizes = np.unique(labels[order], return_index=True, return_counts=True)
+    components = sorted((order[start:start + size] for start, size in zip(starts, sizes)), key=lambda members: members[0])
+    for members in components:
+        yield [int(members[0])] if len(members) == 1 else depth_first_order(normalized, members, similarity_threshold)
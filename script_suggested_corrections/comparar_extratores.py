@@ -0,0 +1,63 @@
+import argparse # Opções de linha de comando
+import os # Listar os arquivos HTML
+import sys # Código de saída
+from main import encontrar_palavras_corrompidas_e_contextos, obter_conteudo_arquivo_corrompido # Caminho do BeautifulSoup
+from utils.extrator_texto import extrair_linhas_texto # Extrator streaming
+
+# Exemplos com os casos difíceis do extrator streaming (entidades, script/style, comentários, CDATA, fins de linha...)
+diretorio_exemplos = 'exemplos_extrator/'
+
+# Tamanhos de bloco usados na leitura streaming: blocos minúsculos cortam tags, entidades e fins de linha ao meio
+tamanhos_bloco = [1, 7, 64, 1 << 16]
+
+"""
+    Compara, num arquivo HTML, as linhas do texto visível e as ocorrências (palavra, linha, contexto) do
+    BeautifulSoup com as do extrator streaming, em cada tamanho de bloco. Retorna as diferenças encontradas.
+"""
+def comparar_arquivo(caminho_arq):
+    texto_soup = obter_conteudo_arquivo_corrompido(caminho_arq)
+    linhas_soup = texto_soup.splitlines()
+    ocorrencias_soup = encontrar_palavras_corrompidas_e_contextos(texto_soup)
+
+    diferencas = []
+    for tamanho_bloco in tamanhos_bloco:
+        linhas_streaming = list(extrair_linhas_texto(caminho_arq, tamanho_bloco))
+        if linhas_streaming != linhas_soup:
+            linha = next(
+                (i for i, (a, b) in enumerate(zip(linhas_soup, linhas_streaming)) if a != b),
+                min(len(linhas_soup), len(linhas_streaming))
+            )
+            diferencas.append(f"bloco {tamanho_bloco}: linhas diferem a partir da linha {linha + 1}")
+        elif encontrar_palavras_corrompidas_e_contextos(linhas_streaming) != ocorrencias_soup:
+            diferencas.append(f"bloco {tamanho_bloco}: ocorrências diferentes")
+    return diferencas, len(ocorrencias_soup)
+
+"""
+    Compara os dois extratores nos arquivos HTML dos diretórios dados e informa os arquivos com diferenças.
+"""
+def main():
+    parser = argparse.ArgumentParser(description="Confere se o extrator streaming dá as mesmas linhas e contextos que o BeautifulSoup.")
+    parser.add_argument(
+        'diretorios', nargs='*', default=[diretorio_exemplos],
+        help=f"diretórios com os arquivos HTML (padrão: {diretorio_exemplos}; use também Verbo-Brasil_html/ para o corpus inteiro)"
+    )
+    argumentos = parser.parse_args()
+
+    qtd_arquivos, qtd_ocorrencias, com_diferencas = 0, 0, 0
+    for diretorio in argumentos.diretorios:
+        for nome_arquivo in sorted(os.listdir(diretorio)):
+            caminho_arq = os.path.join(diretorio, nome_arquivo)
+            if not os.path.isfile(caminho_arq):
+                continue
+            diferencas, ocorrencias = comparar_arquivo(caminho_arq)
+            qtd_arquivos += 1
+            qtd_ocorrencias += ocorrencias
+            if diferencas:
+                com_diferencas += 1
+                print(f"{caminho_arq}: " + "; ".join(diferencas))
+
+    print(f"{qtd_arquivos} arquivos, {qtd_ocorrencias} ocorrências: {com_diferencas} com diferenças")
+    return 1 if com_diferencas else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,11 @@
+from main import caminho_artefato_lexico, caminho_lexico, caminhos_dominio
+from utils.lexico_compilado import carregar_ou_compilar
+
+def compilar_lexico(caminho_artefato, caminho_lexico, caminhos_dominio):
+    secoes = carregar_ou_compilar(caminho_artefato, caminho_lexico, caminhos_dominio)
+
+    for nome, secao in secoes.items():
+        print(f"Seção '{nome}': {len(secao)} palavras em {secao.qtd_esqueletos} esqueletos")
+
+if __name__ == '__main__':
+    compilar_lexico(caminho_artefato_lexico, caminho_lexico, caminhos_dominio)
@@ -1,19 +1,46 @@
 import re # Procurar padrões com expressões regulares
 from bs4 import BeautifulSoup # Limpar HTML e deixar apenas texto visível
 import os # Processar os arquivos e diretórios
-from utils.utils import carregar_lexico # Utilitários
+import argparse # Opções de linha de comando
+from concurrent.futures import ProcessPoolExecutor # Processar os arquivos em paralelo
+from contextlib import ExitStack # Pool e saídas abertos juntos, fechados ao fim
+from utils.utils import esqueleto_palavra # Utilitários
+from utils.lexico_compilado import carregar_ou_compilar, ler_hash_artefato # Léxico pré-compilado (mmap)
+from utils.cache_resolucoes import CacheResolucoes # Memória das resoluções entre arquivos e execuções
+from utils.dominio import descobrir_listas_dominio # Listas de nomes de domínio
+from utils.extrator_texto import extrair_linhas_texto # Extração do texto visível sem montar a árvore HTML
+from utils.saidas import abrir_saida, arquivos_saida, formatos_saida, registros_arquivo # Logs de texto e saídas estruturadas
+from utils.aplicacao import SaidaAplicacao # Gravação dos arquivos corrigidos
+from utils.ngramas import carregar_ou_compilar_ngramas, ler_hash_tabela, ordenar_candidatos # Ordenação dos candidatos pelo contexto
+from utils.manifesto import Manifesto # Resultados da execução anterior, para reprocessar só o que mudou
 
 ### Variáveis globais para controlar caminhos de arquivos e constantes ###
 
 # Léxico de suporte (lista possibilidades para substituição das palavras)
 caminho_lexico = 'assets/portifirstcol.tsv'  
 
+# Listas de nomes de domínio (países, pessoas...) que dificilmente estarão no léxico.
+# Todo arquivo .txt em 'assets/' é uma lista, com um nome por linha
+caminhos_dominio = descobrir_listas_dominio('assets/')
+
+# Artefato binário com o léxico e os nomes de domínio já indexados (recompilado se as fontes mudarem)
+caminho_artefato_lexico = 'assets/lexico_compilado.bin'
+
 # Caracteres possíveis para correções
 caracteres_especiais = "áàâãäçéèêëíìîïóòôõöúùûüñ"
 
 # Diretório dos arquivos originais a corrigir
 diretorio_arqs_originais = 'Verbo-Brasil_html/'
 
+# Cache em disco das resoluções de palavras corrompidas já vistas
+caminho_cache_resolucoes = 'cache_resolucoes.json'
+
+# Manifesto da última execução (hash e resultados de cada arquivo), para reprocessar só os que mudaram
+caminho_manifesto = 'manifesto.json'
+
+# Contagens de unigramas e bigramas do texto sem corrupção do corpus (recontadas se o corpus mudar)
+caminho_tabela_ngramas = 'assets/ngramas.bin'
+
 #######################################################################################################
 
 """
@@ -34,11 +61,12 @@ def obter_conteudo_arquivo_corrompido(caminho_arq_corrompido):
     Função que recebe o conteúdo do arquivo e retorna estrutura de dicionário com as palavras que 
     estão corrompidas e precisam de uma substituição, junto de suas linhas numeradas de aparição, 
     seus contextos (para ajudar a identificar o contexto e qual deve ser a palavra original) e um 
-    campo para as substituições possíveis.
+    campo para as substituições possíveis. O conteúdo pode ser o texto inteiro ou as suas linhas,
+    já separadas (como as que o extrator streaming entrega).
 """
 def encontrar_palavras_corrompidas_e_contextos(conteudo_arq):
     # Divida o conteúdo do arquivo por linhas
-    linhas = conteudo_arq.splitlines()
+    linhas = conteudo_arq.splitlines() if isinstance(conteudo_arq, str) else conteudo_arq
 
     # Dicionário (palavra_corrompida, nro_linha, contexto, substituições possíveis)
     palavras_corrompidas_dict = []
@@ -69,17 +97,22 @@ def encontrar_palavras_corrompidas_e_contextos(conteudo_arq):
 
 """
     Tentativa de substituição mais simples, apenas buscando as palavras exatas no léxico de apoio,
-    alterando o dicionário ao adicionar as substituições encontradas.
+    alterando o dicionário ao adicionar as substituições encontradas. A busca usa o índice por
+    esqueleto do léxico, então a regex só é testada nas candidatas com mesmo tamanho e mesmas letras
+    fora das posições acentuadas/corrompidas.
 """
-def pesquisar_no_lexico(palavra_dict, lexico):
+def pesquisar_no_lexico(palavra_dict, indice_lexico):
     # Criando a regex dinâmica para a palavra corrompida
-    regex_pattern = re.sub(r'\?', f'[{caracteres_especiais}]', palavra_dict["palavra"])
-
-    # Encontrando todas as correspondências no léxico
     # IGNORECASE para dar match em palavras com letras maiúsculas
+    regex_pattern = re.compile(re.sub(r'\?', f'[{caracteres_especiais}]', palavra_dict["palavra"]), re.IGNORECASE)
+
+    # Candidatas do léxico com o mesmo esqueleto da palavra corrompida
+    candidatas = indice_lexico.get(esqueleto_palavra(palavra_dict["palavra"]), [])
+
+    # Encontrando todas as correspondências entre as candidatas
     palavra_dict["substituicoes"] = {
-        palavra for palavra in lexico
-        if re.fullmatch(regex_pattern, palavra, re.IGNORECASE)
+        palavra for palavra in candidatas
+        if regex_pattern.fullmatch(palavra)
     }
 
     # Resolver palavra com primeira letra maiúscula (casos raros e poucas possibilidades esperadas)
@@ -88,21 +121,17 @@ def pesquisar_no_lexico(palavra_dict, lexico):
 
 """
     Verificar se palavra corrompida é um país ou nome de pessoa e, por isso, dificilmente estará no léxico de suporte,
-    apesar de ser palavra de uso comum.
+    apesar de ser palavra de uso comum. Os nomes vêm do índice por esqueleto do artefato compilado.
 """
-def pesquisar_dominio(palavra_dict):
-    # Criando a regex dinâmica para a palavra corrompida
-    regex_pattern = re.sub(r'\?', f'[{caracteres_especiais}]', palavra_dict["palavra"])
+def pesquisar_dominio(palavra_dict, indice_dominio):
+    # Criando a regex dinâmica para a palavra corrompida (aqui, diferenciando maiúsculas)
+    regex_pattern = re.compile(re.sub(r'\?', f'[{caracteres_especiais}]', palavra_dict["palavra"]))
 
-    # Inicia um set para armazenar as substituições encontradas
-    nomes_encontrados = set()
+    # Nomes de domínio com o mesmo esqueleto da palavra corrompida
+    candidatos = indice_dominio.get(esqueleto_palavra(palavra_dict["palavra"]), [])
 
-    # Abre o arquivo com os nomes de dominio
-    with open('assets/nomes_de_paises.txt', 'r', encoding='utf-8') as f:
-        for linha in f:
-            nome = linha.strip()  # Remove espaços em branco no início e fim da linha
-            if re.fullmatch(regex_pattern, nome):
-                nomes_encontrados.add(nome)
+    # Inicia um set para armazenar as substituições encontradas
+    nomes_encontrados = {nome for nome in candidatos if regex_pattern.fullmatch(nome)}
 
     # Atualiza a lista de substituições com os nomes encontrados
     palavra_dict["substituicoes"].update(nomes_encontrados)
@@ -111,8 +140,9 @@ def pesquisar_dominio(palavra_dict):
     Função que tenta identificar correções automáticas para as palavras que estão 'corrompidas', 
     decidindo em qual caso básico elas se encaixam: se busca no léxico, se aproxima de alguma palavra,
     mas não exatamente, se são apenas caracteres especiais indistinguíveis apenas pelo código...
+    Com um cache, cada forma corrompida só é resolvida na primeira vez em que aparece.
 """
-def procurar_substituicoes_palavras_corrompidas(palavras_corrompidas_dict, lexico):
+def procurar_substituicoes_palavras_corrompidas(palavras_corrompidas_dict, indice_lexico, indice_dominio, cache=None):
     for palavra_corrompida in palavras_corrompidas_dict:
         if palavra_corrompida["palavra"] == '?': 
             palavra_corrompida["substituicoes"].extend(['?', '\'', '\"', 'é', 'à', 'ó', 'á'])
@@ -121,48 +151,20 @@ def procurar_substituicoes_palavras_corrompidas(palavras_corrompidas_dict, lexic
             palavra_corrompida["substituicoes"].extend('à')
             continue
 
-        pesquisar_no_lexico(palavra_corrompida, lexico)
+        if cache is not None:
+            substituicoes = cache.obter(palavra_corrompida["palavra"])
+            if substituicoes is not None:
+                palavra_corrompida["substituicoes"] = substituicoes
+                continue
+
+        pesquisar_no_lexico(palavra_corrompida, indice_lexico)
 
         qtd_possibilidades = len(palavra_corrompida["substituicoes"])
         if qtd_possibilidades == 0:  # nome de país ou nome de pessoa famosa?
-            pesquisar_dominio(palavra_corrompida)
-        if qtd_possibilidades == 0:
-            pesquisar_dominio(palavra_corrompida)
-
-"""
-    Retorna a exibição em string da estrutura da palavra para os logs.
-"""
-def estrutura_palavra_log(palavra_corrompida):
-    string = ""
-    string += f'\tPalavra: {palavra_corrompida["palavra"]}\n'
-    string += f'\tNúmero da linha no arquivo: {palavra_corrompida["linha"]}\n'
-    string += f'\tContexto/frase original: \"{palavra_corrompida["contexto_original"]}\"\n'
-    string += f'\tSubstituição(ões) encontrada(s): '
+            pesquisar_dominio(palavra_corrompida, indice_dominio)
 
-    return string
-
-"""
-    Os três logs pedidos são escritos para os casos processados, contendo, para cada um deles,
-    o nome do arquivo, a frase original, a palavra corrompida e a correção sugerida/possível (se houver),
-    separando os casos da seguinte forma:
-    - inclui no log_sem_correcoes.txt se não foi possível distinguir uma correção;
-    - inclui no log_uma_correcao.txt se foi possível encontrar exatamente uma correção;
-    - inclui no log_n_correcoes.txt se foram encontradas múltiplas correções possíveis.
-"""
-def escrever_logs(logs, palavras_corrompidas_dict):
-    for palavra_corrompida in palavras_corrompidas_dict:
-        estrutura_palavra_log(palavra_corrompida)
-        qtd_subst_encontradas = len(palavra_corrompida["substituicoes"])            
-
-        if qtd_subst_encontradas == 0:
-            logs[0].write(estrutura_palavra_log(palavra_corrompida) + "-\n")
-            logs[0].write("--------------------------------------------------------\n")
-        elif qtd_subst_encontradas == 1:
-            logs[1].write(estrutura_palavra_log(palavra_corrompida) + str(palavra_corrompida["substituicoes"]) + "\n")
-            logs[1].write("--------------------------------------------------------\n")
-        else:
-            logs[2].write(estrutura_palavra_log(palavra_corrompida) + str(palavra_corrompida["substituicoes"]) + "\n")
-            logs[2].write("--------------------------------------------------------\n")
+        if cache is not None:
+            cache.guardar(palavra_corrompida["palavra"], palavra_corrompida["substituicoes"])
 
 """
     Função para prints adicionais.
@@ -171,38 +173,217 @@ def exibir_info_na_tela(palavras_corrompidas_dict):
     for palavra_corrompida in palavras_corrompidas_dict:
             print(palavra_corrompida["palavra"], end=" | ")
 
-####################################################################################################
+"""
+    Função que processa um arquivo do VBR: extrai o texto, encontra as palavras corrompidas e procura as
+    substituições. Entradas que não são arquivos resultam numa lista vazia.
+    O texto vem do BeautifulSoup ou, com o extrator 'streaming', direto do parser incremental, linha a linha.
+"""
+def processar_arquivo(caminho_arq_corrompido, indice_lexico, indice_dominio, cache=None, extrator='beautifulsoup'):
+    if not os.path.isfile(caminho_arq_corrompido): # Arquivo do VBR com erros, que se deseja corrigir
+        return []
 
-def main():
-    lexico = carregar_lexico(caminho_lexico)
+    if extrator == 'streaming':
+        conteudo_arq = extrair_linhas_texto(caminho_arq_corrompido)
+    else:
+        conteudo_arq = obter_conteudo_arquivo_corrompido(caminho_arq_corrompido)
+    palavras_corrompidas_dict = encontrar_palavras_corrompidas_e_contextos(conteudo_arq)
+    procurar_substituicoes_palavras_corrompidas(palavras_corrompidas_dict, indice_lexico, indice_dominio, cache)
+
+    return palavras_corrompidas_dict
 
-    # Abrir os arquivos de log para escrita simultânea
-    with open('log_sem_correcoes.txt', 'w', encoding='utf-8') as log1, \
-        open('log_uma_correcao.txt', 'w', encoding='utf-8') as log2, \
-        open('log_n_correcoes.txt', 'w', encoding='utf-8') as log3:
+### Execução paralela: cada processo do pool abre o artefato compilado uma única vez ###
 
-        logs = [log1, log2, log3]  # Lista de arquivos de log para passar às funções
+indices_worker = None
+cache_worker = None
+extrator_worker = None
 
-        # Obter e ordenar os arquivos na pasta de forma alfabética
-        arquivos_ordenados = sorted(os.listdir(diretorio_arqs_originais))
+"""
+    Inicializador de cada processo do pool: abre os índices (via mmap, então as páginas do artefato são
+    compartilhadas entre os processos) e os guarda para todos os arquivos que o processo receber, junto
+    de uma cópia do cache de resoluções do processo principal.
+"""
+def inicializar_worker(versao_cache, resolucoes, extrator):
+    global indices_worker, cache_worker, extrator_worker
+    indices_worker = carregar_ou_compilar(caminho_artefato_lexico, caminho_lexico, caminhos_dominio)
+    cache_worker = CacheResolucoes(versao_cache, resolucoes)
+    extrator_worker = extrator
 
-        # Percorrer todos os arquivos VBR
-        for nome_arquivo in arquivos_ordenados:
-            caminho_arq_corrompido = os.path.join(diretorio_arqs_originais, nome_arquivo)
+"""
+    Processa um arquivo num processo do pool e devolve, junto do resultado, o que o cache do processo
+    aprendeu com ele, para ser mesclado no cache principal.
+"""
+def processar_arquivo_worker(caminho_arq_corrompido):
+    palavras_corrompidas_dict = processar_arquivo(caminho_arq_corrompido, indices_worker['lexico'], indices_worker['dominio'], cache_worker, extrator_worker)
+    return palavras_corrompidas_dict, cache_worker.retirar_novidades()
 
-            for log in logs:
-                log.write("\n==========================================================\n")
-                log.write(f"=== Analisando o arquivo {nome_arquivo} ===\n")
-                log.write("==========================================================\n")
-            
-            print(f"Analisando o arquivo {nome_arquivo}...")
+"""
+    Lê as opções de linha de comando.
+"""
+def ler_argumentos():
+    parser = argparse.ArgumentParser(description="Sugere correções para as palavras corrompidas dos arquivos do Verbo-Brasil.")
+    parser.add_argument(
+        '--workers', type=int, default=1, metavar='N',
+        help="número de processos para analisar os arquivos em paralelo (padrão: 1, sequencial)"
+    )
+    parser.add_argument(
+        '--cache', default=caminho_cache_resolucoes, metavar='CAMINHO',
+        help=f"arquivo do cache de resoluções entre execuções (padrão: {caminho_cache_resolucoes})"
+    )
+    parser.add_argument(
+        '--sem-cache', action='store_true',
+        help="não lê nem grava o cache em disco (o cache entre arquivos continua ativo na execução)"
+    )
+    parser.add_argument(
+        '--extrator', choices=['beautifulsoup', 'streaming'], default='beautifulsoup',
+        help="como extrair o texto visível do HTML: árvore completa do BeautifulSoup (padrão) ou parser incremental, linha a linha"
+    )
+    parser.add_argument(
+        '--saida', action='append', metavar='FORMATO[:CAMINHO]',
+        help="saída dos resultados, repetível: " + ", ".join(formatos_saida) + " (padrão: texto, os três logs); "
+             "jsonl e csv gravam uma linha por ocorrência, em ocorrencias.<formato> ou no CAMINHO dado"
+    )
+    parser.add_argument(
+        '--completo', action='store_true',
+        help="analisa todos os arquivos de novo, sem reaproveitar os resultados do manifesto da execução anterior"
+    )
+    parser.add_argument(
+        '--sem-ordenacao', action='store_true',
+        help="não ordena os candidatos múltiplos pelas contagens de n-gramas do corpus"
+    )
+    parser.add_argument(
+        '--margem-confianca', type=float, metavar='R',
+        help="passa para o grupo de uma correção as ocorrências em que o melhor candidato pontua ao menos R vezes o segundo"
+    )
+    parser.add_argument(
+        '--conllu', metavar='CAMINHO',
+        help="arquivo CoNLL-U (como o do PBP) cujas formas também entram nas contagens de n-gramas"
+    )
+    parser.add_argument(
+        '--aplicar', metavar='DESTINO',
+        help="grava em DESTINO os arquivos com as correções únicas (as de log_uma_correcao.txt) aplicadas; "
+             "se DESTINO for o diretório original, os arquivos são corrigidos no lugar"
+    )
+    argumentos = parser.parse_args()
+
+    if argumentos.workers < 1:
+        parser.error("--workers deve ser um número maior que zero")
+    if argumentos.margem_confianca is not None and argumentos.margem_confianca <= 1:
+        parser.error("--margem-confianca deve ser maior que 1")
+    if argumentos.margem_confianca is not None and argumentos.sem_ordenacao:
+        parser.error("--margem-confianca não pode ser usada com --sem-ordenacao")
+
+    argumentos.saidas = []
+    for opcao in argumentos.saida or ['texto']:
+        formato, _, caminho = opcao.partition(':')
+        if formato not in formatos_saida:
+            parser.error(f"formato de saída desconhecido: {formato}")
+        argumentos.saidas.append((formato, caminho or None))
+    return argumentos
+
+####################################################################################################
 
-            if os.path.isfile(caminho_arq_corrompido): # Arquivo do VBR com erros, que se deseja corrigir    
-                conteudo_arq = obter_conteudo_arquivo_corrompido(caminho_arq_corrompido)
-                palavras_corrompidas_dict = encontrar_palavras_corrompidas_e_contextos(conteudo_arq)
-                procurar_substituicoes_palavras_corrompidas(palavras_corrompidas_dict, lexico)
+def main():
+    argumentos = ler_argumentos()
+
+    # Léxico e nomes de domínio indexados, lidos do artefato compilado (e compilado aqui, se preciso,
+    # antes de qualquer worker tentar abri-lo)
+    indices = carregar_ou_compilar(caminho_artefato_lexico, caminho_lexico, caminhos_dominio)
+    indice_lexico, indice_dominio = indices['lexico'], indices['dominio']
+
+    # Resoluções já conhecidas (de execuções anteriores com o mesmo artefato)
+    versao_cache = ler_hash_artefato(caminho_artefato_lexico).hex()
+    if argumentos.sem_cache:
+        cache = CacheResolucoes(versao_cache)
+    else:
+        cache = CacheResolucoes.carregar(argumentos.cache, versao_cache)
+
+    # Obter e ordenar os arquivos na pasta de forma alfabética
+    arquivos_ordenados = sorted(
+        nome_arquivo for nome_arquivo in os.listdir(diretorio_arqs_originais)
+        if os.path.isfile(os.path.join(diretorio_arqs_originais, nome_arquivo))
+    )
+    caminhos_arqs = [os.path.join(diretorio_arqs_originais, nome_arquivo) for nome_arquivo in arquivos_ordenados]
+
+    # Comparar cada arquivo com o manifesto da execução anterior: só os novos ou alterados são analisados
+    versao_analise = f'{versao_cache}:{argumentos.extrator}'
+    manifesto = Manifesto(versao_analise) if argumentos.completo else Manifesto.carregar(caminho_manifesto, versao_analise)
+    impressoes = {
+        nome_arquivo: manifesto.impressao_digital(nome_arquivo, caminho)
+        for nome_arquivo, caminho in zip(arquivos_ordenados, caminhos_arqs)
+    }
+    alterados = {nome_arquivo for nome_arquivo in arquivos_ordenados if not manifesto.inalterado(nome_arquivo, impressoes[nome_arquivo])}
+    removidos = set(manifesto.arquivos) - set(impressoes)
+
+    # Contagens de n-gramas para ordenar os candidatos múltiplos
+    tabela_ngramas = None
+    if not argumentos.sem_ordenacao:
+        tabela_ngramas = carregar_ou_compilar_ngramas(caminho_tabela_ngramas, caminhos_arqs, extrair_linhas_texto, argumentos.conllu)
+
+    # Tudo o que define o conteúdo das saídas, além dos registros: se nada disso nem nenhum arquivo mudou,
+    # e as saídas ainda existem, não há o que reescrever
+    configuracao_saidas = {
+        'saidas': [[formato, caminho] for formato, caminho in argumentos.saidas],
+        'aplicar': argumentos.aplicar,
+        'ngramas': None if tabela_ngramas is None else ler_hash_tabela(caminho_tabela_ngramas).hex(),
+        'margem_confianca': argumentos.margem_confianca,
+    }
+    arquivos_das_saidas = [caminho for formato, caminho_saida in argumentos.saidas for caminho in arquivos_saida(formato, caminho_saida)]
+    if argumentos.aplicar:
+        arquivos_das_saidas.append(argumentos.aplicar)
+    if not alterados and not removidos and manifesto.configuracao_saidas == configuracao_saidas \
+            and all(os.path.exists(caminho) for caminho in arquivos_das_saidas):
+        print(f"Nenhum dos {len(arquivos_ordenados)} arquivos mudou desde a última execução; saídas mantidas.")
+        return
+
+    # Arquivos sem registros guardados (arquivo de registros apagado, por exemplo) também são analisados
+    alterados = [
+        nome_arquivo for nome_arquivo in arquivos_ordenados
+        if nome_arquivo in alterados or manifesto.registros_arquivo(nome_arquivo) is None
+    ]
+    print(f"{len(alterados)} arquivos a analisar, {len(arquivos_ordenados) - len(alterados)} reaproveitados do manifesto.")
+    registros_manifesto = {}
+
+    # Abrir as saídas (logs de texto e/ou JSONL/CSV), que recebem os mesmos registros
+    with ExitStack() as pilha:
+        saidas = [pilha.enter_context(abrir_saida(formato, caminho)) for formato, caminho in argumentos.saidas]
+        if argumentos.aplicar:
+            saidas.append(pilha.enter_context(SaidaAplicacao(diretorio_arqs_originais, argumentos.aplicar)))
+
+        # Os resultados dos arquivos alterados chegam na mesma ordem alfabética, em qualquer um dos modos
+        caminhos_alterados = [os.path.join(diretorio_arqs_originais, nome_arquivo) for nome_arquivo in alterados]
+        if argumentos.workers > 1 and len(alterados) > 1:
+            pool = pilha.enter_context(ProcessPoolExecutor(argumentos.workers, initializer=inicializar_worker, initargs=(versao_cache, cache.resolucoes, argumentos.extrator)))
+            resultados = pool.map(processar_arquivo_worker, caminhos_alterados, chunksize=8)
+        else:
+            resultados = ((processar_arquivo(caminho, indice_lexico, indice_dominio, cache, argumentos.extrator), None) for caminho in caminhos_alterados)
+        alterados = set(alterados)
 
-                escrever_logs(logs, palavras_corrompidas_dict)
+        # Percorrer todos os arquivos VBR, intercalando os resultados novos com os guardados no manifesto
+        for nome_arquivo in arquivos_ordenados:
+            if nome_arquivo in alterados:
+                palavras_corrompidas_dict, novidades_cache = next(resultados)
+                if novidades_cache is not None:
+                    cache.mesclar(*novidades_cache)
+
+                print(f"Analisando o arquivo {nome_arquivo}...")
+                registros = list(registros_arquivo(nome_arquivo, palavras_corrompidas_dict))
+            else:
+                registros = manifesto.registros_arquivo(nome_arquivo)
+
+            # O manifesto guarda os registros antes da ordenação, que muda quando o corpus muda
+            registros_manifesto[nome_arquivo] = registros
+            registros = [dict(registro) for registro in registros]
+            if tabela_ngramas is not None:
+                ordenar_candidatos(registros, tabela_ngramas, argumentos.margem_confianca)
+            for saida in saidas:
+                saida.escrever_arquivo(nome_arquivo, registros)
+
+    manifesto.atualizar(impressoes, registros_manifesto, configuracao_saidas)
+    manifesto.salvar(caminho_manifesto)
+
+    if not argumentos.sem_cache:
+        cache.salvar(argumentos.cache)
+    print(cache.resumo())
         
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,135 @@
+import os # Caminhos e troca atômica dos arquivos corrigidos
+import re # Encontrar as palavras corrompidas e os fins de linha no HTML
+import shutil # Cópia dos arquivos inalterados quando não dá para criar hard link
+
+from utils.extrator_texto import ExtratorTextoVisivel
+from utils.saidas import grupo_uma_correcao
+
+# Mesmo padrão usado para achar as palavras corrompidas no texto visível
+regex_palavra_corrompida = re.compile(r'\w*\?+\w*')
+
+"""
+    Parser que, além de reconstruir o texto visível, anota cada palavra corrompida encontrada nos trechos
+    de texto visível junto da sua posição (início e fim) no HTML original. Como os textos não são convertidos
+    (convert_charrefs=False), cada trecho recebido é exatamente um pedaço do HTML, na posição dada por getpos().
+"""
+class LocalizadorPalavrasCorrompidas(ExtratorTextoVisivel):
+    def __init__(self, texto_html):
+        super().__init__()
+        self.inicios_linhas = [0] + [fim_linha.end() for fim_linha in re.finditer('\n', texto_html)]
+        self.ocorrencias = []
+
+    def handle_data(self, data):
+        super().handle_data(data)
+        if self.pilha_invisiveis:
+            return
+        linha, coluna = self.getpos()
+        inicio_trecho = self.inicios_linhas[linha - 1] + coluna
+        for palavra_corrompida in regex_palavra_corrompida.finditer(data):
+            self.ocorrencias.append((inicio_trecho + palavra_corrompida.start(), inicio_trecho + palavra_corrompida.end(), palavra_corrompida.group()))
+
+"""
+    Retorna as palavras corrompidas do texto visível de um HTML, em ordem, como (início, fim, palavra),
+    com as posições no próprio texto do HTML.
+"""
+def localizar_palavras_corrompidas(texto_html):
+    localizador = LocalizadorPalavrasCorrompidas(texto_html)
+    localizador.feed(texto_html)
+    localizador.close()
+    return localizador.ocorrencias
+
+"""
+    Função que aplica ao texto de um HTML as correções dos registros com exatamente um candidato.
+    As palavras localizadas no HTML precisam ser as mesmas dos registros, na mesma ordem; se não forem
+    (uma palavra partida por uma tag ou entidade, por exemplo), retorna None e o arquivo não é alterado.
+    Retorna o novo texto e a quantidade de correções feitas.
+"""
+def aplicar_correcoes(texto_html, registros):
+    ocorrencias = localizar_palavras_corrompidas(texto_html)
+    if [palavra for _, _, palavra in ocorrencias] != [registro['palavra'] for registro in registros]:
+        return None
+
+    trechos = []
+    posicao = 0
+    qtd_correcoes = 0
+    for (inicio, fim, _), registro in zip(ocorrencias, registros):
+        if registro['grupo'] != grupo_uma_correcao:
+            continue
+        trechos.append(texto_html[posicao:inicio])
+        trechos.append(registro['candidatos'][0])
+        posicao = fim
+        qtd_correcoes += 1
+    trechos.append(texto_html[posicao:])
+
+    return ''.join(trechos), qtd_correcoes
+
+"""
+    Saída que grava os arquivos do VBR corrigidos num diretório espelho (ou no próprio diretório original,
+    se for o mesmo). Só as palavras com exatamente uma correção são trocadas, direto no texto original,
+    então todo o resto do arquivo fica byte a byte como estava. Arquivos sem correções a aplicar viram
+    hard links para o original (ou cópias, entre sistemas de arquivos diferentes), e nem são tocados
+    se o destino já é o próprio original.
+"""
+class SaidaAplicacao:
+    def __init__(self, diretorio_origem, diretorio_destino):
+        self.diretorio_origem = diretorio_origem
+        self.diretorio_destino = diretorio_destino
+        os.makedirs(diretorio_destino, exist_ok=True)
+        self.qtd_correcoes = 0
+        self.qtd_arquivos_corrigidos = 0
+        self.qtd_arquivos_inalterados = 0
+        self.arquivos_divergentes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def escrever_arquivo(self, nome_arquivo, registros):
+        origem = os.path.join(self.diretorio_origem, nome_arquivo)
+        destino = os.path.join(self.diretorio_destino, nome_arquivo)
+        if not os.path.isfile(origem):
+            return
+
+        if any(registro['grupo'] == grupo_uma_correcao for registro in registros):
+            with open(origem, 'rb') as f:
+                texto_html = f.read().decode('utf-8')
+            resultado = aplicar_correcoes(texto_html, registros)
+            if resultado is None:
+                self.arquivos_divergentes.append(nome_arquivo)
+            else:
+                texto_corrigido, qtd_correcoes = resultado
+                self._gravar(destino, texto_corrigido.encode('utf-8'))
+                self.qtd_correcoes += qtd_correcoes
+                self.qtd_arquivos_corrigidos += 1
+                return
+
+        self._espelhar(origem, destino)
+        self.qtd_arquivos_inalterados += 1
+
+    def _gravar(self, destino, conteudo):
+        # Arquivo novo trocado de uma vez: o destino pode ser um hard link para o original
+        caminho_temporario = destino + '.tmp'
+        with open(caminho_temporario, 'wb') as f:
+            f.write(conteudo)
+        os.replace(caminho_temporario, destino)
+
+    def _espelhar(self, origem, destino):
+        if os.path.exists(destino) and os.path.samefile(origem, destino):
+            return
+        caminho_temporario = destino + '.tmp'
+        if os.path.exists(caminho_temporario):
+            os.remove(caminho_temporario)
+        try:
+            os.link(origem, caminho_temporario)
+        except OSError:
+            shutil.copy2(origem, caminho_temporario)
+        os.replace(caminho_temporario, destino)
+
+    def fechar(self):
+        print(f"Aplicação em {self.diretorio_destino}: {self.qtd_correcoes} correções em {self.qtd_arquivos_corrigidos} arquivos, "
+              f"{self.qtd_arquivos_inalterados} arquivos inalterados")
+        if self.arquivos_divergentes:
+            print(f"{len(self.arquivos_divergentes)} arquivos não corrigidos (palavras do HTML diferentes das analisadas): "
+                  + ", ".join(self.arquivos_divergentes))
@@ -0,0 +1,66 @@
+import json # Formato do cache em disco
+import os # Troca atômica do arquivo do cache
+
+"""
+    Cache das resoluções de palavras corrompidas, compartilhado entre todos os arquivos processados e
+    salvo em disco entre execuções. A chave é a forma corrompida exatamente como aparece no texto (a
+    busca nos nomes de domínio diferencia maiúsculas, então formas com caixas diferentes não se misturam)
+    e o valor é o conjunto de substituições encontrado para ela.
+
+    O cache vale apenas para o artefato compilado com que foi gerado: se o léxico ou as listas de nomes
+    mudarem, o hash muda e as resoluções antigas são descartadas.
+"""
+class CacheResolucoes:
+    def __init__(self, versao, resolucoes=None):
+        self.versao = versao
+        self.resolucoes = dict(resolucoes or {})
+        self.novas = {}
+        self.acertos = 0
+        self.falhas = 0
+
+    @classmethod
+    def carregar(cls, caminho_cache, versao):
+        if os.path.isfile(caminho_cache):
+            with open(caminho_cache, 'r', encoding='utf-8') as f:
+                conteudo = json.load(f)
+            if conteudo.get('versao') == versao:
+                return cls(versao, conteudo['resolucoes'])
+        return cls(versao)
+
+    def obter(self, forma):
+        substituicoes = self.resolucoes.get(forma)
+        if substituicoes is None:
+            self.falhas += 1
+            return None
+        self.acertos += 1
+        return set(substituicoes)
+
+    def guardar(self, forma, substituicoes):
+        self.resolucoes[forma] = self.novas[forma] = sorted(substituicoes)
+
+    """
+        Junta ao cache as resoluções novas e os contadores vindos de outro processo (modo paralelo).
+    """
+    def mesclar(self, novas, acertos, falhas):
+        self.resolucoes.update(novas)
+        self.novas.update(novas)
+        self.acertos += acertos
+        self.falhas += falhas
+
+    """
+        Retorna (e esquece) as resoluções novas e os contadores desde a última chamada, para um processo
+        do pool devolvê-los junto com o resultado de cada arquivo.
+    """
+    def retirar_novidades(self):
+        novidades = (self.novas, self.acertos, self.falhas)
+        self.novas, self.acertos, self.falhas = {}, 0, 0
+        return novidades
+
+    def salvar(self, caminho_cache):
+        caminho_temporario = caminho_cache + '.tmp'
+        with open(caminho_temporario, 'w', encoding='utf-8') as f:
+            json.dump({'versao': self.versao, 'resolucoes': self.resolucoes}, f, ensure_ascii=False)
+        os.replace(caminho_temporario, caminho_cache)
+
+    def resumo(self):
+        return f"Cache de resoluções: {self.acertos} acertos, {self.falhas} falhas ({len(self.novas)} formas novas)"
@@ -0,0 +1,41 @@
+import os # Descobrir as listas de nomes no diretório de assets
+
+from utils.utils import esqueleto_palavra
+
+# Extensão das listas de nomes de domínio (o léxico de suporte é .tsv e não entra aqui)
+extensao_listas_dominio = '.txt'
+
+"""
+    Função que descobre as listas de nomes de domínio (países, pessoas...) de um diretório: todo arquivo
+    com a extensão das listas conta, então basta colocar uma nova lista em 'assets/' para que ela passe a
+    ser consultada. A ordem é alfabética para que o hash das fontes não dependa do sistema de arquivos.
+"""
+def descobrir_listas_dominio(diretorio):
+    return sorted(
+        os.path.join(diretorio, nome_arquivo)
+        for nome_arquivo in os.listdir(diretorio)
+        if nome_arquivo.endswith(extensao_listas_dominio) and os.path.isfile(os.path.join(diretorio, nome_arquivo))
+    )
+
+"""
+    Função que lê uma lista de nomes (um por linha) e retorna apenas os que têm caractere especial, já que
+    os demais nunca poderiam substituir uma palavra corrompida.
+"""
+def carregar_nomes_dominio(caminho_nomes):
+    nomes = set()
+    with open(caminho_nomes, 'r', encoding='utf-8') as f:
+        for linha in f:
+            nome = linha.strip()
+            if '?' in esqueleto_palavra(nome):
+                nomes.add(nome)
+    return nomes
+
+"""
+    Função que junta todas as listas de nomes de domínio configuradas num único conjunto, que vira uma
+    seção do artefato compilado e é consultado pelo mesmo índice por esqueleto do léxico.
+"""
+def carregar_gazetteer(caminhos_dominio):
+    nomes_dominio = set()
+    for caminho in caminhos_dominio:
+        nomes_dominio.update(carregar_nomes_dominio(caminho))
+    return nomes_dominio
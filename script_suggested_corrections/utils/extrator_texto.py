@@ -0,0 +1,159 @@
+from html.entities import html5 as entidades_html5 # Tabela das entidades nomeadas (&nbsp; etc.)
+from html import unescape # Referências numéricas (&#233; etc.)
+from html.parser import HTMLParser # Parser incremental da biblioteca padrão
+import re # Detectar fins de linha no texto acumulado
+
+### Regras do BeautifulSoup (html.parser) reproduzidas aqui, para o texto sair idêntico ao get_text() ###
+
+# Tags que nunca têm fechamento (o BeautifulSoup as fecha assim que abrem)
+tags_vazias = {
+    'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command', 'embed', 'frame', 'hr', 'image', 'img',
+    'input', 'isindex', 'keygen', 'link', 'menuitem', 'meta', 'nextid', 'param', 'source', 'spacer', 'track', 'wbr'
+}
+
+# Tags cujo texto não é 'visível' (o get_text() ignora os textos dentro delas)
+tags_texto_invisivel = {'rt', 'rp', 'style', 'script', 'template'}
+
+# Tags dentro das quais os espaços em branco são preservados
+tags_preservam_espacos = {'pre', 'textarea'}
+
+# Trechos só com esses caracteres viram um único espaço ou quebra de linha
+espacos_ascii = ' \n\t\x0c\r'
+
+# Caracteres que o str.splitlines() considera fim de linha
+fins_de_linha = '\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029'
+regex_fim_de_linha = re.compile(f'[{fins_de_linha}]')
+
+"""
+    Parser incremental que reconstrói o texto visível de um HTML sem montar a árvore do documento.
+    Mantém apenas a pilha de nomes das tags abertas (para fechar tags como o BeautifulSoup faz) e
+    entrega o texto já dividido em linhas completas, na mesma numeração de get_text().splitlines().
+"""
+class ExtratorTextoVisivel(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.pilha_tags = []
+        self.qtd_abertas = {}
+        self.pilha_invisiveis = []  # posições, na pilha de tags, das tags de texto invisível abertas
+        self.pilha_preservam = []  # posições, na pilha de tags, das tags que preservam espaços abertas
+        self.vazias_ja_fechadas = []
+        self.dados_atuais = []
+        self.texto_pendente = ''
+        self.linhas_prontas = []
+
+    ### Pilha de tags ###
+
+    def _abrir_tag(self, tag):
+        self._finalizar_trecho()
+        if tag in tags_texto_invisivel:
+            self.pilha_invisiveis.append(len(self.pilha_tags))
+        if tag in tags_preservam_espacos:
+            self.pilha_preservam.append(len(self.pilha_tags))
+        self.pilha_tags.append(tag)
+        self.qtd_abertas[tag] = self.qtd_abertas.get(tag, 0) + 1
+
+    def _fechar_ate(self, tag):
+        # Fecha as tags abertas até (e incluindo) a mais recente com esse nome; se não há nenhuma, nada muda
+        self._finalizar_trecho()
+        while self.qtd_abertas.get(tag):
+            posicao = len(self.pilha_tags) - 1
+            fechada = self.pilha_tags.pop()
+            self.qtd_abertas[fechada] -= 1
+            if self.pilha_invisiveis and self.pilha_invisiveis[-1] == posicao:
+                self.pilha_invisiveis.pop()
+            if self.pilha_preservam and self.pilha_preservam[-1] == posicao:
+                self.pilha_preservam.pop()
+            if fechada == tag:
+                break
+
+    def handle_starttag(self, tag, attrs):
+        self._abrir_tag(tag)
+        if tag in tags_vazias:
+            self._fechar_ate(tag)
+            self.vazias_ja_fechadas.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self._abrir_tag(tag)
+        self._fechar_ate(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self.vazias_ja_fechadas:
+            self.vazias_ja_fechadas.remove(tag)
+        else:
+            self._fechar_ate(tag)
+
+    ### Texto ###
+
+    def handle_data(self, data):
+        self.dados_atuais.append(data)
+
+    def handle_charref(self, name):
+        self.dados_atuais.append(unescape(f'&#{name};'))
+
+    def handle_entityref(self, name):
+        self.dados_atuais.append(entidades_html5.get(name + ';', f'&{name}'))
+
+    def handle_comment(self, data):
+        self._finalizar_trecho()
+
+    def handle_decl(self, decl):
+        self._finalizar_trecho()
+
+    def handle_pi(self, data):
+        self._finalizar_trecho()
+
+    def unknown_decl(self, data):
+        self._finalizar_trecho()
+        if data.upper().startswith('CDATA['):  # Blocos CDATA fazem parte do texto, mesmo em tags invisíveis
+            self._acrescentar_texto(data[len('CDATA['):])
+
+    def _finalizar_trecho(self):
+        if not self.dados_atuais:
+            return
+        trecho = ''.join(self.dados_atuais)
+        self.dados_atuais = []
+
+        if self.pilha_invisiveis:
+            return
+        # Trechos só de espaços viram uma quebra de linha (se tinham alguma) ou um espaço
+        if not self.pilha_preservam and not trecho.strip(espacos_ascii):
+            trecho = '\n' if '\n' in trecho else ' '
+        self._acrescentar_texto(trecho)
+
+    def _acrescentar_texto(self, texto):
+        self.texto_pendente += texto
+        if not regex_fim_de_linha.search(texto):
+            return
+
+        partes = self.texto_pendente.splitlines(keepends=True)
+        # A última parte fica pendente se não terminou, ou se termina em '\r' (pode vir um '\n' em seguida)
+        ultima = partes[-1]
+        if ultima[-1] not in fins_de_linha or ultima[-1] == '\r':
+            self.texto_pendente = partes.pop()
+        else:
+            self.texto_pendente = ''
+        self.linhas_prontas.extend(parte.splitlines()[0] for parte in partes)
+
+    def close(self):
+        super().close()
+        self._finalizar_trecho()
+        if self.texto_pendente:
+            self.linhas_prontas.extend(self.texto_pendente.splitlines())
+            self.texto_pendente = ''
+
+    def retirar_linhas(self):
+        linhas, self.linhas_prontas = self.linhas_prontas, []
+        return linhas
+
+"""
+    Gerador que lê o arquivo HTML em blocos e entrega as linhas do texto visível conforme ficam prontas,
+    sem carregar o arquivo inteiro nem montar a árvore do BeautifulSoup.
+"""
+def extrair_linhas_texto(caminho_arq, tamanho_bloco=1 << 16):
+    extrator = ExtratorTextoVisivel()
+    with open(caminho_arq, 'r', encoding='utf-8') as f:
+        while bloco := f.read(tamanho_bloco):
+            extrator.feed(bloco)
+            yield from extrator.retirar_linhas()
+    extrator.close()
+    yield from extrator.retirar_linhas()
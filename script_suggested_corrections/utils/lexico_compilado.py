@@ -0,0 +1,176 @@
+import hashlib # Hash das fontes, para saber quando recompilar
+import mmap # Leitura do artefato sem carregá-lo inteiro na memória
+import os # Caminhos e troca atômica do artefato
+import struct # Cabeçalhos binários
+import sys # Ordem dos bytes da máquina (o artefato é um cache local)
+from array import array # Tabelas de deslocamentos (uint32)
+
+from utils.dominio import carregar_gazetteer
+from utils.utils import carregar_lexico, construir_indice_lexico, esqueleto_palavra
+
+### Formato do artefato ###
+#
+# [cabeçalho] MAGICO | hash sha256 das fontes (32 bytes) | nº de seções (uint32)
+#             para cada seção: nome (16 bytes) | deslocamento da seção no arquivo (uint64)
+#
+# [seção]     nº de palavras (uint32) | nº de esqueletos (uint32)
+#             deslocamentos das palavras      uint32[nº de palavras + 1]
+#             início de cada grupo            uint32[nº de esqueletos + 1]
+#             bytes das palavras (utf-8), ordenadas por (esqueleto, palavra)
+#
+# As palavras de um mesmo esqueleto ficam contíguas, então cada grupo é só um intervalo
+# [início[i], início[i + 1]) da tabela de palavras. Os esqueletos não são gravados: o de um grupo
+# é recalculado a partir da sua primeira palavra durante a busca binária.
+
+MAGICO = b'VBRLEX01'
+TAMANHO_NOME_SECAO = 16
+
+"""
+    Função que calcula o hash das fontes do artefato (léxico e listas de nomes), considerando também a
+    versão do formato ('magico') e a ordem dos bytes da máquina. Qualquer mudança nelas exige recompilar.
+"""
+def calcular_hash_fontes(caminhos_fontes, magico=MAGICO):
+    hash_fontes = hashlib.sha256(magico + sys.byteorder.encode())
+    for caminho in caminhos_fontes:
+        hash_fontes.update(os.path.basename(caminho).encode('utf-8') + b'\0')
+        with open(caminho, 'rb') as f:
+            hash_fontes.update(f.read())
+    return hash_fontes.digest()
+
+"""
+    Função que serializa um conjunto de palavras como uma seção do artefato: a tabela ordenada de
+    palavras e o índice por esqueleto que aponta para ela.
+"""
+def serializar_secao(palavras):
+    indice = construir_indice_lexico(palavras)
+
+    offsets_palavras = array('I', [0])
+    inicio_grupos = array('I')
+    bytes_palavras = bytearray()
+
+    # Grupos na ordem dos bytes utf-8 dos esqueletos, que é a ordem usada na busca binária
+    for esqueleto in sorted(indice, key=lambda esqueleto: esqueleto.encode('utf-8')):
+        inicio_grupos.append(len(offsets_palavras) - 1)
+        for palavra in sorted(indice[esqueleto]):
+            bytes_palavras += palavra.encode('utf-8')
+            offsets_palavras.append(len(bytes_palavras))
+    inicio_grupos.append(len(offsets_palavras) - 1)
+
+    secao = bytearray(struct.pack('=II', len(offsets_palavras) - 1, len(inicio_grupos) - 1))
+    secao += offsets_palavras.tobytes() + inicio_grupos.tobytes() + bytes_palavras
+    return bytes(secao)
+
+"""
+    Função que escreve o artefato com as seções dadas (nome -> conjunto de palavras). A escrita é feita
+    num arquivo temporário e trocada de uma vez, para nunca deixar um artefato pela metade.
+"""
+def compilar_artefato(caminho_artefato, secoes, hash_fontes):
+    tamanho_cabecalho = len(MAGICO) + len(hash_fontes) + 4 + len(secoes) * (TAMANHO_NOME_SECAO + 8)
+
+    cabecalho = bytearray(MAGICO + hash_fontes + struct.pack('=I', len(secoes)))
+    corpo = bytearray()
+    for nome, palavras in secoes.items():
+        # Alinhamento de 4 bytes para as tabelas uint32 poderem ser lidas direto do mmap
+        corpo += b'\0' * (-(tamanho_cabecalho + len(corpo)) % 4)
+        cabecalho += nome.encode('ascii').ljust(TAMANHO_NOME_SECAO, b'\0')
+        cabecalho += struct.pack('=Q', tamanho_cabecalho + len(corpo))
+        corpo += serializar_secao(palavras)
+
+    caminho_temporario = caminho_artefato + '.tmp'
+    with open(caminho_temporario, 'wb') as f:
+        f.write(cabecalho + corpo)
+    os.replace(caminho_temporario, caminho_artefato)
+
+"""
+    Uma seção do artefato lida via mmap. Oferece o mesmo 'get' de um dicionário esqueleto -> palavras,
+    então pode ser usada no lugar do índice montado em memória. A busca do esqueleto é binária sobre
+    os bytes (a ordem dos bytes utf-8 é a mesma dos caracteres), decodificando só a primeira palavra de
+    cada grupo visitado e as palavras do grupo achado.
+"""
+class SecaoCompilada:
+    def __init__(self, buffer, deslocamento):
+        self._buffer = buffer
+        self.qtd_palavras, self.qtd_esqueletos = struct.unpack_from('=II', buffer, deslocamento)
+
+        visao = memoryview(buffer)
+        inicio = deslocamento + 8
+        fim = inicio + 4 * (self.qtd_palavras + 1)
+        self._offsets_palavras = visao[inicio:fim].cast('I')
+        inicio, fim = fim, fim + 4 * (self.qtd_esqueletos + 1)
+        self._inicio_grupos = visao[inicio:fim].cast('I')
+
+        self._base_palavras = fim
+
+    def __len__(self):
+        return self.qtd_palavras
+
+    def _palavra(self, i):
+        return self._buffer[self._base_palavras + self._offsets_palavras[i]:self._base_palavras + self._offsets_palavras[i + 1]].decode('utf-8')
+
+    def _esqueleto(self, i):
+        return esqueleto_palavra(self._palavra(self._inicio_grupos[i])).encode('utf-8')
+
+    def get(self, esqueleto, padrao=None):
+        chave = esqueleto.encode('utf-8')
+        baixo, alto = 0, self.qtd_esqueletos
+        while baixo < alto:
+            meio = (baixo + alto) // 2
+            if self._esqueleto(meio) < chave:
+                baixo = meio + 1
+            else:
+                alto = meio
+
+        if baixo == self.qtd_esqueletos or self._esqueleto(baixo) != chave:
+            return padrao
+        return [self._palavra(i) for i in range(self._inicio_grupos[baixo], self._inicio_grupos[baixo + 1])]
+
+"""
+    Função que lê apenas o cabeçalho do artefato e retorna o hash das fontes gravado nele, ou None se o
+    arquivo não existe ou não é um artefato válido.
+"""
+def ler_hash_artefato(caminho_artefato):
+    if not os.path.isfile(caminho_artefato):
+        return None
+
+    with open(caminho_artefato, 'rb') as f:
+        cabecalho = f.read(len(MAGICO) + 32)
+    if len(cabecalho) < len(MAGICO) + 32 or not cabecalho.startswith(MAGICO):
+        return None
+    return cabecalho[len(MAGICO):]
+
+"""
+    Função que abre o artefato via mmap e retorna as suas seções (nome -> SecaoCompilada).
+"""
+def abrir_artefato(caminho_artefato):
+    with open(caminho_artefato, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    posicao = len(MAGICO) + 32
+    (qtd_secoes,) = struct.unpack_from('=I', buffer, posicao)
+    posicao += 4
+
+    secoes = {}
+    for _ in range(qtd_secoes):
+        nome = buffer[posicao:posicao + TAMANHO_NOME_SECAO].rstrip(b'\0').decode('ascii')
+        (deslocamento,) = struct.unpack_from('=Q', buffer, posicao + TAMANHO_NOME_SECAO)
+        secoes[nome] = SecaoCompilada(buffer, deslocamento)
+        posicao += TAMANHO_NOME_SECAO + 8
+
+    return secoes
+
+"""
+    Função principal do módulo: retorna as seções do artefato compilado a partir do léxico e das listas
+    de nomes de domínio, reaproveitando o artefato em disco e só recompilando quando o hash das fontes muda.
+"""
+def carregar_ou_compilar(caminho_artefato, caminho_lexico, caminhos_dominio):
+    hash_fontes = calcular_hash_fontes([caminho_lexico, *caminhos_dominio])
+
+    if ler_hash_artefato(caminho_artefato) != hash_fontes:
+        print(f"Compilando o léxico em {caminho_artefato}...")
+        secoes = {
+            'lexico': carregar_lexico(caminho_lexico),
+            'dominio': carregar_gazetteer(caminhos_dominio),
+        }
+        compilar_artefato(caminho_artefato, secoes, hash_fontes)
+
+    return abrir_artefato(caminho_artefato)
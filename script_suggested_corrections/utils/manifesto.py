@@ -0,0 +1,101 @@
+import hashlib # Hash do conteúdo de cada arquivo
+import json # Formato do manifesto em disco
+import os # Tamanho e data dos arquivos, troca atômica do manifesto
+
+"""
+    Manifesto da última execução: para cada arquivo do VBR, o seu tamanho, data de modificação e hash do
+    conteúdo, e os registros das palavras corrompidas encontradas nele (antes da ordenação dos candidatos,
+    que depende do corpus inteiro e é refeita a cada execução). Numa nova execução, só os arquivos novos ou
+    com conteúdo diferente precisam ser analisados de novo.
+
+    As impressões digitais ficam num arquivo pequeno, lido sempre; os registros ficam num segundo arquivo,
+    lido só quando alguma saída precisa ser reescrita. O manifesto vale apenas para a versão da análise
+    com que foi gerado (artefato compilado e extrator de texto): se ela mudar, tudo é analisado de novo.
+"""
+class Manifesto:
+    def __init__(self, versao, arquivos=None, configuracao_saidas=None):
+        self.versao = versao
+        self.arquivos = dict(arquivos or {})
+        self.configuracao_saidas = configuracao_saidas
+        self.registros = None
+        self.caminho_registros = None
+
+    @classmethod
+    def carregar(cls, caminho_manifesto, versao):
+        if os.path.isfile(caminho_manifesto):
+            with open(caminho_manifesto, 'r', encoding='utf-8') as f:
+                conteudo = json.load(f)
+            if conteudo.get('versao') == versao:
+                manifesto = cls(versao, conteudo['arquivos'], conteudo.get('configuracao_saidas'))
+                manifesto.caminho_registros = caminho_registros(caminho_manifesto)
+                return manifesto
+        return cls(versao)
+
+    """
+        Retorna a impressão digital atual de um arquivo (tamanho, data de modificação e hash). Se tamanho e
+        data são os mesmos do manifesto, o hash guardado é reaproveitado sem ler o arquivo.
+    """
+    def impressao_digital(self, nome_arquivo, caminho_arq):
+        estado = os.stat(caminho_arq)
+        anterior = self.arquivos.get(nome_arquivo)
+        if anterior is not None and anterior['tamanho'] == estado.st_size and anterior['mtime_ns'] == estado.st_mtime_ns:
+            return anterior
+
+        with open(caminho_arq, 'rb') as f:
+            hash_conteudo = hashlib.sha256(f.read()).hexdigest()
+        return {'tamanho': estado.st_size, 'mtime_ns': estado.st_mtime_ns, 'sha256': hash_conteudo}
+
+    """
+        Retorna se o conteúdo do arquivo é o mesmo da execução anterior (e, portanto, os registros
+        guardados continuam valendo).
+    """
+    def inalterado(self, nome_arquivo, impressao):
+        anterior = self.arquivos.get(nome_arquivo)
+        return anterior is not None and anterior['sha256'] == impressao['sha256']
+
+    """
+        Retorna os registros guardados de um arquivo, lendo o arquivo de registros na primeira chamada.
+    """
+    def registros_arquivo(self, nome_arquivo):
+        if self.registros is None:
+            self.registros = {}
+            if self.caminho_registros is not None and os.path.isfile(self.caminho_registros):
+                with open(self.caminho_registros, 'r', encoding='utf-8') as f:
+                    conteudo = json.load(f)
+                if conteudo.get('versao') == self.versao:
+                    self.registros = conteudo['registros']
+        return self.registros.get(nome_arquivo)
+
+    """
+        Substitui as impressões digitais e os registros pelos da execução atual (só dos arquivos vistos
+        nela, então arquivos removidos do diretório saem do manifesto).
+    """
+    def atualizar(self, arquivos, registros, configuracao_saidas):
+        self.arquivos = arquivos
+        self.registros = registros
+        self.configuracao_saidas = configuracao_saidas
+
+    """
+        Grava o manifesto. Os registros são gravados antes das impressões digitais: se a execução parar
+        entre as duas escritas, o manifesto antigo só faz arquivos serem analisados de novo.
+    """
+    def salvar(self, caminho_manifesto):
+        self.caminho_registros = caminho_registros(caminho_manifesto)
+        gravar_json(self.caminho_registros, {'versao': self.versao, 'registros': self.registros})
+        gravar_json(caminho_manifesto, {'versao': self.versao, 'configuracao_saidas': self.configuracao_saidas, 'arquivos': self.arquivos})
+
+"""
+    Retorna o caminho do arquivo de registros de um manifesto.
+"""
+def caminho_registros(caminho_manifesto):
+    raiz, extensao = os.path.splitext(caminho_manifesto)
+    return raiz + '_registros' + extensao
+
+"""
+    Grava um conteúdo JSON num arquivo temporário e o troca de uma vez pelo arquivo final.
+"""
+def gravar_json(caminho, conteudo):
+    caminho_temporario = caminho + '.tmp'
+    with open(caminho_temporario, 'w', encoding='utf-8') as f:
+        json.dump(conteudo, f, ensure_ascii=False)
+    os.replace(caminho_temporario, caminho)
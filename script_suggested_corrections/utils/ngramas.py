@@ -0,0 +1,275 @@
+import bisect # Busca binária nas tabelas do mmap
+import mmap # Leitura da tabela sem carregá-la inteira na memória
+import os # Caminhos e troca atômica da tabela
+import re # Separar as palavras do texto
+import struct # Cabeçalho binário
+from array import array # Tabelas de deslocamentos e contagens
+from collections import Counter # Contagem dos n-gramas
+
+from utils.lexico_compilado import calcular_hash_fontes
+from utils.saidas import grupo_n_correcoes, grupo_uma_correcao
+
+### Formato da tabela de contagens ###
+#
+# [cabeçalho] MAGICO | hash sha256 das fontes (32 bytes) | total de palavras (uint64)
+#             nº de palavras distintas (uint32) | nº de bigramas distintos (uint32)
+# [palavras]  deslocamentos uint32[nº de palavras + 1] | contagens uint32[nº de palavras]
+#             bytes das palavras (utf-8, em minúsculas), em ordem de bytes
+# [bigramas]  chaves uint64[nº de bigramas] (id da 1ª palavra << 32 | id da 2ª), em ordem
+#             contagens uint32[nº de bigramas]
+#
+# O id de uma palavra é a sua posição na tabela ordenada, então palavras e bigramas são achados por
+# busca binária direto no mmap, sem montar dicionários ao abrir.
+
+MAGICO = b'VBRNGR01'
+
+# Mesma separação das palavras corrompidas de main.py (\w*\?+\w*), e as demais palavras inteiras
+regex_palavra = re.compile(r'\w*\?+\w*|\w+')
+
+# Peso da unigrama quando o bigrama não foi visto ('stupid backoff')
+peso_backoff = 0.4
+
+"""
+    Gerador das sequências de palavras (em minúsculas) de um texto sem corrupção: cada linha é quebrada
+    nas palavras corrompidas, que não entram na contagem, e os pedaços restantes são as sequências.
+"""
+def sequencias_sem_corrupcao(linhas):
+    for linha in linhas:
+        sequencia = []
+        for palavra in regex_palavra.findall(linha):
+            if '?' in palavra:
+                if sequencia:
+                    yield sequencia
+                sequencia = []
+            else:
+                sequencia.append(palavra.lower())
+        if sequencia:
+            yield sequencia
+
+"""
+    Gerador das sentenças de um arquivo CoNLL-U, como listas das formas das palavras (coluna FORM).
+    Intervalos de palavras compostas (1-2) e nós vazios (1.1) são ignorados.
+"""
+def frases_conllu(caminho_conllu):
+    frase = []
+    with open(caminho_conllu, 'r', encoding='utf-8') as f:
+        for linha in f:
+            linha = linha.rstrip('\n')
+            if not linha:
+                if frase:
+                    yield frase
+                frase = []
+            elif not linha.startswith('#'):
+                colunas = linha.split('\t')
+                if colunas[0].isdigit():
+                    frase.append(colunas[1])
+    if frase:
+        yield frase
+
+"""
+    Função que conta unigramas e bigramas das sequências de palavras dadas.
+"""
+def contar_ngramas(sequencias):
+    unigramas = Counter()
+    bigramas = Counter()
+    for sequencia in sequencias:
+        unigramas.update(sequencia)
+        bigramas.update(zip(sequencia, sequencia[1:]))
+    return unigramas, bigramas
+
+"""
+    Função que escreve a tabela de contagens. A escrita é feita num arquivo temporário e trocada de uma
+    vez, para nunca deixar uma tabela pela metade.
+"""
+def compilar_tabela(caminho_tabela, unigramas, bigramas, hash_fontes):
+    palavras = sorted(unigramas, key=lambda palavra: palavra.encode('utf-8'))
+    ids = {palavra: i for i, palavra in enumerate(palavras)}
+
+    offsets_palavras = array('I', [0])
+    contagens_palavras = array('I')
+    bytes_palavras = bytearray()
+    for palavra in palavras:
+        bytes_palavras += palavra.encode('utf-8')
+        offsets_palavras.append(len(bytes_palavras))
+        contagens_palavras.append(unigramas[palavra])
+
+    chaves_bigramas = array('Q')
+    contagens_bigramas = array('I')
+    for chave, contagem in sorted((ids[primeira] << 32 | ids[segunda], contagem) for (primeira, segunda), contagem in bigramas.items()):
+        chaves_bigramas.append(chave)
+        contagens_bigramas.append(contagem)
+
+    conteudo = bytearray(MAGICO + hash_fontes)
+    conteudo += struct.pack('=QII', sum(unigramas.values()), len(palavras), len(chaves_bigramas))
+    conteudo += offsets_palavras.tobytes() + contagens_palavras.tobytes() + bytes_palavras
+    # Alinhamento de 8 bytes para as chaves uint64 poderem ser lidas direto do mmap
+    conteudo += b'\0' * (-len(conteudo) % 8)
+    conteudo += chaves_bigramas.tobytes() + contagens_bigramas.tobytes()
+
+    caminho_temporario = caminho_tabela + '.tmp'
+    with open(caminho_temporario, 'wb') as f:
+        f.write(conteudo)
+    os.replace(caminho_temporario, caminho_tabela)
+
+"""
+    Tabela de contagens lida via mmap, com as consultas de unigramas e bigramas usadas na ordenação.
+"""
+class TabelaNgramas:
+    def __init__(self, buffer):
+        self._buffer = buffer
+        posicao = len(MAGICO) + 32
+        self.total_palavras, self.qtd_palavras, self.qtd_bigramas = struct.unpack_from('=QII', buffer, posicao)
+        posicao += 16
+
+        visao = memoryview(buffer)
+        fim = posicao + 4 * (self.qtd_palavras + 1)
+        self._offsets_palavras = visao[posicao:fim].cast('I')
+        posicao, fim = fim, fim + 4 * self.qtd_palavras
+        self._contagens_palavras = visao[posicao:fim].cast('I')
+        self._base_palavras = fim
+
+        posicao = self._base_palavras + self._offsets_palavras[self.qtd_palavras]
+        posicao += -posicao % 8
+        fim = posicao + 8 * self.qtd_bigramas
+        self._chaves_bigramas = visao[posicao:fim].cast('Q')
+        self._contagens_bigramas = visao[fim:fim + 4 * self.qtd_bigramas].cast('I')
+
+    def _palavra(self, i):
+        return self._buffer[self._base_palavras + self._offsets_palavras[i]:self._base_palavras + self._offsets_palavras[i + 1]]
+
+    def id_palavra(self, palavra):
+        chave = palavra.lower().encode('utf-8')
+        baixo, alto = 0, self.qtd_palavras
+        while baixo < alto:
+            meio = (baixo + alto) // 2
+            if self._palavra(meio) < chave:
+                baixo = meio + 1
+            else:
+                alto = meio
+        if baixo == self.qtd_palavras or self._palavra(baixo) != chave:
+            return None
+        return baixo
+
+    def unigrama(self, palavra):
+        i = self.id_palavra(palavra)
+        return 0 if i is None else self._contagens_palavras[i]
+
+    def bigrama(self, primeira, segunda):
+        i, j = self.id_palavra(primeira), self.id_palavra(segunda)
+        if i is None or j is None:
+            return 0
+        chave = i << 32 | j
+        posicao = bisect.bisect_left(self._chaves_bigramas, chave)
+        if posicao == self.qtd_bigramas or self._chaves_bigramas[posicao] != chave:
+            return 0
+        return self._contagens_bigramas[posicao]
+
+    def probabilidade(self, palavra):
+        # Suavização add-one, para palavras nunca vistas não zerarem a pontuação
+        return (self.unigrama(palavra) + 1) / (self.total_palavras + self.qtd_palavras + 1)
+
+    """
+        Pontuação de um candidato entre as palavras vizinhas (None se não há vizinha sem corrupção):
+        P(candidato | anterior) * P(seguinte | candidato), com 'stupid backoff' para a unigrama quando
+        o bigrama não foi visto.
+    """
+    def pontuar(self, candidato, anterior, seguinte):
+        pontuacao = 1.0
+        if anterior is not None and (contagem := self.bigrama(anterior, candidato)):
+            pontuacao *= contagem / self.unigrama(anterior)
+        else:
+            pontuacao *= peso_backoff * self.probabilidade(candidato)
+        if seguinte is not None and (contagem := self.bigrama(candidato, seguinte)):
+            pontuacao *= contagem / self.unigrama(candidato)
+        elif seguinte is not None:
+            pontuacao *= peso_backoff * self.probabilidade(seguinte)
+        return pontuacao
+
+"""
+    Função que lê o cabeçalho da tabela e retorna o hash das fontes gravado nele, ou None se o arquivo
+    não existe ou não é uma tabela válida.
+"""
+def ler_hash_tabela(caminho_tabela):
+    if not os.path.isfile(caminho_tabela):
+        return None
+
+    with open(caminho_tabela, 'rb') as f:
+        cabecalho = f.read(len(MAGICO) + 32)
+    if len(cabecalho) < len(MAGICO) + 32 or not cabecalho.startswith(MAGICO):
+        return None
+    return cabecalho[len(MAGICO):]
+
+"""
+    Função principal do módulo: retorna a tabela de contagens do texto sem corrupção dos arquivos do
+    corpus (e do CoNLL-U, se dado), reaproveitando a tabela em disco e só recontando quando o hash das
+    fontes muda. 'linhas_arquivo' extrai as linhas de texto visível de um arquivo do corpus.
+"""
+def carregar_ou_compilar_ngramas(caminho_tabela, caminhos_corpus, linhas_arquivo, caminho_conllu=None):
+    caminhos_fontes = list(caminhos_corpus) + ([caminho_conllu] if caminho_conllu else [])
+    hash_fontes = calcular_hash_fontes(caminhos_fontes, MAGICO)
+
+    if ler_hash_tabela(caminho_tabela) != hash_fontes:
+        print(f"Contando os n-gramas do corpus em {caminho_tabela}...")
+        unigramas, bigramas = contar_ngramas(
+            sequencia
+            for caminho in caminhos_corpus
+            for sequencia in sequencias_sem_corrupcao(linhas_arquivo(caminho))
+        )
+        if caminho_conllu:
+            unigramas_conllu, bigramas_conllu = contar_ngramas(
+                [forma.lower() for forma in frase] for frase in frases_conllu(caminho_conllu)
+            )
+            unigramas.update(unigramas_conllu)
+            bigramas.update(bigramas_conllu)
+        compilar_tabela(caminho_tabela, unigramas, bigramas, hash_fontes)
+
+    with open(caminho_tabela, 'rb') as f:
+        return TabelaNgramas(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+### Ordenação dos candidatos ###
+
+"""
+    Retorna as palavras vizinhas (anterior e seguinte) da ocorrência de número 'indice' de uma palavra
+    corrompida no contexto. Vizinhas corrompidas (ou inexistentes) são None.
+"""
+def vizinhas_no_contexto(contexto, palavra, indice):
+    palavras = regex_palavra.findall(contexto)
+    posicoes = [i for i, palavra_contexto in enumerate(palavras) if palavra_contexto == palavra]
+    if indice >= len(posicoes):
+        return None, None
+
+    posicao = posicoes[indice]
+    anterior = palavras[posicao - 1] if posicao > 0 else None
+    seguinte = palavras[posicao + 1] if posicao + 1 < len(palavras) else None
+    return (
+        None if anterior is None or '?' in anterior else anterior,
+        None if seguinte is None or '?' in seguinte else seguinte,
+    )
+
+"""
+    Função que ordena, nos registros de um arquivo, os candidatos das ocorrências com múltiplas correções,
+    do mais para o menos provável no contexto. Só são ordenadas ocorrências cujos candidatos são todos
+    palavras (a lista fixa de '?' inclui pontuação, que as contagens não cobrem). Com 'margem_confianca',
+    se o melhor candidato tem pontuação ao menos 'margem_confianca' vezes maior que o segundo, a ocorrência
+    passa para o grupo de uma correção (mantendo os demais candidatos na lista, depois dele).
+"""
+def ordenar_candidatos(registros, tabela, margem_confianca=None):
+    vistas = Counter()
+    for registro in registros:
+        # Qual ocorrência desta palavra nesta linha é o registro (a mesma palavra pode se repetir)
+        indice = vistas[registro['linha'], registro['palavra']]
+        vistas[registro['linha'], registro['palavra']] += 1
+
+        candidatos = registro['candidatos']
+        if registro['grupo'] != grupo_n_correcoes or not all(regex_palavra.fullmatch(candidato) for candidato in candidatos):
+            continue
+
+        anterior, seguinte = vizinhas_no_contexto(registro['contexto'], registro['palavra'], indice)
+        pontuacoes = {candidato: tabela.pontuar(candidato, anterior, seguinte) for candidato in candidatos}
+        # sorted é estável: empates mantêm a ordem alfabética
+        registro['candidatos'] = sorted(candidatos, key=lambda candidato: -pontuacoes[candidato])
+        registro['ordenados'] = True
+
+        melhor, segundo = registro['candidatos'][:2]
+        if margem_confianca is not None and pontuacoes[melhor] >= margem_confianca * pontuacoes[segundo]:
+            registro['grupo'] = grupo_uma_correcao
@@ -0,0 +1,216 @@
+import csv # Saída estruturada em CSV
+import io # Buffer do lote de linhas CSV
+import json # Saída estruturada em JSONL
+import os # Caminhos dos logs
+
+### Registros: uma linha por ocorrência de palavra corrompida ###
+
+# Grupos das ocorrências, conforme a quantidade de substituições encontradas
+grupo_sem_correcoes = 'sem_correcoes'
+grupo_uma_correcao = 'uma_correcao'
+grupo_n_correcoes = 'n_correcoes'
+grupos = (grupo_sem_correcoes, grupo_uma_correcao, grupo_n_correcoes)
+
+# Colunas dos registros (e do cabeçalho do CSV)
+campos_registro = ['arquivo', 'linha', 'palavra', 'contexto', 'candidatos', 'ordenados', 'grupo']
+
+"""
+    Retorna o grupo de uma ocorrência a partir da quantidade de candidatos encontrados.
+"""
+def grupo_ocorrencia(qtd_candidatos):
+    if qtd_candidatos == 0:
+        return grupo_sem_correcoes
+    if qtd_candidatos == 1:
+        return grupo_uma_correcao
+    return grupo_n_correcoes
+
+"""
+    Gerador que converte as palavras corrompidas de um arquivo nos registros que as saídas recebem.
+    Conjuntos de substituições viram listas em ordem alfabética (a ordem de um set muda a cada processo);
+    listas mantêm a sua ordem, que tem significado, e o registro marca isso em 'ordenados'.
+"""
+def registros_arquivo(nome_arquivo, palavras_corrompidas_dict):
+    for palavra_corrompida in palavras_corrompidas_dict:
+        substituicoes = palavra_corrompida["substituicoes"]
+        ordenados = not isinstance(substituicoes, set)
+        candidatos = list(substituicoes) if ordenados else sorted(substituicoes)
+        yield {
+            'arquivo': nome_arquivo,
+            'linha': palavra_corrompida["linha"],
+            'palavra': palavra_corrompida["palavra"],
+            'contexto': palavra_corrompida["contexto_original"],
+            'candidatos': candidatos,
+            'ordenados': ordenados,
+            'grupo': grupo_ocorrencia(len(candidatos)),
+        }
+
+### Saídas ###
+#
+# Toda saída recebe os registros de um arquivo por vez, na ordem dos arquivos, com
+# escrever_arquivo(nome_arquivo, registros), e é fechada com fechar() (ou ao sair de um bloco 'with').
+
+"""
+    Base das saídas que acumulam o texto já formatado e só escrevem no arquivo a cada 'tamanho_lote'
+    registros, em vez de uma escrita pequena por ocorrência.
+"""
+class SaidaEmLotes:
+    def __init__(self, caminho, tamanho_lote=2000):
+        self.caminho = caminho
+        self.tamanho_lote = tamanho_lote
+        self.arquivo = open(caminho, 'w', encoding='utf-8', newline='')
+        self.lote = []
+        self.qtd_no_lote = 0
+        self.qtd_registros = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def formatar(self, registro):
+        raise NotImplementedError
+
+    def escrever_arquivo(self, nome_arquivo, registros):
+        for registro in registros:
+            self.lote.append(self.formatar(registro))
+            self.qtd_no_lote += 1
+        if self.qtd_no_lote >= self.tamanho_lote:
+            self._descarregar()
+
+    def _descarregar(self):
+        self.arquivo.write(''.join(self.lote))
+        self.qtd_registros += self.qtd_no_lote
+        self.lote = []
+        self.qtd_no_lote = 0
+
+    def fechar(self):
+        if self.arquivo.closed:
+            return
+        self._descarregar()
+        self.arquivo.close()
+
+"""
+    Saída JSONL: um objeto JSON por linha, um por ocorrência.
+"""
+class SaidaJSONL(SaidaEmLotes):
+    def formatar(self, registro):
+        return json.dumps(registro, ensure_ascii=False) + '\n'
+
+"""
+    Saída CSV, com cabeçalho. A lista de candidatos vai numa só coluna, codificada em JSON (os
+    candidatos de '?' incluem aspas e pontuação, então um separador simples seria ambíguo).
+"""
+class SaidaCSV(SaidaEmLotes):
+    def __init__(self, caminho, tamanho_lote=2000):
+        super().__init__(caminho, tamanho_lote)
+        self.buffer_csv = io.StringIO()
+        self.escritor_csv = csv.writer(self.buffer_csv)
+        self.arquivo.write(self.formatar_linha(campos_registro))
+
+    def formatar_linha(self, valores):
+        self.escritor_csv.writerow(valores)
+        linha = self.buffer_csv.getvalue()
+        self.buffer_csv.seek(0)
+        self.buffer_csv.truncate()
+        return linha
+
+    def formatar(self, registro):
+        valores = [registro[campo] for campo in campos_registro]
+        valores[campos_registro.index('candidatos')] = json.dumps(registro['candidatos'], ensure_ascii=False)
+        return self.formatar_linha(valores)
+
+"""
+    Retorna a exibição em string dos candidatos de um registro nos logs de texto: listas com ordem
+    significativa como lista, e os demais como conjunto (já em ordem alfabética no registro).
+"""
+def formatar_candidatos(registro):
+    if registro['ordenados']:
+        return str(registro['candidatos'])
+    return '{' + ', '.join(repr(candidato) for candidato in registro['candidatos']) + '}'
+
+"""
+    Retorna a exibição em string de um registro nos logs de texto.
+"""
+def estrutura_registro_log(registro):
+    string = ""
+    string += f'\tPalavra: {registro["palavra"]}\n'
+    string += f'\tNúmero da linha no arquivo: {registro["linha"]}\n'
+    string += f'\tContexto/frase original: \"{registro["contexto"]}\"\n'
+    string += f'\tSubstituição(ões) encontrada(s): '
+    if registro['grupo'] == grupo_sem_correcoes:
+        string += "-\n"
+    else:
+        string += formatar_candidatos(registro) + "\n"
+    string += "--------------------------------------------------------\n"
+
+    return string
+
+"""
+    Os três logs de texto, legíveis, como uma saída sobre os mesmos registros. Para cada arquivo, escreve
+    o cabeçalho com o nome do arquivo em todos os logs e cada ocorrência no log do seu grupo:
+    - log_sem_correcoes.txt se não foi possível distinguir uma correção;
+    - log_uma_correcao.txt se foi possível encontrar exatamente uma correção;
+    - log_n_correcoes.txt se foram encontradas múltiplas correções possíveis.
+    Cada log recebe o texto de um arquivo inteiro numa única escrita.
+"""
+class SaidaLogsTexto:
+    nomes_logs = {
+        grupo_sem_correcoes: 'log_sem_correcoes.txt',
+        grupo_uma_correcao: 'log_uma_correcao.txt',
+        grupo_n_correcoes: 'log_n_correcoes.txt',
+    }
+
+    def __init__(self, diretorio='.'):
+        self.logs = {
+            grupo: open(os.path.join(diretorio, nome_log), 'w', encoding='utf-8')
+            for grupo, nome_log in self.nomes_logs.items()
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def escrever_arquivo(self, nome_arquivo, registros):
+        cabecalho = "\n==========================================================\n"
+        cabecalho += f"=== Analisando o arquivo {nome_arquivo} ===\n"
+        cabecalho += "==========================================================\n"
+
+        trechos = {grupo: [cabecalho] for grupo in self.logs}
+        for registro in registros:
+            trechos[registro['grupo']].append(estrutura_registro_log(registro))
+
+        for grupo, log in self.logs.items():
+            log.write(''.join(trechos[grupo]))
+
+    def fechar(self):
+        for log in self.logs.values():
+            log.close()
+
+# Saídas disponíveis na linha de comando: nome -> (classe, arquivo padrão)
+formatos_saida = {
+    'texto': (SaidaLogsTexto, None),
+    'jsonl': (SaidaJSONL, 'ocorrencias.jsonl'),
+    'csv': (SaidaCSV, 'ocorrencias.csv'),
+}
+
+"""
+    Função que cria a saída de um formato. Os logs de texto usam o diretório atual; as saídas
+    estruturadas usam o caminho dado ou o arquivo padrão do formato.
+"""
+def abrir_saida(formato, caminho=None):
+    classe_saida, caminho_padrao = formatos_saida[formato]
+    if caminho_padrao is None:
+        return classe_saida()
+    return classe_saida(caminho or caminho_padrao)
+
+"""
+    Retorna os caminhos dos arquivos que a saída de um formato grava.
+"""
+def arquivos_saida(formato, caminho=None):
+    classe_saida, caminho_padrao = formatos_saida[formato]
+    if caminho_padrao is None:
+        return list(classe_saida.nomes_logs.values())
+    return [caminho or caminho_padrao]
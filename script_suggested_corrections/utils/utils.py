@@ -3,6 +3,9 @@ import re # Procurar padrões com expressões regulares
 # Caracteres possíveis para correções
 caracteres_especiais = "áàâãäçéèêëíìîïóòôõöúùûüñ"
 
+# Tabela para mascarar os caracteres especiais com '?' (usada nos esqueletos das palavras)
+tabela_mascara_especiais = str.maketrans({caractere: '?' for caractere in caracteres_especiais})
+
 """
     Função que abre o arquivo de léxico de suporte e retorna um 'dicionário' para consultar apenas as
     palavras com caracteres especiais.
@@ -19,4 +22,23 @@ def carregar_lexico(caminho_lexico):
             # Adiciona apenas se contiver caracteres especiais/acento, que é a 'corrupção' que queremos corrigir
             if regex_caracteres_especiais.search(palavra):
                 palavras.add(palavra)
-    return palavras
\ No newline at end of file
+    return palavras
+
+"""
+    Função que gera o 'esqueleto' de uma palavra: todas as letras em minúsculas e cada posição com
+    caractere especial/acento (ou já corrompida com '?') mascarada como '?'. Uma palavra corrompida e
+    as palavras do léxico que podem substituí-la têm sempre o mesmo esqueleto (e o mesmo tamanho).
+"""
+def esqueleto_palavra(palavra):
+    return palavra.lower().translate(tabela_mascara_especiais)
+
+"""
+    Função que monta o índice de consulta do léxico, agrupando as palavras pelo seu esqueleto. Assim,
+    cada palavra corrompida é resolvida com um único acesso ao dicionário, e a regex só precisa ser
+    testada nas poucas candidatas do grupo, em vez de percorrer o léxico inteiro.
+"""
+def construir_indice_lexico(lexico):
+    indice = {}
+    for palavra in lexico:
+        indice.setdefault(esqueleto_palavra(palavra), []).append(palavra)
+    return indice